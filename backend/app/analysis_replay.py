@@ -0,0 +1,229 @@
+"""
+Replay stored listing images against a candidate prompt or model.
+
+A sample of stored `listing_images` is analyzed twice: with the baseline
+(the default prompt and the configured model) and with the candidate (e.g.
+a new prompt file or another model name). Both go through
+`analysis_results`: analyses already stored for an image, model and prompt
+version are reused with their recorded usage, and new ones are stored, so
+the baseline is usually free and rerunning a candidate costs nothing.
+
+Images are analyzed concurrently on a thread pool (model calls are I/O
+bound), each thread with its own database session. The report compares
+tokens, cost and latency per variant, and how often both variants agree on
+the property type and room counts.
+
+Used by `python -m app.cli replay-analyses`.
+"""
+
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.analysis_store import AnalysisStore, image_hash
+from app.models import AnalysisResult, ListingImage
+from app.synthesis_backfill import stored_image_bytes
+from app.vision_model import (
+    DEFAULT_PROPERTY_PROMPT,
+    analyze_property_image,
+    prompt_version,
+    shared_vision_model,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_SIZE = 50
+DEFAULT_WORKERS = 8
+
+
+@dataclass
+class Variant:
+    """A model and prompt to analyze images with."""
+    model_type: str
+    prompt: str = DEFAULT_PROPERTY_PROMPT
+    model_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def model(self) -> str:
+        return getattr(shared_vision_model(self.model_type, **self.model_kwargs), "model", self.model_type)
+
+    @property
+    def prompt_version(self) -> str:
+        return prompt_version(self.prompt)
+
+    def describe(self) -> Dict[str, str]:
+        return {"model_type": self.model_type, "model": self.model, "prompt_version": self.prompt_version}
+
+
+def sample_images(db: Session, size: int) -> List[Tuple[str, bytes]]:
+    """
+    A random sample of stored images as (image_hash, bytes).
+
+    Identical images are included once; undecodable ones are skipped.
+    """
+    rows = db.execute(
+        select(ListingImage.image_data)
+        .where(ListingImage.image_data.is_not(None))
+        .order_by(func.random())
+        .limit(size)
+    ).scalars()
+    images: Dict[str, bytes] = {}
+    for image_data in rows:
+        data = stored_image_bytes(image_data)
+        if data is not None:
+            images.setdefault(image_hash(data), data)
+    return list(images.items())
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(pct / 100 * len(sorted_values))) - 1]
+
+
+def _stored_analysis(
+    db: Session,
+    store: AnalysisStore,
+    key: str,
+    image_data: bytes,
+    variant: Variant,
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    The stored result of `variant` for an image, analyzing it first if needed.
+
+    Returns:
+        (the row's values, whether a model call was made)
+    """
+    model, version = variant.model, variant.prompt_version
+    row = store.get(db, key, model, version)
+    if row is not None:
+        return _row_values(row), False
+
+    vision_model = shared_vision_model(variant.model_type, **variant.model_kwargs)
+    store.analyze(
+        db, image_data, variant.model_type, model, version,
+        lambda data: analyze_property_image(
+            data, model_type=variant.model_type, prompt=variant.prompt, vision_model=vision_model
+        ),
+    )
+    row = store.get(db, key, model, version)
+    if row is None:
+        raise RuntimeError("analysis was not stored (e.g. the response was not JSON)")
+    return _row_values(row), True
+
+
+def _row_values(row: AnalysisResult) -> Dict[str, Any]:
+    # Plain values: the next commit on the session expires the row
+    return {
+        "result": row.result,
+        "input_tokens": row.input_tokens,
+        "output_tokens": row.output_tokens,
+        "latency_ms": row.latency_ms,
+        "cost_usd": row.cost_usd,
+    }
+
+
+def _summarize(rows: List[Dict[str, Any]], calls: int, failed: int) -> Dict[str, Any]:
+    latencies = sorted(row["latency_ms"] for row in rows)
+    return {
+        "analyses": len(rows),
+        "calls": calls,
+        "failed": failed,
+        "input_tokens": sum(row["input_tokens"] for row in rows),
+        "output_tokens": sum(row["output_tokens"] for row in rows),
+        "cost_usd": round(sum(row["cost_usd"] for row in rows), 6),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+        },
+    }
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Candidate minus baseline, per image for the usage sums."""
+    def per_image(summary: Dict[str, Any], key: str) -> float:
+        return summary[key] / summary["analyses"] if summary["analyses"] else 0.0
+
+    baseline_cost = per_image(baseline, "cost_usd")
+    return {
+        "cost_usd_per_image": round(per_image(candidate, "cost_usd") - baseline_cost, 6),
+        "cost_ratio": round(per_image(candidate, "cost_usd") / baseline_cost, 3) if baseline_cost else None,
+        "output_tokens_per_image": round(
+            per_image(candidate, "output_tokens") - per_image(baseline, "output_tokens"), 1
+        ),
+        "latency_ms_mean": round(candidate["latency_ms"]["mean"] - baseline["latency_ms"]["mean"], 1),
+        "latency_ms_p50": round(candidate["latency_ms"]["p50"] - baseline["latency_ms"]["p50"], 1),
+        "latency_ms_p95": round(candidate["latency_ms"]["p95"] - baseline["latency_ms"]["p95"], 1),
+    }
+
+
+def replay(
+    session_factory: Callable[[], Session],
+    baseline: Variant,
+    candidate: Variant,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    workers: int = DEFAULT_WORKERS,
+) -> Dict[str, Any]:
+    """
+    Analyze a sample of stored images with both variants and compare them.
+
+    Args:
+        session_factory: Creates database sessions (one per worker thread)
+        baseline: Usually the default prompt and configured model
+        candidate: The prompt and/or model to evaluate
+        sample_size: Images to sample from `listing_images`
+        workers: Images analyzed concurrently
+
+    Returns:
+        {"images", "baseline", "candidate", "difference", "agreement"}; each
+        variant has its description, usage sums and latency percentiles
+    """
+    db = session_factory()
+    try:
+        images = sample_images(db, sample_size)
+    finally:
+        db.close()
+
+    store = AnalysisStore(mode="record")
+
+    def run(image: Tuple[str, bytes]) -> Dict[str, Any]:
+        key, image_data = image
+        outcome: Dict[str, Any] = {}
+        session = session_factory()
+        try:
+            for name, variant in (("baseline", baseline), ("candidate", candidate)):
+                try:
+                    outcome[name] = _stored_analysis(session, store, key, image_data, variant)
+                except Exception as e:
+                    logger.warning(f"Replay of image {key[:12]} failed for the {name}: {e}")
+                    session.rollback()
+        finally:
+            session.close()
+        return outcome
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="analysis-replay") as executor:
+        outcomes = list(executor.map(run, images))
+
+    report: Dict[str, Any] = {"images": len(images)}
+    for name, variant in (("baseline", baseline), ("candidate", candidate)):
+        rows = [outcome[name][0] for outcome in outcomes if name in outcome]
+        calls = sum(1 for outcome in outcomes if name in outcome and outcome[name][1])
+        report[name] = {**variant.describe(), **_summarize(rows, calls, len(outcomes) - len(rows))}
+    report["difference"] = compare(report["baseline"], report["candidate"])
+
+    pairs = [
+        (outcome["baseline"][0]["result"], outcome["candidate"][0]["result"])
+        for outcome in outcomes if "baseline" in outcome and "candidate" in outcome
+    ]
+    report["agreement"] = {
+        key: round(sum(1 for a, b in pairs if a.get(key) == b.get(key)) / len(pairs), 3) if pairs else None
+        for key in ("property_type", "rooms")
+    }
+    return report
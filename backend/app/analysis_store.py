@@ -0,0 +1,184 @@
+"""
+Vision analyses stored by image, model and prompt version.
+
+Analyses made on the request path (`/api/analyze-step`, its batch variant
+and `/api/analyze-batch`) are written to `analysis_results`, tagged with the
+model name and the version (content hash) of the prompt that produced it,
+together with its token counts, latency and cost. Only analyses parsed from
+a JSON response are stored: a text-fallback parse or a mock default is not
+a faithful answer for that image and must not be replayed. That
+lets a prompt or model change be compared against the analyses made before
+it (`app.analysis_replay`) instead of only against fresh calls.
+
+`ANALYSIS_STORE_MODE` selects what happens on the request path:
+
+- `record` (default): store every analysis
+- `reuse`: also answer from the store when the same image was already
+  analyzed with the same model and prompt, without calling the model
+- `off`: neither
+
+Store errors (e.g. the table does not exist yet) are logged and never fail
+the analysis. Lookups and writes use a short-lived session of their own on
+the caller's engine, so the caller's transaction is never committed or
+rolled back by the store.
+"""
+
+import copy
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.metrics import record_cache_lookup
+from app.models import AnalysisResult
+
+logger = logging.getLogger(__name__)
+
+STORE_MODES = ("off", "record", "reuse")
+
+# "parse_path" values (see vision_model._parse_model_content) of storable analyses;
+# analyses without one (mock and simulated models) are stored too
+STORED_PARSE_PATHS = ("json", "markdown_json")
+
+
+def image_hash(image_data: bytes) -> str:
+    return hashlib.sha256(image_data).hexdigest()
+
+
+class AnalysisStore:
+    """
+    Reads and writes `analysis_results`; see the module docstring.
+
+    Args:
+        mode: One of `STORE_MODES` (default: `ANALYSIS_STORE_MODE`)
+    """
+
+    def __init__(self, mode: Optional[str] = None):
+        mode = mode or os.getenv("ANALYSIS_STORE_MODE", "record")
+        if mode not in STORE_MODES:
+            raise ValueError(f"Unknown analysis store mode: {mode} (expected one of {', '.join(STORE_MODES)})")
+        self.mode = mode
+
+    def get(self, db: Session, image_hash: str, model: str, prompt_version: str) -> Optional[AnalysisResult]:
+        return db.scalars(
+            select(AnalysisResult).where(
+                AnalysisResult.image_hash == image_hash,
+                AnalysisResult.model == model,
+                AnalysisResult.prompt_version == prompt_version,
+            )
+        ).first()
+
+    def save(
+        self,
+        db: Session,
+        image_hash: str,
+        model_type: str,
+        model: str,
+        prompt_version: str,
+        analysis: Dict[str, Any],
+        latency_ms: float,
+    ) -> bool:
+        """
+        Store one analysis and commit, in a session of its own.
+
+        Token counts and cost come from the analysis "usage"; its latency is
+        used when present (the provider call alone), else `latency_ms`.
+
+        Returns:
+            False if a result for the same key was already stored (kept as is)
+        """
+        usage = analysis.get("usage") or {}
+        row = AnalysisResult(
+            image_hash=image_hash,
+            model_type=model_type,
+            model=model,
+            prompt_version=prompt_version,
+            result={key: value for key, value in analysis.items() if key != "usage"},
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            latency_ms=usage.get("latency_ms") or round(latency_ms, 1),
+            cost_usd=usage.get("cost_usd", 0.0),
+        )
+        with _own_session(db) as session:
+            session.add(row)
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                return False
+        return True
+
+    def analyze(
+        self,
+        db: Optional[Session],
+        image_data: bytes,
+        model_type: str,
+        model: str,
+        prompt_version: str,
+        analyze: Callable[[bytes], Dict[str, Any]],
+        key: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Analyze an image through the store.
+
+        Args:
+            db: Caller's session, for its engine (None: just call `analyze`)
+            image_data: Uploaded image bytes (hashed before preprocessing)
+            model_type: Vision provider, for the stored row
+            model: Model name `analyze` uses
+            prompt_version: Version of the prompt `analyze` uses
+            analyze: Makes the analysis, e.g. `analyze_property_image`
+            key: `image_hash` of the uploaded bytes, when `image_data` has
+                already been preprocessed
+
+        Returns:
+            The analysis; a reused one has no "usage" (no call was made)
+        """
+        if db is None or self.mode == "off":
+            return analyze(image_data)
+
+        key = key or image_hash(image_data)
+        if self.mode == "reuse":
+            stored = None
+            try:
+                with _own_session(db) as session:
+                    row = self.get(session, key, model, prompt_version)
+                    if row is not None:
+                        stored = copy.deepcopy(row.result)
+            except SQLAlchemyError as e:
+                logger.warning(f"Analysis store lookup failed: {e}")
+            record_cache_lookup("analysis_store", stored is not None)
+            if stored is not None:
+                return stored
+
+        started = time.perf_counter()
+        analysis = analyze(image_data)
+        latency_ms = (time.perf_counter() - started) * 1000
+        if analysis.get("parse_path", "json") not in STORED_PARSE_PATHS:
+            logger.info(f"Not storing analysis of image {key[:12]}: parse path {analysis['parse_path']}")
+            return analysis
+        try:
+            self.save(db, key, model_type, model, prompt_version, analysis, latency_ms)
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not store analysis: {e}")
+        return analysis
+
+
+def _own_session(db: Session) -> Session:
+    return Session(bind=db.get_bind())
+
+
+# Global instance for convenience
+_store = None
+
+def get_analysis_store() -> AnalysisStore:
+    """Get or create the global analysis store."""
+    global _store
+    if _store is None:
+        _store = AnalysisStore()
+    return _store
@@ -0,0 +1,122 @@
+"""
+Concurrent processing for the batch analyze-step endpoint.
+
+Agencies drafting many listings send their form states in one request
+instead of one `/api/analyze-step` call each. Items run on a shared,
+bounded thread pool, so vision model latency overlaps instead of adding up:
+
+- every item of a batch uses one shared vision model (and its client pool),
+  see `shared_vision_model`
+- identical images within a batch are analyzed once (`ImageAnalysisCache`)
+- a failing item is reported in its own result; the rest of the batch
+  still succeeds
+
+Configured with `ANALYZE_BATCH_MAX_ITEMS` (default 50) and
+`ANALYZE_BATCH_WORKERS` (threads shared by all batches, default 8).
+"""
+
+import contextvars
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import HTTPException
+
+from app.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_ITEMS = int(os.getenv("ANALYZE_BATCH_MAX_ITEMS", "50"))
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class ImageAnalysisCache:
+    """
+    Single-flight memo of image analyses for one batch.
+
+    Concurrent calls with the same image bytes wait for the first call's
+    result (or error) instead of analyzing the image again.
+    """
+
+    def __init__(self, analyze: Callable[[bytes], Dict[str, Any]]):
+        self._analyze = analyze
+        self._results: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, image_data: bytes) -> Dict[str, Any]:
+        key = hashlib.sha256(image_data).hexdigest()
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+        record_cache_lookup("batch_image", not owner)
+        if owner:
+            try:
+                future.set_result(self._analyze(image_data))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, HTTPException):
+        return str(error.detail)
+    return str(error) or type(error).__name__
+
+
+def run_batch(items: Sequence[T], handle: Callable[[T], R]) -> List[Tuple[Optional[R], Optional[str]]]:
+    """
+    Run `handle` on every item concurrently.
+
+    Args:
+        items: Batch items
+        handle: Processes one item; exceptions are caught per item
+
+    Returns:
+        One (result, None) or (None, error message) pair per item, in order
+    """
+    executor = get_batch_pool()
+    # Copy the request context so item spans land in the request's trace
+    futures = [executor.submit(contextvars.copy_context().run, handle, item) for item in items]
+
+    results: List[Tuple[Optional[R], Optional[str]]] = []
+    for index, future in enumerate(futures):
+        try:
+            results.append((future.result(), None))
+        except Exception as e:
+            logger.error(f"Batch item {index} failed: {e}")
+            results.append((None, _error_message(e)))
+    return results
+
+
+# Global instance for convenience
+_batch_pool = None
+_batch_pool_pid = None
+_batch_pool_lock = threading.Lock()
+
+def get_batch_pool() -> ThreadPoolExecutor:
+    """Get or create the thread pool shared by all batches."""
+    global _batch_pool, _batch_pool_pid
+    with _batch_pool_lock:
+        if _batch_pool is None or _batch_pool_pid != os.getpid():
+            # A pool inherited across fork has no threads in this process
+            _batch_pool = ThreadPoolExecutor(
+                max_workers=int(os.getenv("ANALYZE_BATCH_WORKERS", "8")),
+                thread_name_prefix="analyze-batch",
+            )
+            _batch_pool_pid = os.getpid()
+        return _batch_pool
+
+def shutdown_batch_pool(wait: bool = True) -> None:
+    """Stop the shared batch threads (on app shutdown)."""
+    global _batch_pool
+    with _batch_pool_lock:
+        pool, _batch_pool = _batch_pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
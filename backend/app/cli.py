@@ -0,0 +1,220 @@
+"""
+Command-line maintenance tasks.
+
+Usage (from backend/):
+    python -m app.cli import listings.ndjson [--chunk-size 500]
+    python -m app.cli export listings.ndjson [--format parquet] [--include-images]
+    python -m app.cli purge-drafts
+    python -m app.cli resynthesize [--checkpoint backfill.json] [--workers 4] [--dry-run]
+    python -m app.cli reindex [--missing] [--checkpoint reindex.json]
+    python -m app.cli replay-analyses --prompt-file new_prompt.txt [--model gpt-4.1-mini] [--sample 50]
+
+Uses `DATABASE_URL` like the API server.
+"""
+
+import argparse
+import json
+import sys
+
+from app.analysis_replay import DEFAULT_SAMPLE_SIZE, DEFAULT_WORKERS, Variant, replay
+from app.drafts import drafts
+from app.listing_export import ExportError, write_ndjson, write_parquet
+from app.listing_import import DEFAULT_CHUNK_SIZE, import_listings
+from app.listing_reindex import DEFAULT_BATCH_SIZE as REINDEX_BATCH_SIZE, reindex_listings
+from app.main import SessionLocal, init_db, vision_model_settings
+from app.synthesis_backfill import DEFAULT_BATCH_SIZE, backfill_synthesis
+
+
+def cmd_import(args) -> int:
+    init_db()
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as f:
+            report = import_listings(db, f, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+
+    for error in report["errors"]:
+        print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+    print(json.dumps({"imported": report["imported"], "failed": report["failed"]}))
+    return 1 if report["failed"] else 0
+
+
+def cmd_export(args) -> int:
+    fmt = args.format or ("parquet" if args.path.endswith(".parquet") else "ndjson")
+    db = SessionLocal()
+    try:
+        if fmt == "parquet":
+            count = write_parquet(db, args.path, include_images=args.include_images)
+        elif args.path == "-":
+            count = write_ndjson(db, sys.stdout.buffer, include_images=args.include_images)
+        else:
+            with open(args.path, "wb") as f:
+                count = write_ndjson(db, f, include_images=args.include_images)
+    except ExportError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+    print(json.dumps({"exported": count, "format": fmt}), file=sys.stderr)
+    return 0
+
+
+def cmd_purge_drafts(args) -> int:
+    db = SessionLocal()
+    try:
+        purged = drafts.purge_expired(db)
+    finally:
+        db.close()
+
+    print(json.dumps({"purged": purged}))
+    return 0
+
+
+def cmd_resynthesize(args) -> int:
+    def progress(report):
+        print(
+            f"{report['processed']} listings, {report['changed']} changed, {report['failed']} failed "
+            f"(up to ID {report['last_listing_id']}, {report['listings_per_second']}/s)",
+            file=sys.stderr,
+        )
+
+    db = SessionLocal()
+    try:
+        report = backfill_synthesis(
+            db,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            dedupe=not args.no_dedupe,
+            dry_run=args.dry_run,
+            checkpoint_path=args.checkpoint,
+            limit=args.limit,
+            progress=progress,
+        )
+    finally:
+        db.close()
+
+    print(json.dumps(report))
+    return 1 if report["failed"] else 0
+
+
+def cmd_reindex(args) -> int:
+    def progress(report):
+        print(
+            f"{report['reindexed']} listings reindexed "
+            f"(up to ID {report['last_listing_id']}, {report['listings_per_second']}/s)",
+            file=sys.stderr,
+        )
+
+    # Creates the index tables (and FTS table) on databases that predate them
+    init_db()
+    db = SessionLocal()
+    try:
+        report = reindex_listings(
+            db,
+            batch_size=args.batch_size,
+            missing_only=args.missing,
+            checkpoint_path=args.checkpoint,
+            limit=args.limit,
+            progress=progress,
+        )
+    finally:
+        db.close()
+
+    print(json.dumps(report))
+    return 0
+
+
+def _variant(model_type, model, prompt_file) -> Variant:
+    model_type, model_kwargs = vision_model_settings(model_type)
+    if model:
+        model_kwargs = {**model_kwargs, "model": model}
+    variant = Variant(model_type=model_type, model_kwargs=model_kwargs)
+    if prompt_file:
+        with open(prompt_file, encoding="utf-8") as f:
+            variant.prompt = f.read()
+    return variant
+
+
+def cmd_replay_analyses(args) -> int:
+    if not (args.prompt_file or args.model or args.model_type):
+        print("Nothing to compare: give --prompt-file, --model and/or --model-type", file=sys.stderr)
+        return 2
+    init_db()
+    report = replay(
+        SessionLocal,
+        baseline=_variant(None, args.baseline_model, args.baseline_prompt_file),
+        candidate=_variant(args.model_type, args.model, args.prompt_file),
+        sample_size=args.sample,
+        workers=args.workers,
+    )
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Bulk-import listings from an NDJSON file")
+    import_parser.add_argument("path", help="NDJSON file, one SaveListingRequest object per line")
+    import_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                               help=f"Listings per batch and commit (default: {DEFAULT_CHUNK_SIZE})")
+    import_parser.set_defaults(handler=cmd_import)
+
+    export_parser = commands.add_parser("export", help="Export all listings as NDJSON or Parquet")
+    export_parser.add_argument("path", help="Output file (\"-\" for NDJSON on stdout)")
+    export_parser.add_argument("--format", choices=("ndjson", "parquet"),
+                               help="Output format (default: from the file extension, else ndjson)")
+    export_parser.add_argument("--include-images", action="store_true", help="Include base64 image payloads")
+    export_parser.set_defaults(handler=cmd_export)
+
+    purge_parser = commands.add_parser("purge-drafts", help="Delete expired listing drafts")
+    purge_parser.set_defaults(handler=cmd_purge_drafts)
+
+    resynthesize_parser = commands.add_parser(
+        "resynthesize", help="Rebuild stored listing syntheses from the stored image analyses")
+    resynthesize_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                                     help=f"Listings per batch and commit (default: {DEFAULT_BATCH_SIZE})")
+    resynthesize_parser.add_argument("--workers", type=int,
+                                     help="Worker processes (0: none; default: CPU count)")
+    resynthesize_parser.add_argument("--checkpoint",
+                                     help="File recording progress; an existing one is resumed from")
+    resynthesize_parser.add_argument("--limit", type=int, help="Stop after about this many listings")
+    resynthesize_parser.add_argument("--no-dedupe", action="store_true",
+                                     help="Do not regroup near-duplicate photos (skips reading image data)")
+    resynthesize_parser.add_argument("--dry-run", action="store_true", help="Count changes without writing")
+    resynthesize_parser.set_defaults(handler=cmd_resynthesize)
+
+    reindex_parser = commands.add_parser(
+        "reindex", help="Rebuild the amenity, room-count and text search index rows of stored listings")
+    reindex_parser.add_argument("--batch-size", type=int, default=REINDEX_BATCH_SIZE,
+                                help=f"Listings per batch and commit (default: {REINDEX_BATCH_SIZE})")
+    reindex_parser.add_argument("--missing", action="store_true",
+                                help="Only listings without room counts or a search document")
+    reindex_parser.add_argument("--checkpoint",
+                                help="File recording progress; an existing one is resumed from")
+    reindex_parser.add_argument("--limit", type=int, help="Stop after about this many listings")
+    reindex_parser.set_defaults(handler=cmd_reindex)
+
+    replay_parser = commands.add_parser(
+        "replay-analyses", help="Compare a prompt or model against the current one on stored images")
+    replay_parser.add_argument("--prompt-file", help="Candidate prompt (default: the built-in prompt)")
+    replay_parser.add_argument("--model-type", choices=("openai", "anthropic", "mock", "simulated"),
+                               help="Candidate vision provider (default: as configured)")
+    replay_parser.add_argument("--model", help="Candidate model name, e.g. gpt-4.1-mini")
+    replay_parser.add_argument("--baseline-prompt-file", help="Baseline prompt (default: the built-in prompt)")
+    replay_parser.add_argument("--baseline-model", help="Baseline model name (default: as configured)")
+    replay_parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE_SIZE,
+                               help=f"Stored images to replay (default: {DEFAULT_SAMPLE_SIZE})")
+    replay_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                               help=f"Images analyzed concurrently (default: {DEFAULT_WORKERS})")
+    replay_parser.set_defaults(handler=cmd_replay_analyses)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
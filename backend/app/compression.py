@@ -0,0 +1,205 @@
+"""
+Response compression middleware.
+
+Compresses compressible responses (JSON, NDJSON, text, SVG) with brotli when
+the client accepts it and the optional `brotli` package is installed, else
+with gzip. Responses under `minimum_size`, already-encoded responses and
+binary media (images) pass through untouched. Streaming responses are
+compressed chunk by chunk, flushing after each chunk so NDJSON lines still
+arrive as they are produced.
+
+A strong `ETag` on a compressed response gets an encoding suffix
+(`"abc"` -> `"abc-gzip"`), since the compressed bytes are a different
+representation; `app.http_cache.etag_matches` accepts either form. The
+middleware leaves 304s alone, so it records the negotiated compression in the
+request scope (`negotiated_compression`) for handlers answering 304 to give
+it the ETag the 200 would have had.
+"""
+
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+ENCODING_SUFFIXES = {"br": "-br", "gzip": "-gzip"}
+
+# Request scope key of the NegotiatedCompression for the response
+SCOPE_KEY = "app.compression"
+
+
+def supported_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header.
+
+    The highest q-value wins; on ties brotli is preferred over gzip.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+@dataclass(frozen=True)
+class NegotiatedCompression:
+    """How `CompressionMiddleware` treats the responses to one request."""
+    encoding: str
+    minimum_size: int
+
+    def compresses(self, content_type: str, size: int) -> bool:
+        """Whether a complete body of this type and size is compressed."""
+        return is_compressible(content_type) and size >= self.minimum_size
+
+    def etag(self, etag: str) -> str:
+        """The ETag of the compressed representation (weak ETags are kept)."""
+        if etag.startswith("W/") or not etag.endswith('"'):
+            return etag
+        return f'{etag[:-1]}{ENCODING_SUFFIXES[self.encoding]}"'
+
+
+def negotiated_compression(scope: Scope) -> Optional[NegotiatedCompression]:
+    """The compression applied to this request's response; None if there is none."""
+    return scope.get(SCOPE_KEY)
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses by Accept-Encoding.
+
+    Args:
+        app: ASGI application
+        minimum_size: Smallest complete body worth compressing, in bytes
+        gzip_level: zlib compression level (1-9)
+        brotli_quality: brotli quality (0-11); 4-5 is a good speed/size
+            trade-off for dynamic responses
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        negotiated = scope[SCOPE_KEY] = NegotiatedCompression(encoding, self.minimum_size)
+
+        start: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start["headers"])
+                compressible = (
+                    start["status"] not in (204, 206, 304)
+                    and "content-encoding" not in headers
+                    and is_compressible(headers.get("content-type", ""))
+                )
+                if compressible:
+                    headers.add_vary_header("Accept-Encoding")
+                if not compressible or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                if "etag" in headers:
+                    headers["ETag"] = negotiated.etag(headers["etag"])
+                if more_body:
+                    del headers["content-length"]
+                else:
+                    body = compressor.compress(body, final=True)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start)
+
+            await send({
+                "type": "http.response.body",
+                "body": compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, send_compressed)
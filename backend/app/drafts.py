@@ -0,0 +1,293 @@
+"""
+Server-side draft state for the guided listing flow.
+
+Instead of resending the whole form as `current_data` on every step, a client
+creates a draft once and then sends only deltas. A draft holds the form
+state, the vision results made for it and the features detected so far.
+
+- drafts live in the `listing_drafts` table (SQLite or Postgres) and are
+  cached per process in an LRU of `DRAFT_CACHE_SIZE` entries (default 1024);
+  a cached copy is only used after a `SELECT version, expires_at` shows it is
+  still current, so other workers' writes are never hidden by the cache
+- every write bumps the draft's `version` with a compare-and-swap UPDATE; if
+  the cached copy is stale (another worker changed the draft), the draft is
+  reloaded and the change applied again instead of overwriting newer state
+- drafts expire `DRAFT_TTL_SECONDS` (default 7 days) after their last write;
+  expired drafts read as missing and are deleted by `purge_expired`, which
+  runs at startup (in the gunicorn master) and every
+  `DRAFT_PURGE_INTERVAL_SECONDS` (default 1 hour, 0 disables) in each worker
+"""
+
+import logging
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.models import ListingDraft
+
+logger = logging.getLogger(__name__)
+
+# Attempts at a compare-and-swap write before giving up
+MAX_WRITE_ATTEMPTS = 5
+
+
+class DraftNotFoundError(Exception):
+    """The draft does not exist or has expired."""
+    pass
+
+
+@dataclass(frozen=True)
+class Draft:
+    """Snapshot of a draft; shared with the cache, do not mutate."""
+    id: str
+    form_data: Dict[str, Any]
+    vision_results: List[Dict[str, Any]]
+    detected_features: Dict[str, Any]
+    version: int
+    expires_at: datetime
+
+
+def merge_patch(target: Dict[str, Any], patch: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a JSON merge patch (RFC 7396) to a copy of `target`.
+
+    Keys set to None are removed; nested objects are merged recursively.
+    """
+    result = dict(target)
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        elif isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = merge_patch(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def diff_patch(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """The merge patch that turns `before` into `after`."""
+    patch: Dict[str, Any] = {key: None for key in before if key not in after}
+    for key, value in after.items():
+        if key in before and before[key] == value:
+            continue
+        if isinstance(value, dict) and isinstance(before.get(key), dict):
+            patch[key] = diff_patch(before[key], value)
+        else:
+            patch[key] = value
+    return patch
+
+
+def merge_detected_features(features: Dict[str, Any], analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add one image analysis to a draft's detected features.
+
+    Amenities are unioned in detection order; per-amenity confidences keep the
+    highest value seen. The result is shaped like the `detected_features`
+    argument of `FieldSuggestionAlgorithm.suggest_fields`.
+    """
+    amenities = list(dict.fromkeys([*features.get("amenities", []), *(analysis.get("amenities") or [])]))
+    confidence = dict(features.get("amenities_confidence", {}))
+    for amenity, score in (analysis.get("amenities_confidence") or {}).items():
+        confidence[amenity] = max(confidence.get(amenity, 0.0), score)
+
+    merged = {**features, "amenities": amenities, "amenities_confidence": confidence}
+    if analysis.get("property_type"):
+        merged["property_type"] = analysis["property_type"]
+    return merged
+
+
+class DraftStore:
+    """
+    Draft persistence with a per-process LRU cache.
+
+    Methods take the caller's session and commit their own writes.
+
+    Args:
+        cache_size: Drafts kept in memory (default: `DRAFT_CACHE_SIZE`)
+        ttl_seconds: Lifetime after the last write (default: `DRAFT_TTL_SECONDS`)
+    """
+
+    def __init__(self, cache_size: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.cache_size = cache_size if cache_size is not None else int(os.getenv("DRAFT_CACHE_SIZE", "1024"))
+        self.ttl = timedelta(seconds=ttl_seconds if ttl_seconds is not None
+                             else int(os.getenv("DRAFT_TTL_SECONDS", str(7 * 24 * 3600))))
+        self._cache: "OrderedDict[str, Draft]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, db: Session, form_data: Optional[Dict[str, Any]] = None) -> Draft:
+        """Start a new draft, optionally with an initial form state."""
+        draft = Draft(
+            id=secrets.token_hex(16),
+            form_data=dict(form_data or {}),
+            vision_results=[],
+            detected_features={},
+            version=1,
+            expires_at=datetime.utcnow() + self.ttl,
+        )
+        db.add(ListingDraft(
+            id=draft.id,
+            form_data=draft.form_data,
+            vision_results=draft.vision_results,
+            detected_features=draft.detected_features,
+            version=draft.version,
+            expires_at=draft.expires_at,
+        ))
+        db.commit()
+        self._remember(draft)
+        return draft
+
+    def get(self, db: Session, draft_id: str) -> Draft:
+        """
+        Current state of a draft.
+
+        Raises:
+            DraftNotFoundError: If it does not exist or has expired
+        """
+        with self._lock:
+            draft = self._cache.get(draft_id)
+            if draft is not None:
+                self._cache.move_to_end(draft_id)
+        if draft is not None:
+            # Cheap check against the row: another worker may have written or deleted it
+            row = db.execute(
+                select(ListingDraft.version, ListingDraft.expires_at).where(ListingDraft.id == draft_id)
+            ).first()
+            if row is None:
+                self._forget(draft_id)
+                raise DraftNotFoundError(draft_id)
+            if row.version != draft.version:
+                draft = None
+        if draft is None:
+            draft = self._load(db, draft_id)
+        # expires_at is the row's own value here, never a stale cached one
+        if draft.expires_at <= datetime.utcnow():
+            self._delete_expired(db, draft_id)
+            raise DraftNotFoundError(draft_id)
+        return draft
+
+    def update(self, db: Session, draft_id: str, change: Callable[[Draft], Dict[str, Any]]) -> Draft:
+        """
+        Apply `change` to the draft and store the result.
+
+        Args:
+            db: Database session
+            draft_id: Draft to change
+            change: Maps the current draft to the new values of some of
+                `form_data`, `vision_results` and `detected_features`; it is
+                called again with the reloaded draft if another writer won
+
+        Raises:
+            DraftNotFoundError: If the draft does not exist or has expired
+        """
+        draft = self.get(db, draft_id)
+        for _ in range(MAX_WRITE_ATTEMPTS):
+            values = change(draft)
+            now = datetime.utcnow()
+            result = db.execute(
+                update(ListingDraft)
+                .where(ListingDraft.id == draft_id, ListingDraft.version == draft.version)
+                .values(**values, version=draft.version + 1, updated_at=now, expires_at=now + self.ttl)
+            )
+            db.commit()
+            if result.rowcount == 1:
+                updated = replace(draft, **values, version=draft.version + 1, expires_at=now + self.ttl)
+                self._remember(updated)
+                return updated
+            # Stale snapshot: another worker wrote first
+            self._forget(draft_id)
+            draft = self.get(db, draft_id)
+        raise RuntimeError(f"Draft {draft_id} kept changing during update")
+
+    def patch(
+        self,
+        db: Session,
+        draft_id: str,
+        form_data: Optional[Dict[str, Any]] = None,
+        detected_features: Optional[Dict[str, Any]] = None,
+    ) -> Draft:
+        """Merge-patch the form state and/or detected features."""
+        def change(draft: Draft) -> Dict[str, Any]:
+            values = {}
+            if form_data:
+                values["form_data"] = merge_patch(draft.form_data, form_data)
+            if detected_features:
+                values["detected_features"] = merge_patch(draft.detected_features, detected_features)
+            return values
+        return self.update(db, draft_id, change)
+
+    def record_step(
+        self,
+        db: Session,
+        draft_id: str,
+        form_patch: Dict[str, Any],
+        vision_result: Optional[Dict[str, Any]] = None,
+    ) -> Draft:
+        """Store the outcome of an analyze step: form changes and its image analysis, if any."""
+        def change(draft: Draft) -> Dict[str, Any]:
+            values: Dict[str, Any] = {"form_data": merge_patch(draft.form_data, form_patch)}
+            if vision_result is not None:
+                values["vision_results"] = [*draft.vision_results, vision_result]
+                values["detected_features"] = merge_detected_features(draft.detected_features, vision_result)
+            return values
+        return self.update(db, draft_id, change)
+
+    def delete(self, db: Session, draft_id: str) -> None:
+        self._forget(draft_id)
+        db.execute(delete(ListingDraft).where(ListingDraft.id == draft_id))
+        db.commit()
+
+    def _delete_expired(self, db: Session, draft_id: str) -> None:
+        # Conditional: leaves the draft alone if another worker extended it meanwhile
+        self._forget(draft_id)
+        db.execute(delete(ListingDraft).where(
+            ListingDraft.id == draft_id, ListingDraft.expires_at <= datetime.utcnow()
+        ))
+        db.commit()
+
+    def purge_expired(self, db: Session) -> int:
+        """Delete expired drafts; returns how many were removed."""
+        now = datetime.utcnow()
+        result = db.execute(delete(ListingDraft).where(ListingDraft.expires_at <= now))
+        db.commit()
+        with self._lock:
+            for draft_id in [d.id for d in self._cache.values() if d.expires_at <= now]:
+                del self._cache[draft_id]
+        return result.rowcount
+
+    def _load(self, db: Session, draft_id: str) -> Draft:
+        # Core select: the session's identity map may hold an older copy
+        row = db.execute(select(ListingDraft.__table__).where(ListingDraft.id == draft_id)).mappings().first()
+        if row is None:
+            raise DraftNotFoundError(draft_id)
+        draft = Draft(
+            id=row["id"],
+            form_data=row["form_data"] or {},
+            vision_results=row["vision_results"] or [],
+            detected_features=row["detected_features"] or {},
+            version=row["version"],
+            expires_at=row["expires_at"],
+        )
+        self._remember(draft)
+        return draft
+
+    def _remember(self, draft: Draft) -> None:
+        with self._lock:
+            self._cache[draft.id] = draft
+            self._cache.move_to_end(draft.id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _forget(self, draft_id: str) -> None:
+        with self._lock:
+            self._cache.pop(draft_id, None)
+
+
+# Global instance for convenience
+drafts = DraftStore()
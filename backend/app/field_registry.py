@@ -0,0 +1,431 @@
+"""
+Field registry for the AI-guided listing flow.
+
+All form field definitions live here and are compiled once at import into
+immutable lookup tables shared by `FieldOrchestrator` and
+`FieldSuggestionAlgorithm`:
+
+- field definitions by ID, with a prebuilt (frozen) `UIField` for each
+- per property type, the manifest fields pre-sorted by priority
+- per property type, the candidate fields the suggester considers and the
+  field config it returns for each
+
+Nothing in the registry may be mutated; callers that need to tweak a field
+(e.g. set a default) use `UIField.model_copy(update=...)`.
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from app.schemas import FieldOption, UIField
+
+# Priority of fields that don't declare one (lower number = asked earlier)
+DEFAULT_PRIORITY = 10
+
+# Define field configurations for different property types
+_PROPERTY_TYPE_FIELDS = {
+    "house": [
+        {
+            "id": "lot_size",
+            "component_type": "number",
+            "label": "Lot Size (sq ft)",
+            "min": 0,
+            "max": 100000,
+            "step": 100,
+            "required": False,
+        },
+        {
+            "id": "roof_age",
+            "component_type": "number",
+            "label": "Roof Age (years)",
+            "min": 0,
+            "max": 100,
+            "required": False,
+        },
+        {
+            "id": "garage",
+            "component_type": "select",
+            "label": "Garage Type",
+            "options": [
+                FieldOption(value="none", label="No Garage"),
+                FieldOption(value="attached", label="Attached"),
+                FieldOption(value="detached", label="Detached"),
+                FieldOption(value="carport", label="Carport"),
+            ],
+            "required": False,
+        },
+        {
+            "id": "stories",
+            "component_type": "number",
+            "label": "Number of Stories",
+            "min": 1,
+            "max": 10,
+            "default": 1,
+            "required": False,
+        }
+    ],
+    "apartment": [
+        {
+            "id": "floor_number",
+            "component_type": "number",
+            "label": "Floor Number",
+            "min": 1,
+            "max": 100,
+            "required": False,
+        },
+        {
+            "id": "elevator",
+            "component_type": "toggle",
+            "label": "Has Elevator",
+            "required": False,
+        },
+        {
+            "id": "building_age",
+            "component_type": "number",
+            "label": "Building Age (years)",
+            "min": 0,
+            "max": 200,
+            "required": False,
+        },
+        {
+            "id": "pets_allowed",
+            "component_type": "toggle",
+            "label": "Pets Allowed",
+            "required": False,
+        }
+    ],
+    "condo": [
+        {
+            "id": "condo_fees",
+            "component_type": "number",
+            "label": "Monthly Condo Fees",
+            "min": 0,
+            "max": 10000,
+            "step": 50,
+            "required": False,
+        },
+        {
+            "id": "amenities",
+            "component_type": "select",
+            "label": "Building Amenities",
+            "options": [
+                FieldOption(value="gym", label="Gym/Fitness"),
+                FieldOption(value="pool", label="Swimming Pool"),
+                FieldOption(value="concierge", label="Concierge"),
+                FieldOption(value="parking", label="Parking"),
+                FieldOption(value="storage", label="Storage"),
+            ],
+            "required": False,
+        }
+    ]
+}
+
+# Common fields that apply to all property types
+_COMMON_FIELDS = [
+    {
+        "id": "bedrooms",
+        "component_type": "number",
+        "label": "Number of Bedrooms",
+        "min": 0,
+        "max": 20,
+        "default": 2,
+        "required": True,
+        "priority": 1,
+    },
+    {
+        "id": "bathrooms",
+        "component_type": "number",
+        "label": "Number of Bathrooms",
+        "min": 0,
+        "max": 10,
+        "default": 1,
+        "required": True,
+        "priority": 2,
+    },
+    {
+        "id": "square_feet",
+        "component_type": "number",
+        "label": "Square Feet",
+        "min": 100,
+        "max": 50000,
+        "step": 50,
+        "required": True,
+        "priority": 3,
+    },
+    {
+        "id": "price",
+        "component_type": "number",
+        "label": "Price",
+        "min": 50000,
+        "max": 10000000,
+        "step": 1000,
+        "required": True,
+        "priority": 4,
+    },
+    {
+        "id": "address",
+        "component_type": "text",
+        "label": "Address",
+        "placeholder": "123 Main St, City, State",
+        "required": True,
+        "priority": 5,
+    },
+    {
+        "id": "description",
+        "component_type": "text",
+        "label": "Description",
+        "placeholder": "Describe your property...",
+        "required": False,
+        "priority": 6,
+    },
+    {
+        "id": "has_parking",
+        "component_type": "toggle",
+        "label": "Has Parking",
+        "required": False,
+        "priority": 7,
+    },
+    {
+        "id": "has_pool",
+        "component_type": "toggle",
+        "label": "Has Pool",
+        "required": False,
+        "priority": 8,
+    }
+]
+
+# First question of the flow, asked until the property type is known
+PROPERTY_TYPE_FIELD = UIField(
+    id="property_type",
+    component_type="select",
+    label="Tipul Proprietății",
+    placeholder="Selectați tipul proprietății",
+    options=[
+        FieldOption(value="house", label="Casă"),
+        FieldOption(value="apartment", label="Apartament"),
+        FieldOption(value="condo", label="Condominium"),
+        FieldOption(value="townhouse", label="Casă în Șir"),
+        FieldOption(value="land", label="Teren"),
+        FieldOption(value="commercial", label="Comercial"),
+    ],
+    required=True,
+)
+
+# --- Suggestion algorithm tables ---
+
+# Required fields by category (must be filled for a complete listing)
+REQUIRED_FIELDS = MappingProxyType({
+    'essential': ('property_type', 'address', 'price', 'bedrooms', 'bathrooms'),
+    'property_specific': MappingProxyType({
+        'house': ('lot_size', 'stories'),
+        'apartment': ('floor_number',),
+        'condo': ('condo_fees',),
+    }),
+})
+
+# High-value fields that significantly impact listing quality
+HIGH_VALUE_FIELDS = (
+    'square_feet', 'description', 'has_parking', 'has_pool',
+    'garage', 'building_age', 'amenities',
+)
+
+# Fields that should be suggested when corresponding features are detected
+FEATURE_FIELD_MAPPING = MappingProxyType({
+    'pool': ('has_pool', 'pool_type'),
+    'garage': ('has_parking', 'garage'),
+    'balcony': ('balcony_type',),
+    'fireplace': ('fireplace_type',),
+    'garden': ('garden_type',),
+    'elevator': ('elevator_type',),
+    'gym': ('gym_type',),
+    'security': ('security_system',),
+    'air_conditioning': ('ac_type',),
+    'hardwood_floors': ('flooring_type',),
+    'granite_counters': ('countertop_material',),
+})
+
+# Contextual field relationships
+CONTEXTUAL_RELATIONSHIPS = MappingProxyType({
+    'has_pool': ('pool_type', 'pool_maintenance'),
+    'has_parking': ('parking_type', 'parking_spaces'),
+    'property_type': MappingProxyType({  # Property type specific follow-ups
+        'house': ('lot_size', 'stories', 'roof_age', 'garage'),
+        'apartment': ('floor_number', 'elevator', 'pets_allowed'),
+        'condo': ('condo_fees', 'amenities', 'building_age'),
+    }),
+})
+
+# Suggester-only configs: its own property_type prompt and feature-specific fields
+_SUGGESTION_PROPERTY_TYPE_FIELD = {
+    'id': 'property_type',
+    'component_type': 'select',
+    'label': 'Property Type',
+    'placeholder': 'Select property type',
+    'options': [
+        {'value': 'house', 'label': 'House'},
+        {'value': 'apartment', 'label': 'Apartment'},
+        {'value': 'condo', 'label': 'Condo'},
+        {'value': 'townhouse', 'label': 'Townhouse'},
+    ],
+    'required': True,
+}
+
+_SUGGESTION_CUSTOM_FIELDS = {
+    'pool_type': {
+        'id': 'pool_type',
+        'component_type': 'select',
+        'label': 'Pool Type',
+        'options': [
+            {'value': 'chlorine', 'label': 'Chlorine'},
+            {'value': 'salt', 'label': 'Salt Water'},
+            {'value': 'natural', 'label': 'Natural/Organic'},
+        ],
+        'required': False,
+    },
+    'has_pool': {
+        'id': 'has_pool',
+        'component_type': 'toggle',
+        'label': 'Has Pool',
+        'required': False,
+    },
+    'garage': {
+        'id': 'garage',
+        'component_type': 'select',
+        'label': 'Garage Type',
+        'options': [
+            {'value': 'none', 'label': 'No Garage'},
+            {'value': 'attached', 'label': 'Attached'},
+            {'value': 'detached', 'label': 'Detached'},
+            {'value': 'carport', 'label': 'Carport'},
+        ],
+        'required': False,
+    },
+}
+
+
+def _freeze(config: Dict[str, Any]) -> Mapping[str, Any]:
+    """Read-only view of a field config; list values become tuples."""
+    return MappingProxyType({
+        key: tuple(_freeze(v) if isinstance(v, dict) else v for v in value) if isinstance(value, list) else value
+        for key, value in config.items()
+    })
+
+
+def _thaw(config: Mapping[str, Any]) -> Dict[str, Any]:
+    """Mutable copy of a frozen config (tuples back to lists)."""
+    return {
+        key: [_thaw(v) if isinstance(v, Mapping) else v for v in value] if isinstance(value, tuple) else value
+        for key, value in config.items()
+    }
+
+
+PROPERTY_TYPE_FIELDS: Mapping[str, Tuple[Mapping[str, Any], ...]] = MappingProxyType({
+    property_type: tuple(_freeze(field) for field in fields)
+    for property_type, fields in _PROPERTY_TYPE_FIELDS.items()
+})
+COMMON_FIELDS: Tuple[Mapping[str, Any], ...] = tuple(_freeze(field) for field in _COMMON_FIELDS)
+
+
+@dataclass(frozen=True)
+class FieldDefinition:
+    """A manifest field: its config, priority and prebuilt `UIField`."""
+    id: str
+    priority: int
+    config: Mapping[str, Any]
+    ui_field: UIField
+
+
+def _definition(config: Mapping[str, Any]) -> FieldDefinition:
+    return FieldDefinition(
+        id=config["id"],
+        priority=config.get("priority", DEFAULT_PRIORITY),
+        config=config,
+        ui_field=UIField(**config),
+    )
+
+
+def _dedupe(*groups) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(field_id for group in groups for field_id in group))
+
+
+class FieldRegistry:
+    """
+    Immutable, precompiled view of the field tables.
+
+    Everything is computed in `__init__`; lookups are dictionary gets.
+    Property types without specific fields (e.g. "townhouse", or None) use
+    the common fields only.
+    """
+
+    def __init__(self):
+        common = tuple(_definition(config) for config in COMMON_FIELDS)
+        self._by_property_type: Dict[Optional[str], Mapping[str, FieldDefinition]] = {}
+        self._manifest: Dict[Optional[str], Tuple[FieldDefinition, ...]] = {}
+        self._suggestion_candidates: Dict[Optional[str], Tuple[str, ...]] = {}
+        self._suggestion_configs: Dict[Optional[str], Mapping[str, Mapping[str, Any]]] = {}
+
+        contextual_fields = _dedupe(
+            CONTEXTUAL_RELATIONSHIPS['has_pool'],
+            CONTEXTUAL_RELATIONSHIPS['has_parking'],
+            *CONTEXTUAL_RELATIONSHIPS['property_type'].values(),
+        )
+        custom = {field_id: _freeze(config) for field_id, config in _SUGGESTION_CUSTOM_FIELDS.items()}
+        suggestion_property_type = _freeze(_SUGGESTION_PROPERTY_TYPE_FIELD)
+
+        for property_type in (None, *PROPERTY_TYPE_FIELDS):
+            specific = tuple(_definition(config) for config in PROPERTY_TYPE_FIELDS.get(property_type, ()))
+            # Stable sort: property-specific fields (default priority) follow the common ones
+            manifest = tuple(sorted(specific + common, key=lambda definition: definition.priority))
+            self._manifest[property_type] = manifest
+            self._by_property_type[property_type] = MappingProxyType(
+                {definition.id: definition for definition in manifest}
+            )
+
+            self._suggestion_candidates[property_type] = _dedupe(
+                REQUIRED_FIELDS['essential'],
+                REQUIRED_FIELDS['property_specific'].get(property_type, ()),
+                HIGH_VALUE_FIELDS,
+                *FEATURE_FIELD_MAPPING.values(),
+                contextual_fields,
+            )
+            # Same precedence as the suggester always had:
+            # property_type prompt > common > property-specific > custom
+            self._suggestion_configs[property_type] = MappingProxyType({
+                **custom,
+                **{definition.id: definition.config for definition in specific},
+                **{definition.id: definition.config for definition in common},
+                'property_type': suggestion_property_type,
+            })
+
+    def _key(self, property_type: Optional[str]) -> Optional[str]:
+        try:
+            return property_type if property_type in PROPERTY_TYPE_FIELDS else None
+        except TypeError:
+            # Unhashable value from a malformed form state
+            return None
+
+    def manifest_fields(self, property_type: Optional[str]) -> Tuple[FieldDefinition, ...]:
+        """Common and property-specific fields, sorted by priority."""
+        return self._manifest[self._key(property_type)]
+
+    def field(self, field_id: str, property_type: Optional[str] = None) -> Optional[FieldDefinition]:
+        """Manifest field definition by ID, or None."""
+        return self._by_property_type[self._key(property_type)].get(field_id)
+
+    def field_count(self, property_type: Optional[str]) -> int:
+        """Number of manifest fields for a property type."""
+        return len(self._manifest[self._key(property_type)])
+
+    def suggestion_candidates(self, property_type: Optional[str]) -> Tuple[str, ...]:
+        """Every field ID the suggester may propose, in a fixed order."""
+        return self._suggestion_candidates[self._key(property_type)]
+
+    def suggestion_config(self, field_id: str, property_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """A fresh, mutable copy of the config the suggester returns for a field."""
+        config = self._suggestion_configs[self._key(property_type)].get(field_id)
+        return _thaw(config) if config is not None else None
+
+
+# Built once at import and shared
+registry = FieldRegistry()
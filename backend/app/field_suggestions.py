@@ -10,6 +10,15 @@ from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
 
+from app.field_registry import (
+    CONTEXTUAL_RELATIONSHIPS,
+    FEATURE_FIELD_MAPPING,
+    HIGH_VALUE_FIELDS,
+    REQUIRED_FIELDS,
+    registry,
+)
+from app.suggestion_engine import get_suggestion_engine
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,47 +48,11 @@ class FieldSuggestionAlgorithm:
     def __init__(self):
         self.max_suggestions = 3
         
-        # Required fields by category (must be filled for a complete listing)
-        self.required_fields = {
-            'essential': ['property_type', 'address', 'price', 'bedrooms', 'bathrooms'],
-            'property_specific': {
-                'house': ['lot_size', 'stories'],
-                'apartment': ['floor_number'],
-                'condo': ['condo_fees'],
-            }
-        }
-        
-        # High-value fields that significantly impact listing quality
-        self.high_value_fields = [
-            'square_feet', 'description', 'has_parking', 'has_pool',
-            'garage', 'building_age', 'amenities'
-        ]
-        
-        # Fields that should be suggested when corresponding features are detected
-        self.feature_field_mapping = {
-            'pool': ['has_pool', 'pool_type'],
-            'garage': ['has_parking', 'garage'],
-            'balcony': ['balcony_type'],
-            'fireplace': ['fireplace_type'],
-            'garden': ['garden_type'],
-            'elevator': ['elevator_type'],
-            'gym': ['gym_type'],
-            'security': ['security_system'],
-            'air_conditioning': ['ac_type'],
-            'hardwood_floors': ['flooring_type'],
-            'granite_counters': ['countertop_material']
-        }
-        
-        # Contextual field relationships
-        self.contextual_relationships = {
-            'has_pool': ['pool_type', 'pool_maintenance'],
-            'has_parking': ['parking_type', 'parking_spaces'],
-            'property_type': {  # Property type specific follow-ups
-                'house': ['lot_size', 'stories', 'roof_age', 'garage'],
-                'apartment': ['floor_number', 'elevator', 'pets_allowed'],
-                'condo': ['condo_fees', 'amenities', 'building_age'],
-            }
-        }
+        # Field tables are shared, read-only registry data
+        self.required_fields = REQUIRED_FIELDS
+        self.high_value_fields = HIGH_VALUE_FIELDS
+        self.feature_field_mapping = FEATURE_FIELD_MAPPING
+        self.contextual_relationships = CONTEXTUAL_RELATIONSHIPS
     
     def suggest_fields(
         self, 
@@ -134,38 +107,8 @@ class FieldSuggestionAlgorithm:
         return missing_fields
     
     def _get_all_possible_fields(self, current_data: Dict[str, Any]) -> List[str]:
-        """Get all possible fields based on current form state."""
-        fields = set()
-        
-        # Essential fields (including property_type)
-        fields.update(self.required_fields['essential'])
-        
-        # Property-specific required fields
-        property_type = current_data.get('property_type')
-        if property_type and property_type in self.required_fields['property_specific']:
-            fields.update(self.required_fields['property_specific'][property_type])
-        
-        # High-value fields
-        fields.update(self.high_value_fields)
-        
-        # Feature-specific fields
-        for feature_fields in self.feature_field_mapping.values():
-            fields.update(feature_fields)
-        
-        # Contextual relationship fields
-        for relationship_fields in self.contextual_relationships.values():
-            if isinstance(relationship_fields, list):
-                fields.update(relationship_fields)
-            elif isinstance(relationship_fields, dict):
-                for prop_fields in relationship_fields.values():
-                    if isinstance(prop_fields, list):
-                        fields.update(prop_fields)
-        
-        # Always include property_type if not present (it's handled specially)
-        if 'property_type' not in current_data:
-            fields.add('property_type')
-        
-        return list(fields)
+        """Get all possible fields based on current form state (precomputed per property type)."""
+        return list(registry.suggestion_candidates(current_data.get('property_type')))
     
     def _prioritize_fields(
         self,
@@ -320,71 +263,7 @@ class FieldSuggestionAlgorithm:
     
     def _create_field_config(self, field_id: str, current_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Create field configuration based on field ID and current state."""
-        # Get field definition from orchestrator or create custom one
-        from app.orchestrator import COMMON_FIELDS, PROPERTY_TYPE_FIELDS
-        
-        # Special handling for property_type field
-        if field_id == 'property_type':
-            return {
-                'id': 'property_type',
-                'component_type': 'select',
-                'label': 'Property Type',
-                'placeholder': 'Select property type',
-                'options': [
-                    {'value': 'house', 'label': 'House'},
-                    {'value': 'apartment', 'label': 'Apartment'},
-                    {'value': 'condo', 'label': 'Condo'},
-                    {'value': 'townhouse', 'label': 'Townhouse'},
-                ],
-                'required': True,
-            }
-        
-        # Check common fields
-        for field in COMMON_FIELDS:
-            if field['id'] == field_id:
-                return field.copy()
-        
-        # Check property-specific fields
-        property_type = current_data.get('property_type')
-        if property_type and property_type in PROPERTY_TYPE_FIELDS:
-            for field in PROPERTY_TYPE_FIELDS[property_type]:
-                if field['id'] == field_id:
-                    return field.copy()
-        
-        # Create custom field configs for feature-specific fields
-        custom_configs = {
-            'pool_type': {
-                'id': 'pool_type',
-                'component_type': 'select',
-                'label': 'Pool Type',
-                'options': [
-                    {'value': 'chlorine', 'label': 'Chlorine'},
-                    {'value': 'salt', 'label': 'Salt Water'},
-                    {'value': 'natural', 'label': 'Natural/Organic'},
-                ],
-                'required': False,
-            },
-            'has_pool': {
-                'id': 'has_pool',
-                'component_type': 'toggle',
-                'label': 'Has Pool',
-                'required': False,
-            },
-            'garage': {
-                'id': 'garage',
-                'component_type': 'select',
-                'label': 'Garage Type',
-                'options': [
-                    {'value': 'none', 'label': 'No Garage'},
-                    {'value': 'attached', 'label': 'Attached'},
-                    {'value': 'detached', 'label': 'Detached'},
-                    {'value': 'carport', 'label': 'Carport'},
-                ],
-                'required': False,
-            },
-        }
-        
-        return custom_configs.get(field_id)
+        return registry.suggestion_config(field_id, current_data.get('property_type'))
 
 
 # Global instance for convenience
@@ -413,5 +292,5 @@ def suggest_fields(
     Returns:
         List of field suggestions
     """
-    suggester = get_field_suggester()
-    return suggester.suggest_fields(current_data, detected_features, confidence_threshold)
\ No newline at end of file
+    # Precompiled equivalent of FieldSuggestionAlgorithm.suggest_fields
+    return get_suggestion_engine().suggest(current_data, detected_features, confidence_threshold)
\ No newline at end of file
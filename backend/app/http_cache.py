@@ -0,0 +1,94 @@
+"""
+Strong ETags and conditional GET handling.
+
+Endpoints render their body once, derive a strong ETag from the bytes and
+answer `If-None-Match` with `304 Not Modified` when the client already has
+that representation:
+
+    return conditional_response(request, payload)
+
+`etag_matches` ignores the encoding suffix `CompressionMiddleware` appends to
+ETags of compressed responses, so revalidation works whichever encoding the
+client received. A 304 carries the ETag the 200 would have had (RFC 9110
+15.4.5), with that suffix when the 200 would have been compressed.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+from app.compression import ENCODING_SUFFIXES, is_compressible, negotiated_compression
+
+# Listings can change at any time: cache, but revalidate before each use
+REVALIDATE = "no-cache"
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    """Comparable form of an entity tag: weak prefix and encoding suffix removed."""
+    tag = etag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ENCODING_SUFFIXES.values():
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == wanted for candidate in if_none_match.split(","))
+
+
+def not_modified(request: Request, etag: str, cache_control: str, media_type: str, size: int) -> Response:
+    """
+    304 for a representation the client already has.
+
+    Args:
+        request: Incoming request (for the negotiated compression)
+        etag: ETag of the uncompressed body
+        cache_control: Cache-Control header value
+        media_type: Content type of the 200 response
+        size: Length of the uncompressed 200 body
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    compression = negotiated_compression(request.scope)
+    if compression is not None and is_compressible(media_type):
+        headers["Vary"] = "Accept-Encoding"
+        if compression.compresses(media_type, size):
+            headers["ETag"] = compression.etag(etag)
+    return Response(status_code=304, headers=headers)
+
+
+def conditional_response(
+    request: Request,
+    content: Any,
+    cache_control: str = REVALIDATE,
+) -> Response:
+    """
+    JSON response with a strong ETag; 304 when If-None-Match already matches.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        content: JSON-ready payload (no `jsonable_encoder` pass is made)
+        cache_control: Cache-Control header value
+    """
+    response = ORJSONResponse(content)
+    etag = compute_etag(response.body)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(request, etag, cache_control, response.media_type, len(response.body))
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
@@ -0,0 +1,107 @@
+"""
+Perceptual hashing for near-duplicate detection across a listing's images.
+
+Sellers often upload several nearly identical photos of the same room. A
+difference hash (dHash) of each preprocessed image lets `analyze_multiple_images`
+group those photos, call the vision model once per group and count the room
+once in the synthesis.
+
+dHash shrinks the image to 9x8 grayscale and records, per row, whether each
+pixel is brighter than its right neighbour. Re-encoding, resizing and small
+exposure changes flip only a few of the 64 bits, so near-duplicates are
+images whose hashes differ in at most `IMAGE_DUPLICATE_MAX_DISTANCE` bits
+(default 6; 0 disables grouping).
+"""
+
+import io
+import logging
+import os
+from typing import List, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+
+# Hashes with almost all bits equal come from flat images (solid colours,
+# blank walls, smooth gradients) that look alike without being the same
+# photo, so they are never grouped.
+MIN_HASH_BITS = 4
+
+
+def duplicate_max_distance() -> int:
+    return int(os.getenv("IMAGE_DUPLICATE_MAX_DISTANCE", "6"))
+
+
+def dhash(image_data: bytes, hash_size: int = HASH_SIZE) -> Optional[int]:
+    """
+    Compute the difference hash of an image.
+
+    Args:
+        image_data: Encoded image bytes
+        hash_size: Hash width/height in bits (the hash has hash_size**2 bits)
+
+    Returns:
+        The hash as an int, or None if the image cannot be decoded
+    """
+    try:
+        image = Image.open(io.BytesIO(image_data))
+        # Let the JPEG decoder downscale while decoding instead of after
+        image.draft("L", (hash_size * 4, hash_size * 4))
+        # One byte per pixel in "L" mode
+        pixels = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR).tobytes()
+    except Exception as e:
+        logger.warning(f"Perceptual hash failed: {e}")
+        return None
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def is_informative(value: Optional[int], bits: int = HASH_SIZE * HASH_SIZE) -> bool:
+    """Whether a hash has enough structure to be compared with others."""
+    if value is None:
+        return False
+    ones = bin(value).count("1")
+    return MIN_HASH_BITS <= ones <= bits - MIN_HASH_BITS
+
+
+def group_near_duplicates(hashes: List[Optional[int]], max_distance: Optional[int] = None) -> List[int]:
+    """
+    Assign every image to a group of near-duplicates.
+
+    Each image is compared with the first image (representative) of every
+    group found so far, in upload order.
+
+    Args:
+        hashes: Perceptual hash per image (None when unavailable)
+        max_distance: Maximum Hamming distance within a group
+            (default: `IMAGE_DUPLICATE_MAX_DISTANCE`)
+
+    Returns:
+        For each image, the index of its group's representative; images
+        without near-duplicates are their own representative
+    """
+    max_distance = duplicate_max_distance() if max_distance is None else max_distance
+    groups = []
+    representatives: List[int] = []
+    for i, value in enumerate(hashes):
+        group = i
+        if max_distance > 0 and is_informative(value):
+            for rep in representatives:
+                if hamming_distance(value, hashes[rep]) <= max_distance:
+                    group = rep
+                    break
+            else:
+                representatives.append(i)
+        groups.append(group)
+    return groups
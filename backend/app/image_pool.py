@@ -0,0 +1,174 @@
+"""
+Process-pool offload for CPU-heavy image preprocessing.
+
+PIL decode/resize/encode in `preprocess_image` is CPU-bound and partly holds
+the GIL, so running it on request threads competes with request handling and
+serializes a batch of photos onto one core. `ImagePreprocessPool` runs it in a
+dedicated pool of worker processes instead:
+
+- small images are handed to workers as pickled bytes over the pool's pipe;
+  large uploads are spooled to disk by `app.uploads` and only the file path
+  is sent, so the worker reads the full-resolution image itself
+- at most `max_pending` images are queued; callers block for up to
+  `queue_timeout` seconds when the queue is full (backpressure) and then
+  preprocess in-process rather than failing
+- if the pool cannot start or breaks, work falls back to in-process
+  preprocessing and the pool is recreated on the next call
+
+Configured with `IMAGE_POOL_WORKERS` (0 disables the pool, default: CPU count),
+`IMAGE_POOL_MAX_PENDING` (default: 4 per worker) and
+`IMAGE_POOL_QUEUE_TIMEOUT` (seconds, default 5).
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Union
+
+from app.metrics import IMAGE_PREPROCESS_MODE
+
+logger = logging.getLogger(__name__)
+
+# Raw image bytes, or the path of a file holding them
+ImageSource = Union[bytes, str]
+
+
+def _default_preprocess(source: ImageSource) -> bytes:
+    from app.vision_model import preprocess_image
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            source = f.read()
+    return preprocess_image(source)
+
+
+class ImagePreprocessPool:
+    """Bounded process pool for image preprocessing with in-process fallback."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        queue_timeout: float = 5.0,
+        func: Callable[[ImageSource], bytes] = _default_preprocess,
+    ):
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.max_pending = max_pending or max(self.max_workers, 1) * 4
+        self.queue_timeout = queue_timeout
+        self.func = func
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pid = os.getpid()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def submit(self, image_data: ImageSource) -> Future:
+        """
+        Queue one image for preprocessing.
+
+        Returns a future for the processed bytes. When the pool is disabled,
+        saturated past `queue_timeout`, or broken, the work is done inline and
+        an already-completed future is returned.
+        """
+        if not self.enabled or not self._slots.acquire(timeout=self.queue_timeout):
+            return self._run_inline(image_data, "inline" if not self.enabled else "queue_full")
+
+        try:
+            future = self._get_executor().submit(self.func, image_data)
+        except (BrokenProcessPool, RuntimeError, OSError) as e:
+            self._slots.release()
+            logger.warning(f"Image pool unavailable, preprocessing in-process: {e}")
+            self._discard_executor()
+            return self._run_inline(image_data, "fallback")
+
+        future.add_done_callback(lambda _: self._slots.release())
+        IMAGE_PREPROCESS_MODE.labels("pool").inc()
+        return future
+
+    def preprocess(self, image_data: ImageSource) -> bytes:
+        """Preprocess one image, waiting for the result."""
+        return self._result(self.submit(image_data), image_data)
+
+    def preprocess_many(self, images: List[ImageSource]) -> List[bytes]:
+        """Preprocess several images in parallel, preserving order."""
+        futures = [self.submit(image_data) for image_data in images]
+        return [self._result(future, image_data) for future, image_data in zip(futures, images)]
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _result(self, future: Future, image_data: ImageSource) -> bytes:
+        try:
+            return future.result()
+        except BrokenProcessPool as e:
+            logger.warning(f"Image pool worker died, preprocessing in-process: {e}")
+            self._discard_executor()
+            return self._run_inline(image_data, "fallback").result()
+        except Exception as e:
+            logger.warning(f"Pooled preprocessing failed, retrying in-process: {e}")
+            return self._run_inline(image_data, "fallback").result()
+
+    def _run_inline(self, image_data: ImageSource, mode: str) -> Future:
+        IMAGE_PREPROCESS_MODE.labels(mode).inc()
+        future: Future = Future()
+        try:
+            future.set_result(self.func(image_data))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Inherited across fork: the parent's pool processes are not ours
+                self._executor = None
+                self._pid = os.getpid()
+            if self._executor is None:
+                # forkserver/spawn avoid forking a multi-threaded server process
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(method),
+                )
+            return self._executor
+
+    def _discard_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global instance for convenience
+_image_pool = None
+_image_pool_lock = threading.Lock()
+
+def get_image_pool() -> ImagePreprocessPool:
+    """Get or create the global image preprocessing pool."""
+    global _image_pool
+    with _image_pool_lock:
+        if _image_pool is None:
+            workers = os.getenv("IMAGE_POOL_WORKERS")
+            max_pending = os.getenv("IMAGE_POOL_MAX_PENDING")
+            _image_pool = ImagePreprocessPool(
+                max_workers=int(workers) if workers else None,
+                max_pending=int(max_pending) if max_pending else None,
+                queue_timeout=float(os.getenv("IMAGE_POOL_QUEUE_TIMEOUT", "5")),
+            )
+        return _image_pool
+
+def shutdown_image_pool(wait: bool = True) -> None:
+    """Stop the global pool's worker processes (on app shutdown or after fork)."""
+    global _image_pool
+    with _image_pool_lock:
+        pool, _image_pool = _image_pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
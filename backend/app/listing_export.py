@@ -0,0 +1,178 @@
+"""
+Streaming listing export.
+
+Listings are read in batches with `yield_per` (a server-side cursor on
+Postgres) and each batch is released from the session once written, so
+memory stays constant however large the table is. Images and syntheses are
+loaded per batch with `selectinload`; image payloads (`image_data`) are
+deferred unless requested.
+
+Records use the `SaveListingRequest` shape plus `id`, `status` and
+timestamps, so an NDJSON export with images can be fed back to
+`app.listing_import`.
+
+Formats:
+- NDJSON: one JSON object per line (`iter_ndjson`, `write_ndjson`)
+- Parquet: one row per listing, `images` and `synthesis` as JSON strings
+  (`write_parquet`; needs the optional `parquet` extra, i.e. pyarrow)
+"""
+
+import json
+import logging
+from typing import Any, BinaryIO, Dict, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, defer, selectinload
+
+from app.models import Listing, ListingImage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+LISTING_COLUMNS = (
+    "id", "property_type", "price", "bedrooms", "bathrooms", "square_feet",
+    "address", "city", "state", "zip_code", "status", "created_at", "updated_at",
+)
+
+SYNTHESIS_COLUMNS = (
+    "total_rooms", "layout_type", "unified_description", "room_breakdown",
+    "property_overview", "interior_features", "exterior_features",
+)
+
+
+class ExportError(Exception):
+    """Raised when an export format cannot be produced."""
+    pass
+
+
+def listing_record(listing: Listing, include_images: bool = False) -> Dict[str, Any]:
+    """Export record for one listing (images and synthesis must be loaded)."""
+    record = {column: getattr(listing, column) for column in LISTING_COLUMNS}
+    for column in ("created_at", "updated_at"):
+        if record[column] is not None:
+            record[column] = record[column].isoformat()
+
+    images = []
+    for image in sorted(listing.images, key=lambda image: (image.order_index or 0, image.id)):
+        entry = {
+            "order_index": image.order_index,
+            "ai_analysis": {
+                "description": image.ai_description,
+                "rooms": image.detected_rooms,
+                "amenities": image.detected_amenities,
+                "property_type": image.property_type,
+                "style": image.style,
+                "condition": image.condition,
+            },
+        }
+        if include_images:
+            entry["image_data"] = image.image_data
+            entry["image_url"] = image.image_url
+        images.append(entry)
+    record["images"] = images
+
+    synthesis = listing.synthesis
+    record["synthesis"] = (
+        {column: getattr(synthesis, column) for column in SYNTHESIS_COLUMNS} if synthesis is not None else None
+    )
+    return record
+
+
+def iter_records(
+    db: Session,
+    include_images: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield export records for every listing, in id order.
+
+    Args:
+        db: Database session; exported listings are expunged after each batch
+        include_images: Include the base64 `image_data` of each image
+        batch_size: Listings fetched per round trip
+    """
+    image_options = selectinload(Listing.images)
+    if not include_images:
+        image_options = image_options.options(defer(ListingImage.image_data))
+    query = (
+        select(Listing)
+        .options(image_options, selectinload(Listing.synthesis))
+        .order_by(Listing.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for batch in db.scalars(query).partitions():
+        records = [listing_record(listing, include_images) for listing in batch]
+        # Drop the batch (and its cascaded images/synthesis) from the session
+        # so memory doesn't grow with the table
+        for listing in batch:
+            db.expunge(listing)
+        yield from records
+
+
+def iter_ndjson(db: Session, include_images: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+    """NDJSON export, one encoded line per listing."""
+    for record in iter_records(db, include_images, batch_size):
+        yield json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def write_ndjson(db: Session, out: BinaryIO, include_images: bool = False,
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Write an NDJSON export to a binary file; returns the number of listings."""
+    count = 0
+    for line in iter_ndjson(db, include_images, batch_size):
+        out.write(line)
+        count += 1
+    return count
+
+
+def write_parquet(db: Session, path: str, include_images: bool = False,
+                  batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Write a Parquet export, one row group per batch.
+
+    Returns:
+        Number of listings written
+
+    Raises:
+        ExportError: pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError(
+            "pyarrow package not installed. Install the parquet extra: pip install 'mobi-backend[parquet]'"
+        )
+
+    schema = pa.schema(
+        [
+            ("id", pa.int64()), ("property_type", pa.string()), ("price", pa.int64()),
+            ("bedrooms", pa.int64()), ("bathrooms", pa.float64()), ("square_feet", pa.int64()),
+            ("address", pa.string()), ("city", pa.string()), ("state", pa.string()),
+            ("zip_code", pa.string()), ("status", pa.string()), ("created_at", pa.string()),
+            ("updated_at", pa.string()), ("images", pa.string()), ("synthesis", pa.string()),
+        ]
+    )
+
+    count = 0
+    batch = []
+    with pq.ParquetWriter(path, schema) as writer:
+        def write_batch(records):
+            rows = [
+                {**record, "images": json.dumps(record["images"], ensure_ascii=False),
+                 "synthesis": json.dumps(record["synthesis"], ensure_ascii=False)
+                 if record["synthesis"] is not None else None}
+                for record in records
+            ]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+
+        for record in iter_records(db, include_images, batch_size):
+            batch.append(record)
+            count += 1
+            if len(batch) >= batch_size:
+                write_batch(batch)
+                batch = []
+        if batch:
+            write_batch(batch)
+    return count
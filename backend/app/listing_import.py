@@ -0,0 +1,281 @@
+"""
+Bulk listing import.
+
+Reads listings as NDJSON (one `SaveListingRequest` object per line) and
+writes them in chunks: each chunk is a handful of multi-row INSERTs
+(`listings`, `listing_images`, `listing_synthesis` and the amenity, room-count
+and search-document index rows) followed by one commit, instead of the
+per-row `add`/`flush` round trips `save_listing` does for a single listing.
+
+Invalid lines are reported with their line number and skipped; they never
+abort the import. If a chunk fails in the database, it is rolled back and
+retried one record at a time so only the offending records are reported.
+
+Used by `POST /api/listings/import` and `python -m app.cli import`.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.listing_index import amenity_ids, count_rooms, normalize_amenity
+from app.models import (
+    Listing,
+    ListingAmenity,
+    ListingImage,
+    ListingImageAmenity,
+    ListingRoomCounts,
+    ListingSearchDocument,
+    ListingSynthesis,
+)
+from app.schemas import SaveListingRequest
+from app.text_search import build_document, sync_fts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Errors kept in the report; the counts stay exact beyond this
+MAX_REPORTED_ERRORS = 1000
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'record'}: {item['msg']}" for item in error.errors()
+    )
+
+
+def parse_record(raw: Union[str, bytes]) -> SaveListingRequest:
+    """
+    Parse and validate one NDJSON line.
+
+    Raises:
+        ValueError: The line is not a valid listing (message says why)
+    """
+    try:
+        record = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(record, dict):
+        raise ValueError("Each line must be a JSON object")
+    try:
+        return SaveListingRequest(**record)
+    except ValidationError as e:
+        raise ValueError(_validation_message(e))
+
+
+class ListingImporter:
+    """
+    Accumulates validated listings and inserts them chunk by chunk.
+
+    Feed lines with `add`; whenever `ready` is true call `flush` (which
+    commits). `add_lines` does both for a batch of lines. Call `flush` once
+    more at the end and read `report()`.
+    """
+
+    def __init__(self, db: Session, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.db = db
+        self.chunk_size = chunk_size
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._pending: List[Tuple[int, SaveListingRequest]] = []
+
+    @property
+    def ready(self) -> bool:
+        return len(self._pending) >= self.chunk_size
+
+    def add(self, line_number: int, raw: Union[str, bytes]) -> None:
+        """Validate one line and queue it; blank lines are ignored."""
+        if not raw.strip():
+            return
+        try:
+            self._pending.append((line_number, parse_record(raw)))
+        except ValueError as e:
+            self._fail(line_number, str(e))
+
+    def add_lines(self, lines: Iterable[Tuple[int, Union[str, bytes]]]) -> None:
+        """`add` numbered lines, flushing whenever a chunk is ready."""
+        for line_number, raw in lines:
+            self.add(line_number, raw)
+            if self.ready:
+                self.flush()
+
+    def flush(self) -> None:
+        """Insert and commit everything queued so far."""
+        chunk, self._pending = self._pending, []
+        if not chunk:
+            return
+        try:
+            self._insert(chunk)
+            self.db.commit()
+            self.imported += len(chunk)
+        except Exception as e:
+            self.db.rollback()
+            if len(chunk) == 1:
+                logger.warning(f"Listing import failed on line {chunk[0][0]}: {e}")
+                self._fail(chunk[0][0], f"Database error: {e}")
+                return
+            logger.warning(f"Listing import chunk failed, retrying {len(chunk)} records one by one: {e}")
+            for item in chunk:
+                self._pending = [item]
+                self.flush()
+
+    def report(self) -> Dict[str, Any]:
+        return {"imported": self.imported, "failed": self.failed, "errors": self.errors}
+
+    def _fail(self, line_number: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_number, "error": message})
+
+    def _insert(self, chunk: List[Tuple[int, SaveListingRequest]]) -> None:
+        db = self.db
+        requests = [request for _, request in chunk]
+
+        listing_ids = db.scalars(
+            insert(Listing).returning(Listing.id, sort_by_parameter_order=True),
+            [_listing_values(request) for request in requests],
+        ).all()
+
+        image_rows = [
+            _image_values(listing_id, image)
+            for listing_id, request in zip(listing_ids, requests)
+            for image in request.images
+        ]
+        image_ids = db.scalars(
+            insert(ListingImage).returning(ListingImage.id, sort_by_parameter_order=True), image_rows
+        ).all()
+
+        synthesis_rows = [
+            _synthesis_values(listing_id, request)
+            for listing_id, request in zip(listing_ids, requests)
+            if request.synthesis is not None
+        ]
+        if synthesis_rows:
+            db.execute(insert(ListingSynthesis), synthesis_rows)
+
+        self._insert_index_rows(listing_ids, requests, image_rows, image_ids)
+
+    def _insert_index_rows(self, listing_ids, requests, image_rows, image_ids) -> None:
+        """Same rows `index_listing` and `index_listing_text` write, in bulk."""
+        db = self.db
+        images_by_listing: Dict[int, List[Tuple[int, dict]]] = {}
+        for image_id, row in zip(image_ids, image_rows):
+            images_by_listing.setdefault(row["listing_id"], []).append((image_id, row))
+
+        all_names = [name for row in image_rows for name in row["detected_amenities"] or []]
+        for request in requests:
+            if request.synthesis is not None:
+                all_names += request.synthesis.interior_features + request.synthesis.exterior_features
+        ids = amenity_ids(db, all_names, create=True)
+
+        def resolve(names: Iterable[str]) -> List[int]:
+            return sorted({ids[n] for n in (normalize_amenity(name) for name in names) if n in ids})
+
+        listing_amenities, image_amenities, room_rows, documents = [], [], [], []
+        for listing_id, request in zip(listing_ids, requests):
+            images = images_by_listing.get(listing_id, [])
+            synthesis = request.synthesis
+
+            names = [name for _, row in images for name in row["detected_amenities"] or []]
+            if synthesis is not None:
+                names += synthesis.interior_features + synthesis.exterior_features
+            listing_amenities += [{"listing_id": listing_id, "amenity_id": i} for i in resolve(names)]
+            for image_id, row in images:
+                image_amenities += [
+                    {"image_id": image_id, "amenity_id": i} for i in resolve(row["detected_amenities"] or [])
+                ]
+
+            counts = count_rooms(
+                synthesis.room_breakdown if synthesis is not None else None,
+                [row["detected_rooms"] for _, row in images],
+            )
+            room_rows.append({"listing_id": listing_id, **counts})
+
+            descriptions = [synthesis.unified_description] if synthesis is not None else []
+            descriptions += [row["ai_description"] for _, row in images]
+            documents.append((listing_id, build_document(descriptions)))
+
+        if listing_amenities:
+            db.execute(insert(ListingAmenity), listing_amenities)
+        if image_amenities:
+            db.execute(insert(ListingImageAmenity), image_amenities)
+        db.execute(insert(ListingRoomCounts), room_rows)
+        db.execute(
+            insert(ListingSearchDocument),
+            [{"listing_id": listing_id, "document": document} for listing_id, document in documents],
+        )
+        sync_fts(db, documents)
+
+
+def _listing_values(request: SaveListingRequest) -> dict:
+    return {
+        "property_type": request.property_type,
+        "price": request.price,
+        "bedrooms": request.bedrooms,
+        "bathrooms": request.bathrooms,
+        "square_feet": request.square_feet,
+        "address": request.address,
+        "city": request.city,
+        "state": request.state,
+        "zip_code": request.zip_code,
+        "status": "draft",
+    }
+
+
+def _image_values(listing_id: int, image) -> dict:
+    analysis = image.ai_analysis or {}
+    return {
+        "listing_id": listing_id,
+        "image_data": image.image_data,
+        "order_index": image.order_index,
+        "ai_description": analysis.get("description"),
+        "detected_rooms": analysis.get("rooms"),
+        "detected_amenities": analysis.get("amenities"),
+        "property_type": analysis.get("property_type"),
+        "style": analysis.get("style"),
+        "condition": analysis.get("condition"),
+    }
+
+
+def _synthesis_values(listing_id: int, request: SaveListingRequest) -> dict:
+    synthesis = request.synthesis
+    return {
+        "listing_id": listing_id,
+        "total_rooms": synthesis.total_rooms,
+        "layout_type": synthesis.layout_type,
+        "unified_description": synthesis.unified_description,
+        "room_breakdown": synthesis.room_breakdown,
+        "property_overview": synthesis.property_overview,
+        "interior_features": synthesis.interior_features,
+        "exterior_features": synthesis.exterior_features,
+    }
+
+
+def import_listings(
+    db: Session,
+    lines: Iterable[Union[str, bytes]],
+    chunk_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Import NDJSON listings.
+
+    Args:
+        db: Database session (committed once per chunk)
+        lines: NDJSON lines, e.g. an open file
+        chunk_size: Listings per INSERT batch and commit
+
+    Returns:
+        {"imported": n, "failed": n, "errors": [{"line": n, "error": "..."}]}
+    """
+    importer = ListingImporter(db, chunk_size or DEFAULT_CHUNK_SIZE)
+    importer.add_lines(enumerate(lines, start=1))
+    importer.flush()
+    return importer.report()
@@ -0,0 +1,191 @@
+"""
+Normalized amenity and room-count index for saved listings.
+
+Image analyses and syntheses keep their results as free-form JSON
+(`ListingImage.detected_amenities`, `ListingSynthesis.room_breakdown`, ...).
+`index_listing` copies them into typed, indexed tables when a listing is
+saved:
+
+- `amenities`: vocabulary of normalized amenity names with integer ids
+- `listing_amenities` / `listing_image_amenities`: junction rows per listing
+  and per image, indexed by (amenity_id, owner id)
+- `listing_room_counts`: one row of integer room counts per listing
+
+`amenity_filter` and `min_rooms_filter` build SQL predicates on those tables,
+so "listings with a pool and at least 3 bedrooms" is answered from indexes
+instead of parsing every row's JSON. Listings stored without these rows are
+indexed with `python -m app.cli reindex` (`app.listing_reindex`).
+"""
+
+import logging
+import re
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, false, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Amenity,
+    Listing,
+    ListingAmenity,
+    ListingImageAmenity,
+    ListingRoomCounts,
+)
+
+logger = logging.getLogger(__name__)
+
+# Different spellings the models and sellers use for the same amenity
+AMENITY_ALIASES = {
+    "swimming_pool": "pool",
+    "pool_area": "pool",
+    "jacuzzi": "hot_tub",
+    "garden_area": "garden",
+    "landscape": "landscaping",
+    "stainless_steel_appliances": "stainless_steel",
+}
+
+# room_breakdown key -> ListingRoomCounts column; anything else counts as "other"
+ROOM_COLUMNS = {
+    "bedroom": "bedrooms",
+    "bathroom": "bathrooms",
+    "kitchen": "kitchens",
+    "living_room": "living_rooms",
+    "dining_room": "dining_rooms",
+}
+
+
+def normalize_amenity(name: str) -> Optional[str]:
+    """Normalize an amenity name ("Swimming Pool" -> "pool"); None if empty."""
+    if not isinstance(name, str):
+        return None
+    normalized = re.sub(r"[^a-z0-9]+", "_", name.strip().lower()).strip("_")
+    if not normalized:
+        return None
+    return AMENITY_ALIASES.get(normalized, normalized)
+
+
+def amenity_ids(db: Session, names: Iterable[str], create: bool = False) -> Dict[str, int]:
+    """
+    Look up vocabulary ids for amenity names.
+
+    Args:
+        db: Database session
+        names: Amenity names (normalized here)
+        create: Add missing names to the vocabulary
+
+    Returns:
+        Mapping of normalized name to id; unknown names are left out unless
+        `create` is set
+    """
+    wanted = {n for n in (normalize_amenity(name) for name in names) if n}
+    if not wanted:
+        return {}
+    found = dict(db.execute(select(Amenity.name, Amenity.id).where(Amenity.name.in_(wanted))).all())
+    if create:
+        for name in sorted(wanted - found.keys()):
+            try:
+                # Savepoint: another worker may insert the same name concurrently
+                with db.begin_nested():
+                    amenity = Amenity(name=name)
+                    db.add(amenity)
+                    db.flush()
+                found[name] = amenity.id
+            except IntegrityError:
+                found[name] = db.execute(select(Amenity.id).where(Amenity.name == name)).scalar_one()
+    return found
+
+
+def room_counts(listing: Listing) -> Dict[str, int]:
+    """
+    Typed room counts for a listing.
+
+    Uses the synthesis `room_breakdown` when there is one (it already counts
+    near-duplicate photos once), otherwise sums the per-image `detected_rooms`.
+    """
+    return count_rooms(
+        listing.synthesis.room_breakdown if listing.synthesis is not None else None,
+        [image.detected_rooms for image in listing.images],
+    )
+
+
+def count_rooms(synthesis_breakdown: Optional[dict], image_rooms: Iterable[Optional[dict]]) -> Dict[str, int]:
+    """Room counts from a synthesis breakdown, falling back to per-image rooms."""
+    if synthesis_breakdown:
+        breakdowns = [synthesis_breakdown]
+    else:
+        breakdowns = [rooms for rooms in image_rooms if rooms]
+
+    counts = {column: 0 for column in ROOM_COLUMNS.values()}
+    counts["other_rooms"] = 0
+    for breakdown in breakdowns:
+        for room_type, count in breakdown.items():
+            if not isinstance(count, (int, float)) or count <= 0:
+                continue
+            counts[ROOM_COLUMNS.get(room_type, "other_rooms")] += int(count)
+    counts["total_rooms"] = sum(counts.values())
+    return counts
+
+
+def index_listing(db: Session, listing: Listing) -> None:
+    """
+    (Re)build the normalized amenity and room-count rows for a listing.
+
+    Call after the listing, its images and synthesis have been flushed; the
+    caller commits. Existing index rows for the listing are replaced.
+
+    Args:
+        db: Database session
+        listing: Listing with images (and optionally synthesis) loaded
+    """
+    image_amenities = {image.id: image.detected_amenities or [] for image in listing.images}
+    listing_amenities: List[str] = [name for names in image_amenities.values() for name in names]
+    if listing.synthesis is not None:
+        listing_amenities += listing.synthesis.interior_features or []
+        listing_amenities += listing.synthesis.exterior_features or []
+
+    ids = amenity_ids(db, listing_amenities, create=True)
+
+    listing.amenity_links = [
+        ListingAmenity(listing_id=listing.id, amenity_id=amenity_id)
+        for amenity_id in sorted(set(ids.values()))
+    ]
+    for image in listing.images:
+        image_ids = {ids[n] for n in (normalize_amenity(name) for name in image_amenities[image.id]) if n}
+        image.amenity_links = [
+            ListingImageAmenity(image_id=image.id, amenity_id=amenity_id) for amenity_id in sorted(image_ids)
+        ]
+
+    counts = room_counts(listing)
+    if listing.room_counts is None:
+        listing.room_counts = ListingRoomCounts(listing_id=listing.id, **counts)
+    else:
+        for column, value in counts.items():
+            setattr(listing.room_counts, column, value)
+
+
+def amenity_filter(db: Session, names: Iterable[str]):
+    """
+    SQL predicate on `Listing` requiring every amenity in `names`.
+
+    Each amenity becomes an `id IN (...)` subquery answered from the
+    (amenity_id, listing_id) index, so listings are looked up by primary key
+    rather than scanned. Unknown amenities match no listing.
+    """
+    names = [n for n in (normalize_amenity(name) for name in names) if n]
+    ids = amenity_ids(db, names)
+    if len(ids) < len(set(names)):
+        return false()
+    return and_(*(
+        Listing.id.in_(select(ListingAmenity.listing_id).where(ListingAmenity.amenity_id == amenity_id))
+        for amenity_id in ids.values()
+    ))
+
+
+def min_rooms_filter(**minimums: int):
+    """
+    SQL predicate on `Listing` for detected room counts, e.g.
+    `min_rooms_filter(bedrooms=3)`. Keys are `ListingRoomCounts` columns.
+    """
+    conditions = [getattr(ListingRoomCounts, column) >= value for column, value in minimums.items()]
+    return Listing.id.in_(select(ListingRoomCounts.listing_id).where(*conditions))
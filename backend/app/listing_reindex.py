@@ -0,0 +1,129 @@
+"""
+Rebuild the derived index rows of stored listings.
+
+`save_listing` and the bulk import index a listing as it is written, but
+listings saved before an index existed have no rows in it: no
+`listing_amenities` / `listing_room_counts` rows (`app.listing_index`), so
+amenity and detected-room filters miss them, and no `listing_search_documents`
+or FTS row (`app.text_search`), so text search never finds them.
+
+`reindex_listings` walks the listings in ID order (keyset pagination), runs
+`index_listing` and `index_listing_text` for each and commits once per batch.
+After each committed batch the last listing ID is written to a checkpoint
+file, so an interrupted run resumes after it. With `missing_only`, listings
+that already have both a room-count row and a search document are skipped.
+
+Used by `python -m app.cli reindex`.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from app.listing_index import index_listing
+from app.models import Listing, ListingImage, ListingRoomCounts, ListingSearchDocument
+from app.synthesis_backfill import read_checkpoint, write_checkpoint
+from app.text_search import index_listing_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+
+
+def reindex(db: Session, listing_ids: List[int]) -> int:
+    """
+    Rebuild the amenity, room-count and search-document rows of listings.
+
+    The caller commits. The session's identity map is cleared afterwards.
+
+    Returns:
+        Number of listings reindexed
+    """
+    listings = db.scalars(
+        select(Listing)
+        .where(Listing.id.in_(listing_ids))
+        .options(
+            selectinload(Listing.images).selectinload(ListingImage.amenity_links),
+            selectinload(Listing.synthesis),
+            selectinload(Listing.amenity_links),
+            selectinload(Listing.room_counts),
+            selectinload(Listing.search_document),
+        )
+        .execution_options(populate_existing=True)
+    ).all()
+    for listing in listings:
+        index_listing(db, listing)
+        index_listing_text(db, listing)
+    db.flush()
+    # Keep the session's identity map from growing over the whole run
+    db.expunge_all()
+    return len(listings)
+
+
+def reindex_listings(
+    db: Session,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    missing_only: bool = False,
+    checkpoint_path: Optional[str] = None,
+    limit: Optional[int] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Reindex stored listings batch by batch, resuming from `checkpoint_path`
+    if it exists.
+
+    Args:
+        db: Database session (committed once per batch)
+        batch_size: Listings per batch and commit
+        missing_only: Only listings without a room-count row or search document
+        checkpoint_path: File recording the last committed listing ID
+        limit: Stop after about this many listings (whole batches)
+        progress: Called with the report after every batch
+
+    Returns:
+        {"reindexed", "last_listing_id", "elapsed_seconds", "listings_per_second"}
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    last_listing_id = read_checkpoint(checkpoint_path) if checkpoint_path else 0
+    if last_listing_id:
+        logger.info(f"Resuming reindex after listing {last_listing_id}")
+    reindexed = 0
+    started = time.monotonic()
+
+    def report() -> Dict[str, Any]:
+        elapsed = time.monotonic() - started
+        return {
+            "reindexed": reindexed,
+            "last_listing_id": last_listing_id,
+            "elapsed_seconds": round(elapsed, 3),
+            "listings_per_second": round(reindexed / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    query = select(Listing.id).order_by(Listing.id).limit(batch_size)
+    if missing_only:
+        query = query.where(
+            ~select(ListingRoomCounts.listing_id).where(ListingRoomCounts.listing_id == Listing.id).exists()
+            | ~select(ListingSearchDocument.listing_id).where(ListingSearchDocument.listing_id == Listing.id).exists()
+        )
+
+    while limit is None or reindexed < limit:
+        listing_ids = db.scalars(query.where(Listing.id > last_listing_id)).all()
+        if not listing_ids:
+            break
+        try:
+            reindexed += reindex(db, listing_ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        last_listing_id = listing_ids[-1]
+        if checkpoint_path:
+            write_checkpoint(checkpoint_path, last_listing_id)
+        if progress is not None:
+            progress(report())
+    return report()
@@ -0,0 +1,161 @@
+"""
+WebSocket session protocol for the guided listing flow.
+
+`/ws/listing-session` keeps the form state server-side for the life of the
+connection, so each interaction sends only what changed instead of the whole
+`current_data`, and images arrive as raw binary frames instead of base64.
+
+Client -> server, JSON text frames (an optional "id" is echoed in replies):
+- `{"type": "update", "fields": {...}}`: set fields; `null` removes a field
+- `{"type": "text", "text": "..."}`: free-text input, as `input_type='text'`
+- `{"type": "image_start"}`, then the image as one or more binary frames,
+  then `{"type": "image_end"}` to analyze it
+- `{"type": "sync"}`: resend the full form state and manifest
+
+Server -> client:
+- `{"type": "manifest", "changes": {...}, "removed": [...], "ui_schema": [...],
+  "ai_message", "step_number", "completion_percentage"}`: `changes` and
+  `removed` are the server's own edits on top of the client's delta (e.g.
+  fields extracted from an image); `ui_schema` is left out when it is the
+  same as in the previous manifest
+- `{"type": "vision", "status": "analyzing"}` as soon as an image is complete,
+  then `{"type": "vision", "status": "done", "analysis": {...}}` before the
+  manifest for that image
+- `{"type": "error", "detail": "..."}`: the message was rejected; the session
+  and its state stay as they were
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.schemas import AnalyzeStepRequest, AnalyzeStepResponse
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class SessionError(Exception):
+    """Invalid client message; reported to the client as an error event."""
+    pass
+
+
+class ListingSession:
+    """
+    Server-side state of one guided listing WebSocket connection.
+
+    Args:
+        analyze: Processes one step, with the signature of `main._analyze_step`
+        max_image_bytes: Largest image accepted over the session
+    """
+
+    def __init__(self, analyze: Callable[..., AnalyzeStepResponse], max_image_bytes: int):
+        self.state: Dict[str, Any] = {}
+        self._analyze = analyze
+        self._max_image_bytes = max_image_bytes
+        self._image: Optional[bytearray] = None
+        self._last_schema: Optional[List[Dict[str, Any]]] = None
+
+    def receive_bytes(self, chunk: bytes) -> Optional[Dict[str, Any]]:
+        """Buffer one binary image frame; returns an error event if it is rejected."""
+        if self._image is None:
+            return {"type": "error", "detail": "Trimiteți image_start înainte de datele imaginii"}
+        if len(self._image) + len(chunk) > self._max_image_bytes:
+            self._image = None
+            return {"type": "error", "detail": "Imaginea depășește dimensiunea maximă permisă"}
+        self._image.extend(chunk)
+        return None
+
+    async def handle(self, text: str) -> AsyncIterator[Dict[str, Any]]:
+        """Process one JSON message and yield the events to send back."""
+        message_id = _MISSING
+        try:
+            try:
+                message = json.loads(text)
+            except ValueError:
+                raise SessionError("Mesaj JSON invalid")
+            if not isinstance(message, dict):
+                raise SessionError("Mesajul trebuie să fie un obiect JSON")
+            message_id = message.get("id", _MISSING)
+
+            async for event in self._dispatch(message):
+                if message_id is not _MISSING:
+                    event["id"] = message_id
+                yield event
+        except SessionError as e:
+            event = {"type": "error", "detail": str(e)}
+            if message_id is not _MISSING:
+                event["id"] = message_id
+            yield event
+
+    async def _dispatch(self, message: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        message_type = message.get("type")
+
+        if message_type == "update":
+            fields = message.get("fields")
+            if not isinstance(fields, dict):
+                raise SessionError("'fields' trebuie să fie un obiect")
+            state = dict(self.state)
+            for field_id, value in fields.items():
+                if value is None:
+                    state.pop(field_id, None)
+                else:
+                    state[field_id] = value
+            yield await self._step(AnalyzeStepRequest(current_data=state, input_type="field_update"))
+
+        elif message_type == "text":
+            text = message.get("text")
+            if not isinstance(text, str):
+                raise SessionError("'text' trebuie să fie un șir de caractere")
+            yield await self._step(AnalyzeStepRequest(current_data=self.state, new_input=text, input_type="text"))
+
+        elif message_type == "image_start":
+            self._image = bytearray()
+
+        elif message_type == "image_end":
+            if not self._image:
+                self._image = None
+                raise SessionError("Nu a fost primită nicio imagine")
+            image_data, self._image = bytes(self._image), None
+            yield {"type": "vision", "status": "analyzing", "bytes": len(image_data)}
+            request = AnalyzeStepRequest(current_data=self.state, input_type="image")
+            response = await run_in_threadpool(self._analyze, request, image_data=image_data)
+            yield {"type": "vision", "status": "done", "analysis": response.vision_analysis}
+            yield self._apply(dict(self.state), response)
+
+        elif message_type == "sync":
+            self._last_schema = None
+            event = await self._step(AnalyzeStepRequest(current_data=self.state, input_type="field_update"))
+            event["state"] = self.state
+            yield event
+
+        else:
+            raise SessionError(f"Tip de mesaj necunoscut: {message_type}")
+
+    async def _step(self, request: AnalyzeStepRequest) -> Dict[str, Any]:
+        response = await run_in_threadpool(self._analyze, request)
+        return self._apply(request.current_data, response)
+
+    def _apply(self, submitted: Dict[str, Any], response: AnalyzeStepResponse) -> Dict[str, Any]:
+        """Store the step's form state and build the manifest event for it."""
+        extracted = response.extracted_data
+        self.state = dict(extracted)
+
+        event: Dict[str, Any] = {
+            "type": "manifest",
+            "changes": {
+                key: value for key, value in extracted.items()
+                if key not in submitted or submitted[key] != value
+            },
+            "removed": [key for key in submitted if key not in extracted],
+            "ai_message": response.ai_message,
+            "step_number": response.step_number,
+            "completion_percentage": response.completion_percentage,
+        }
+        ui_schema = [field.model_dump() for field in response.ui_schema]
+        if ui_schema != self._last_schema:
+            event["ui_schema"] = self._last_schema = ui_schema
+        return event
@@ -0,0 +1,290 @@
+"""
+Translation tables and compiled text templates.
+
+Property descriptions (`generate_unified_description`) and orchestrator AI
+messages are rendered from the per-locale catalogs below. Catalogs are
+frozen once at import: lookups are plain mapping reads, and templates are
+parsed and checked up front, so rendering costs one `str.format` per phrase
+(thousands of descriptions per second for backfills).
+
+The default locale is `MOBI_LOCALE` (default `ro`); every render function
+also takes an explicit `locale`. Unknown locales fall back to the default.
+"""
+
+import logging
+import os
+from string import Formatter
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledTemplate:
+    """A `str.format` template whose placeholders were checked at load time."""
+
+    __slots__ = ("source", "fields", "render")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.fields = frozenset(name for _, name, _, _ in Formatter().parse(source) if name is not None)
+        if "" in self.fields or any(not name.isidentifier() for name in self.fields):
+            raise ValueError(f"Template placeholders must be named: {source!r}")
+        self.render = source.format
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({self.source!r})"
+
+
+_CATALOGS = {
+    "ro": {
+        "property_type": {
+            'apartment': 'apartament',
+            'house': 'casă',
+            'condo': 'condominium',
+            'townhouse': 'casă în șir',
+            'land': 'teren',
+            'commercial': 'proprietate comercială',
+        },
+        "room_type": {
+            'bedroom': 'Dormitor',
+            'kitchen': 'Bucătărie',
+            'living_room': 'Sufragerie',
+            'bathroom': 'Baie',
+            'hallway': 'Hol',
+            'dining_room': 'Cameră de Mâncare',
+            'office': 'Birou',
+            'balcony': 'Balcon',
+            'open_concept_space': 'Spațiu Open-Concept',
+        },
+        "feature": {
+            'balcony': 'balcon',
+            'garage': 'garaj',
+            'garden': 'grădină',
+            'pool': 'piscină',
+            'patio': 'patio',
+            'deck': 'terasă',
+            'outdoor living space': 'spațiu de locuit în aer liber',
+            'landscaping': 'peisagistică',
+            'parking': 'parcare',
+        },
+        "style": {
+            'modern': 'modern',
+            'traditional': 'tradițional',
+            'contemporary': 'contemporan',
+            'rustic': 'rustic',
+            'industrial': 'industrial',
+            'minimalist': 'minimalist',
+        },
+        "amenity": {
+            'hardwood_floors': 'parchet',
+            'granite_counters': 'blat de granit',
+            'stainless_steel': 'oțel inoxidabil',
+            'fireplace': 'șemineu',
+            'dishwasher': 'mașină de spălat vase',
+            'large_window': 'fereastră mare',
+            'tile_floors': 'gresie',
+            'bathtub': 'cadă',
+            'updated_fixtures': 'obiecte sanitare actualizate',
+            'chandelier': 'candelabru',
+        },
+        # Amenities named in descriptions with their own phrase, in this order
+        "highlight": {
+            'granite_counters': 'blat de granit',
+            'stainless_steel': 'aparate din oțel inoxidabil',
+            'fireplace': 'șemineu',
+            'dishwasher': 'mașină de spălat vase',
+        },
+        "template": {
+            'no_rooms': "Nu au fost detectate camere în imaginile furnizate.",
+            'hardwood_everywhere': "parchet în toate camerele",
+            'open_concept': "Acest {property_type} prezintă un design open-concept",
+            'open_concept_areas': " cu zone de {rooms}",
+            'with_rooms': "Acest {property_type} include {rooms}",
+            'without_rooms': "Acest {property_type}",
+            'features': ". Caracteristici includ {features}",
+            'exterior': ". Caracteristici exterioare includ {features}",
+            'style': ". Stil general: {style}",
+            'message_no_property_type': "Să începem prin a identifica ce tip de proprietate afișați.",
+            'message_early': "Excelent! Am identificat că este vorba despre un {property_type}. Să continuăm cu detaliile esențiale.",
+            'message_middle': "Faceți progrese bune! Încă câteva detalii cheie pentru anunțul dvs.",
+            'message_late': "Aproape gata! Permiteți-mi să completez informațiile finale.",
+            'message_complete': "Perfect! Ați completat toate informațiile necesare. Sunteți gata să previzualizați și să salvați anunțul?",
+        },
+    },
+    "en": {
+        "property_type": {
+            'apartment': 'apartment',
+            'house': 'house',
+            'condo': 'condo',
+            'townhouse': 'townhouse',
+            'land': 'land plot',
+            'commercial': 'commercial property',
+        },
+        "room_type": {
+            'open_concept_space': 'Open-Concept Space',
+        },
+        "feature": {},
+        "style": {},
+        "amenity": {
+            'granite_counters': 'granite countertops',
+            'stainless_steel': 'stainless steel',
+            'tile_floors': 'tile floors',
+            'updated_fixtures': 'updated fixtures',
+        },
+        "highlight": {
+            'granite_counters': 'granite countertops',
+            'stainless_steel': 'stainless steel appliances',
+            'fireplace': 'a fireplace',
+            'dishwasher': 'a dishwasher',
+        },
+        "template": {
+            'no_rooms': "No rooms were detected in the provided images.",
+            'hardwood_everywhere': "hardwood floors throughout",
+            'open_concept': "This {property_type} has an open-concept design",
+            'open_concept_areas': " with {rooms} areas",
+            'with_rooms': "This {property_type} includes {rooms}",
+            'without_rooms': "This {property_type}",
+            'features': ". Features include {features}",
+            'exterior': ". Exterior features include {features}",
+            'style': ". Overall style: {style}",
+            'message_no_property_type': "Let's start by identifying what type of property you are listing.",
+            'message_early': "Great! Property type: {property_type}. Let's continue with the essential details.",
+            'message_middle': "Good progress! A few more key details for your listing.",
+            'message_late': "Almost done! Let me fill in the final information.",
+            'message_complete': "Perfect! You have filled in all the required information. Ready to preview and save your listing?",
+        },
+    },
+}
+
+DEFAULT_LOCALE = os.getenv("MOBI_LOCALE", "ro")
+
+
+class Locale:
+    """Frozen translation tables and compiled templates for one locale."""
+
+    def __init__(self, code: str, catalog: Mapping[str, Mapping[str, str]]):
+        self.code = code
+        self.property_types = MappingProxyType(dict(catalog["property_type"]))
+        self.room_types = MappingProxyType(dict(catalog["room_type"]))
+        self.features = MappingProxyType(dict(catalog["feature"]))
+        self.styles = MappingProxyType(dict(catalog["style"]))
+        self.amenities = MappingProxyType(dict(catalog["amenity"]))
+        self.highlights = MappingProxyType(dict(catalog["highlight"]))
+        self.templates = MappingProxyType({
+            key: CompiledTemplate(source) for key, source in catalog["template"].items()
+        })
+
+    # Unknown keys fall back to a readable form of the key
+
+    def property_type(self, property_type: Optional[str]) -> Optional[str]:
+        return self.property_types.get(property_type, property_type)
+
+    def room_type(self, room_type: str) -> str:
+        return self.room_types.get(room_type) or room_type.replace('_', ' ').title()
+
+    def feature(self, feature: str) -> str:
+        return self.features.get(feature.lower(), feature)
+
+    def style(self, style: str) -> str:
+        return self.styles.get(style.lower(), style)
+
+    def amenity(self, amenity: str) -> str:
+        return self.amenities.get(amenity) or amenity.replace('_', ' ')
+
+    def render(self, key: str, **values: Any) -> str:
+        return self.templates[key].render(**values)
+
+
+_LOCALES = MappingProxyType({code: Locale(code, catalog) for code, catalog in _CATALOGS.items()})
+
+if DEFAULT_LOCALE not in _LOCALES:
+    logger.warning(f"Unknown MOBI_LOCALE {DEFAULT_LOCALE!r}, using 'ro'")
+    DEFAULT_LOCALE = "ro"
+
+
+def available_locales() -> Iterable[str]:
+    return tuple(_LOCALES)
+
+
+def get_locale(code: Optional[str] = None) -> Locale:
+    """Catalog for `code` (default: `MOBI_LOCALE`); unknown codes get the default."""
+    return _LOCALES.get(code or DEFAULT_LOCALE) or _LOCALES[DEFAULT_LOCALE]
+
+
+def render_description(
+    total_rooms: int,
+    room_breakdown: dict,
+    amenities: list,
+    materials: list,
+    property_type: Optional[str],
+    style: Optional[str],
+    analyses: list,
+    layout_type: str = "traditional",
+    exterior_features: Optional[list] = None,
+    open_concept_detected: bool = False,
+    interior_analyses: Optional[list] = None,
+    locale: Optional[str] = None,
+) -> str:
+    """Property description; arguments as for `vision_model.generate_unified_description`."""
+    catalog = _LOCALES.get(locale or DEFAULT_LOCALE) or _LOCALES[DEFAULT_LOCALE]
+    templates = catalog.templates
+
+    if total_rooms == 0 and not exterior_features:
+        return templates['no_rooms'].render()
+
+    property_name = catalog.property_types.get(property_type, property_type)
+
+    # Room types only, no counts; open-concept layouts list the functional areas
+    room_types = catalog.room_types
+    rooms = ", ".join([
+        room_types.get(room_type) or room_type.replace('_', ' ').title() for room_type in sorted(room_breakdown)
+    ])
+    if layout_type == "open_concept" and open_concept_detected and len(interior_analyses) == 1:
+        areas = [catalog.room_type(room_type) for room_type in interior_analyses[0].get("rooms", {})]
+        if areas:
+            rooms = ", ".join(areas)
+
+    features = []
+    if "hardwood_floors" in materials:
+        with_hardwood = sum(1 for analysis in analyses if "hardwood_floors" in analysis.get("amenities", []))
+        if with_hardwood > len(analyses) / 2:
+            features.append(templates['hardwood_everywhere'].render())
+    highlights = catalog.highlights
+    if amenities:
+        amenity_set = set(amenities)
+        features.extend([phrase for amenity, phrase in highlights.items() if amenity in amenity_set])
+        # Plus a couple of the other amenities
+        others = [amenity for amenity in amenities if amenity != "hardwood_floors" and amenity not in highlights]
+        features.extend([catalog.amenity(amenity) for amenity in others[:2]])
+
+    if layout_type == "open_concept":
+        description = templates['open_concept'].render(property_type=property_name)
+        if rooms:
+            description += templates['open_concept_areas'].render(rooms=rooms)
+    elif rooms:
+        description = templates['with_rooms'].render(property_type=property_name, rooms=rooms)
+    else:
+        description = templates['without_rooms'].render(property_type=property_name)
+
+    if features:
+        description += templates['features'].render(features=', '.join(features))
+    if exterior_features:
+        description += templates['exterior'].render(features=', '.join([catalog.feature(f) for f in exterior_features]))
+    if style and style != "unknown":
+        description += templates['style'].render(style=catalog.style(style))
+    return description + "."
+
+
+def render_ai_message(property_type: Optional[str], step: int, locale: Optional[str] = None) -> str:
+    """Orchestrator guidance message for a form state with `step` filled fields."""
+    catalog = get_locale(locale)
+    if not property_type:
+        return catalog.render('message_no_property_type')
+    if step < 3:
+        return catalog.render('message_early', property_type=catalog.property_type(property_type))
+    if step < 5:
+        return catalog.render('message_middle')
+    if step < 7:
+        return catalog.render('message_late')
+    return catalog.render('message_complete')
@@ -1,12 +1,19 @@
 from datetime import datetime
 from typing import Optional, List
+import asyncio
+import base64
+import binascii
 import json
+import time
 
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
+import orjson
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, validator
-from sqlalchemy import Column, DateTime, Integer, Text, create_engine
-from sqlalchemy.orm import declarative_base, Session, sessionmaker
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import Column, DateTime, Integer, Text, create_engine, select
+from sqlalchemy.orm import declarative_base, Session, selectinload, sessionmaker
+from pydantic import ValidationError
 import os
 import logging
 
@@ -15,11 +22,41 @@ logger = logging.getLogger(__name__)
 from app.schemas import (
     AnalyzeStepRequest,
     AnalyzeStepResponse,
+    AnalyzeStepBatchItem,
+    DraftCreateRequest,
+    DraftPatchRequest,
+    DraftResponse,
+    DraftSaveRequest,
     UIField,
     FieldOption,
+    ImageDataSchema,
+    SynthesisDataSchema,
+    SaveListingRequest,
+    SaveListingResponse,
 )
 from app.orchestrator import orchestrator
-from app.vision_model import analyze_property_image, analyze_multiple_images, VisionModelError
+from app.listing_session import ListingSession
+from app.analysis_store import get_analysis_store
+from app.analyze_batch import BATCH_MAX_ITEMS, ImageAnalysisCache, run_batch, shutdown_batch_pool
+from app.search import ListingSearchRequest, search_listings
+from app.text_search import ensure_text_index, index_listing_text, search_text
+from app.image_pool import shutdown_image_pool
+from app.compression import CompressionMiddleware
+from app.drafts import Draft, DraftNotFoundError, diff_patch, drafts, merge_patch
+from app.http_cache import compute_etag, conditional_response, etag_matches, not_modified
+from app.listing_export import iter_ndjson
+from app.listing_import import ListingImporter
+from app.listing_index import index_listing
+from app.metrics import HTTP_REQUEST_LATENCY, render_metrics
+from app.tracing import span, start_trace, end_trace
+from app.uploads import ingest_multipart, max_upload_bytes
+from app.vision_model import (
+    DEFAULT_PROMPT_VERSION,
+    analyze_property_image,
+    analyze_multiple_images,
+    shared_vision_model,
+    VisionModelError,
+)
 from app.models import Listing, ListingImage, ListingSynthesis
 from app.models import Base, Listing, ListingImage, ListingSynthesis
 
@@ -31,65 +68,29 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, futu
 
 def init_db() -> None:
     Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add indexes declared on them since
+    for index in Listing.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    ensure_text_index(engine)
 
 
-# Request schemas for save listing endpoint
-class ImageDataSchema(BaseModel):
-    image_data: str  # base64 encoded
-    ai_analysis: Optional[dict] = None
-    order_index: int = 0
-
-
-class SynthesisDataSchema(BaseModel):
-    total_rooms: int
-    layout_type: str
-    unified_description: str
-    room_breakdown: dict
-    property_overview: dict
-    interior_features: list = []
-    exterior_features: list = []
-
-
-class SaveListingRequest(BaseModel):
-    # Property data
-    property_type: str
-    price: Optional[int] = None
-    bedrooms: Optional[int] = None
-    bathrooms: Optional[float] = None
-    square_feet: Optional[int] = None
-    
-    # Location
-    address: Optional[str] = None
-    city: Optional[str] = None
-    state: Optional[str] = None
-    zip_code: Optional[str] = None
-    
-    # Additional form fields (dynamic)
-    additional_fields: Optional[dict] = {}
-    
-    # Images
-    images: List[ImageDataSchema] = []
-    
-    # Synthesis
-    synthesis: Optional[SynthesisDataSchema] = None
+def vision_model_settings(model_type: Optional[str] = None) -> tuple[str, dict]:
+    """
+    Pick the vision model for request handling.
     
-    @validator('property_type', pre=True)
-    def validate_property_type(cls, v):
-        if not v or (isinstance(v, str) and not v.strip()):
-            raise ValueError('property_type is required')
-        return v
+    `VISION_MODEL_TYPE` selects a model explicitly (e.g. `simulated` for load
+    tests); otherwise OpenAI is used when an API key is available, else mock.
+    Model names come from `OPENAI_VISION_MODEL` / `ANTHROPIC_VISION_MODEL`.
     
-    @validator('images', pre=True)
-    def validate_images(cls, v):
-        if not v or len(v) == 0:
-            raise ValueError('At least one image is required')
-        return v
-
-
-class SaveListingResponse(BaseModel):
-    success: bool
-    listing_id: int
-    message: str
+    Args:
+        model_type: Use this provider (with its API key) instead
+    """
+    model_type = model_type or os.getenv("VISION_MODEL_TYPE") or ("openai" if os.getenv("OPENAI_API_KEY") else "mock")
+    if model_type == "openai":
+        return model_type, {"api_key": os.getenv("OPENAI_API_KEY")}
+    if model_type == "anthropic":
+        return model_type, {"api_key": os.getenv("ANTHROPIC_API_KEY")}
+    return model_type, {}
 
 
 def get_db():
@@ -100,7 +101,12 @@ def get_db():
         db.close()
 
 
-app = FastAPI(title="Mobi Backend")
+def get_session_factory():
+    """Session factory for streaming responses, which outlive `get_db` sessions."""
+    return SessionLocal
+
+
+app = FastAPI(title="Mobi Backend", default_response_class=ORJSONResponse)
 
 # Configure CORS for local development
 app.add_middleware(
@@ -111,10 +117,90 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON/NDJSON/text responses (brotli when installed, else gzip); images pass through
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESSION_MIN_BYTES", "1024")))
+
+
+@app.middleware("http")
+async def record_request_metrics(request, call_next):
+    """Observe request latency per route template (e.g. /api/listings/{listing_id})."""
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", "unmatched")
+    HTTP_REQUEST_LATENCY.labels(request.method, endpoint, str(response.status_code)).observe(
+        time.perf_counter() - started
+    )
+    return response
+
+
+@app.middleware("http")
+async def trace_request(request, call_next):
+    """Trace each request and report its stage timings in a Server-Timing header."""
+    trace, token = start_trace(f"{request.method} {request.url.path}", request.headers.get("traceparent"))
+    try:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            trace.root.name = f"{request.method} {route.path}"
+        trace.root.attributes["http.status_code"] = response.status_code
+    finally:
+        end_trace(trace, token)
+    response.headers["Server-Timing"] = trace.server_timing()
+    return response
+
+
+def purge_expired_drafts() -> int:
+    """Delete expired listing drafts; returns how many were removed."""
+    db = SessionLocal()
+    try:
+        purged = drafts.purge_expired(db)
+    finally:
+        db.close()
+    if purged:
+        logger.info(f"Purged {purged} expired drafts")
+    return purged
+
+
+async def purge_drafts_periodically(interval: float) -> None:
+    """Purge expired drafts every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(purge_expired_drafts)
+        except Exception as e:
+            logger.warning(f"Purging expired drafts failed: {e}")
+
+
+_draft_purge_task: Optional[asyncio.Task] = None
+
 
 @app.on_event("startup")
 def on_startup() -> None:
-    init_db()
+    # Under gunicorn (gunicorn.conf.py) the master creates tables and purges before forking
+    if os.getenv("MOBI_SKIP_INIT_DB") != "1":
+        init_db()
+        purge_expired_drafts()
+
+
+@app.on_event("startup")
+async def start_draft_purge() -> None:
+    # Abandoned drafts are never read again, so expiry alone would not delete them
+    global _draft_purge_task
+    interval = float(os.getenv("DRAFT_PURGE_INTERVAL_SECONDS", "3600"))
+    if interval > 0:
+        _draft_purge_task = asyncio.create_task(purge_drafts_periodically(interval))
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    global _draft_purge_task
+    if _draft_purge_task is not None:
+        _draft_purge_task.cancel()
+        _draft_purge_task = None
+    # Let queued image preprocessing finish, then stop the worker processes
+    shutdown_image_pool()
+    shutdown_batch_pool()
 
 
 @app.get("/health")
@@ -123,6 +209,13 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus scrape endpoint (token usage, cost, model and request latency)."""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+
 # Listing management endpoints
 
 
@@ -148,8 +241,81 @@ def analyze_step(request: AnalyzeStepRequest, db: Session = Depends(get_db)):
     - `step_number`: Current step in the flow
     - `completion_percentage`: Estimated progress
     - `vision_analysis`: Optional full AI analysis result (when image is processed)
+    - `draft_id`: The draft the step was stored in (when the request named one)
+    
+    With `draft_id`, the form state comes from the server-side draft and
+    `current_data` only carries changes to it (a merge patch; null removes a
+    field). The resulting form state and any image analysis are stored back
+    in the draft.
     """
+    if request.draft_id is None:
+        return _analyze_step(request, db)
+    return _analyze_draft_step(request, db)
+
+
+def _analyze_draft_step(request: AnalyzeStepRequest, db: Session, analyze_image=None) -> AnalyzeStepResponse:
+    """`_analyze_step` on the state of `request.draft_id`, recording the step in the draft."""
+    draft = _get_draft(db, request.draft_id)
+    state = merge_patch(draft.form_data, request.current_data)
+    response = _analyze_step(request.model_copy(update={"current_data": state}), db, analyze_image)
+    try:
+        drafts.record_step(db, draft.id, diff_patch(draft.form_data, response.extracted_data), response.vision_analysis)
+    except DraftNotFoundError:
+        raise HTTPException(status_code=404, detail="Ciorna nu a fost găsită sau a expirat")
+    response.draft_id = draft.id
+    return response
+
+
+def _stored_image_analysis(
+    db: Optional[Session],
+    image_data: bytes,
+    model_type: str,
+    model_kwargs: dict,
+    key: Optional[str] = None,
+    preprocess: bool = True,
+) -> dict:
+    """
+    Analyze an image with the shared vision model through the analysis store.
+    
+    Args:
+        db: Session for `analysis_results` (None: no store)
+        image_data: Uploaded image bytes, or preprocessed ones with `key`
+        model_type, model_kwargs: From `vision_model_settings`
+        key: SHA-256 of the uploaded bytes, when `image_data` is preprocessed
+        preprocess: Whether `image_data` still needs preprocessing
+    """
+    vision_model = shared_vision_model(model_type, **model_kwargs)
+    return get_analysis_store().analyze(
+        db,
+        image_data,
+        model_type=model_type,
+        model=getattr(vision_model, "model", model_type),
+        prompt_version=DEFAULT_PROMPT_VERSION,
+        analyze=lambda data: analyze_property_image(
+            data, model_type=model_type, preprocess=preprocess, vision_model=vision_model
+        ),
+        key=key,
+    )
+
+
+def _analyze_step(
+    request: AnalyzeStepRequest,
+    db: Optional[Session] = None,
+    analyze_image=None,
+    image_data: Optional[bytes] = None,
+) -> AnalyzeStepResponse:
+    """
+    Process one form state and input (see `analyze_step`).
     
+    Args:
+        request: Form state and new input
+        db: Session whose engine the analysis store uses (None: not stored)
+        analyze_image: Callable mapping image bytes to a vision result; by
+            default `_stored_image_analysis` with the shared model of
+            `vision_model_settings`, through the analysis store
+        image_data: Raw image bytes for an 'image' input received out of band
+            (WebSocket sessions) instead of base64 in `new_input`
+    """
     # Handle different input types
     extracted_data = request.current_data.copy()
     detected_property_type = None  # Track AI-detected property type for default value
@@ -162,29 +328,29 @@ def analyze_step(request: AnalyzeStepRequest, db: Session = Depends(get_db)):
             import base64
             # Handle potential base64 padding issues
             image_b64 = request.new_input
-            if image_b64:
-                # Add padding if needed
-                missing_padding = len(image_b64) % 4
-                if missing_padding:
-                    image_b64 += '=' * (4 - missing_padding)
-                image_data = base64.b64decode(image_b64)
-            else:
-                # Fallback for testing - create a simple test image
-                from PIL import Image
-                import io
-                img = Image.new('RGB', (800, 600), color='blue')
-                img_bytes = io.BytesIO()
-                img.save(img_bytes, format='JPEG')
-                image_data = img_bytes.getvalue()
+            with span("decode"):
+                # image_data is already set for raw bytes from a WebSocket session
+                if image_data is None and image_b64:
+                    # Add padding if needed
+                    missing_padding = len(image_b64) % 4
+                    if missing_padding:
+                        image_b64 += '=' * (4 - missing_padding)
+                    image_data = base64.b64decode(image_b64)
+                elif image_data is None:
+                    # Fallback for testing - create a simple test image
+                    from PIL import Image
+                    import io
+                    img = Image.new('RGB', (800, 600), color='blue')
+                    img_bytes = io.BytesIO()
+                    img.save(img_bytes, format='JPEG')
+                    image_data = img_bytes.getvalue()
             
             # Analyze the image using vision model
-            # Use OpenAI if API key is available, otherwise use mock
-            model_type = "openai" if os.getenv("OPENAI_API_KEY") else "mock"
-            vision_result = analyze_property_image(
-                image_data, 
-                model_type=model_type,
-                api_key=os.getenv("OPENAI_API_KEY") if model_type == "openai" else None
-            )
+            if analyze_image is None:
+                model_type, model_kwargs = vision_model_settings()
+                vision_result = _stored_image_analysis(db, image_data, model_type, model_kwargs)
+            else:
+                vision_result = analyze_image(image_data)
             
             # Store the full vision analysis result
             vision_analysis = vision_result.copy()
@@ -203,47 +369,50 @@ def analyze_step(request: AnalyzeStepRequest, db: Session = Depends(get_db)):
             except Exception as db_error:
                 logger.error(f"Failed to save image analysis to database: {db_error}")
                 # Continue even if database save fails
-                db.rollback()
+                if db is not None:
+                    db.rollback()
             
             # Store property_type as a suggestion, not as extracted data
             # This ensures the user sees and confirms the detected property type
-            detected_property_type = vision_result.get("property_type") or "apartment"
+            with span("map"):
+                detected_property_type = vision_result.get("property_type") or "apartment"
             
-            if vision_result.get("rooms"):
-                for room_type, count in vision_result["rooms"].items():
-                    if room_type == "bedroom":
-                        extracted_data["bedrooms"] = count
-                    elif room_type == "bathroom":
-                        extracted_data["bathrooms"] = count
-            else:
-                # Default rooms if not detected
-                extracted_data["bedrooms"] = 2
+                if vision_result.get("rooms"):
+                    for room_type, count in vision_result["rooms"].items():
+                        if room_type == "bedroom":
+                            extracted_data["bedrooms"] = count
+                        elif room_type == "bathroom":
+                            extracted_data["bathrooms"] = count
+                else:
+                    # Default rooms if not detected
+                    extracted_data["bedrooms"] = 2
             
-            if vision_result.get("amenities"):
-                # Convert amenities to boolean flags
-                amenities = vision_result["amenities"]
-                extracted_data["has_pool"] = "pool" in amenities
-                extracted_data["has_fireplace"] = "fireplace" in amenities
-                extracted_data["has_balcony"] = "balcony" in amenities
-                extracted_data["has_garage"] = "garage" in amenities
-                extracted_data["has_hardwood_floors"] = "hardwood_floors" in amenities
-                extracted_data["has_granite_counters"] = "granite_counters" in amenities
-            else:
-                # Default amenities if not detected
-                extracted_data["has_pool"] = False
+                if vision_result.get("amenities"):
+                    # Convert amenities to boolean flags
+                    amenities = vision_result["amenities"]
+                    extracted_data["has_pool"] = "pool" in amenities
+                    extracted_data["has_fireplace"] = "fireplace" in amenities
+                    extracted_data["has_balcony"] = "balcony" in amenities
+                    extracted_data["has_garage"] = "garage" in amenities
+                    extracted_data["has_hardwood_floors"] = "hardwood_floors" in amenities
+                    extracted_data["has_granite_counters"] = "granite_counters" in amenities
+                else:
+                    # Default amenities if not detected
+                    extracted_data["has_pool"] = False
             
             # Generate AI message from the vision analysis description
-            description = vision_result.get("description", "")
-            if description:
-                # Use the AI's actual description
-                ai_message = f"{description}\n\nPlease confirm the property type below and continue with additional details."
-            else:
-                # Fallback message if no description
-                bedrooms_count = extracted_data.get('bedrooms', 2)
-                if detected_property_type == "apartment":
-                    ai_message = f"I see what looks like an apartment with {bedrooms_count} bedrooms. Please confirm the property type below."
+            with span("message"):
+                description = vision_result.get("description", "")
+                if description:
+                    # Use the AI's actual description
+                    ai_message = f"{description}\n\nPlease confirm the property type below and continue with additional details."
                 else:
-                    ai_message = f"I see what looks like a {detected_property_type} with {bedrooms_count} bedrooms. Please confirm the property type below."
+                    # Fallback message if no description
+                    bedrooms_count = extracted_data.get('bedrooms', 2)
+                    if detected_property_type == "apartment":
+                        ai_message = f"I see what looks like an apartment with {bedrooms_count} bedrooms. Please confirm the property type below."
+                    else:
+                        ai_message = f"I see what looks like a {detected_property_type} with {bedrooms_count} bedrooms. Please confirm the property type below."
                 
         except Exception as e:
             logger.error(f"Vision model analysis failed: {e}")
@@ -269,22 +438,27 @@ def analyze_step(request: AnalyzeStepRequest, db: Session = Depends(get_db)):
         if request.new_input and len(request.new_input) > 10:
             extracted_data["description"] = request.new_input
     
-    # Use orchestrator to determine next fields (after processing input)
-    next_fields = orchestrator.get_next_fields(extracted_data)
-    
-    # If we detected a property type from an image and property_type field is shown,
-    # set it as the default value so user can confirm/modify
-    if detected_property_type:
-        for field in next_fields:
-            if field.id == "property_type":
-                field.default = detected_property_type
-                break
+    with span("orchestrate"):
+        # Use orchestrator to determine next fields (after processing input);
+        # memoized on the property type and the set of filled fields
+        manifest = orchestrator.manifest(extracted_data)
+        next_fields = list(manifest.fields)
+        
+        # If we detected a property type from an image and property_type field is shown,
+        # set it as the default value so user can confirm/modify
+        if detected_property_type:
+            # Manifest fields are shared and frozen: replace with a copy
+            next_fields = [
+                field.model_copy(update={"default": detected_property_type}) if field.id == "property_type" else field
+                for field in next_fields
+            ]
+        
+        completion_percentage = manifest.completion_percentage
     
     # Generate AI message if not already set (e.g., from image analysis)
     if ai_message is None:
-        ai_message = orchestrator.generate_ai_message(extracted_data, next_fields)
-    
-    completion_percentage = orchestrator.calculate_completion_percentage(extracted_data)
+        with span("message"):
+            ai_message = orchestrator.generate_ai_message(extracted_data, next_fields)
     
     return AnalyzeStepResponse(
         extracted_data=extracted_data,
@@ -296,82 +470,173 @@ def analyze_step(request: AnalyzeStepRequest, db: Session = Depends(get_db)):
     )
 
 
-@app.post("/api/analyze-batch")
-async def analyze_batch_images(files: List[UploadFile] = File(...)):
+@app.post("/api/analyze-step/batch", response_model=List[AnalyzeStepBatchItem])
+def analyze_step_batch(requests: List[AnalyzeStepRequest]):
+    """
+    Batch variant of `/api/analyze-step` for drafting many listings at once.
+    
+    Items are processed concurrently on a shared thread pool with one shared
+    vision model client; identical images in the batch are analyzed once.
+    Analyses go through the analysis store like single steps, with a
+    database session per analyzed image. Items with a `draft_id` work from
+    and are recorded in their draft, as in `/api/analyze-step`.
+    
+    ## Request Body
+    An array of `AnalyzeStepRequest` objects (at most `ANALYZE_BATCH_MAX_ITEMS`).
+    
+    ## Response
+    An array with one entry per item, in request order: `{"index", "response"}`
+    with the item's `AnalyzeStepResponse`, or `{"index", "error"}` if it failed.
+    """
+    if len(requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Maximum {BATCH_MAX_ITEMS} elemente permise per lot")
+    
+    model_type, model_kwargs = vision_model_settings()
+    
+    def analyze_stored(image_data: bytes) -> dict:
+        # Items run on several threads, so each analysis gets its own session
+        db = SessionLocal()
+        try:
+            return _stored_image_analysis(db, image_data, model_type, model_kwargs)
+        finally:
+            db.close()
+    
+    analyze_image = ImageAnalysisCache(analyze_stored)
+    
+    def analyze_item(item: AnalyzeStepRequest) -> AnalyzeStepResponse:
+        if item.draft_id is None:
+            return _analyze_step(item, analyze_image=analyze_image)
+        db = SessionLocal()
+        try:
+            return _analyze_draft_step(item, db, analyze_image)
+        finally:
+            db.close()
+    
+    with span("batch", items=len(requests)):
+        results = run_batch(requests, analyze_item)
+    return [
+        AnalyzeStepBatchItem(index=index, response=response, error=error)
+        for index, (response, error) in enumerate(results)
+    ]
+
+
+@app.websocket("/ws/listing-session")
+async def listing_session(websocket: WebSocket):
+    """
+    Guided listing flow over a WebSocket, with the form state kept server-side.
+    
+    Clients send field deltas, text and binary image frames; the server pushes
+    vision results and manifest updates. See `app.listing_session` for the
+    message protocol.
+    """
+    await websocket.accept()
+    session = ListingSession(_analyze_step, max_image_bytes=max_upload_bytes())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                error = session.receive_bytes(message["bytes"])
+                if error:
+                    await websocket.send_text(orjson.dumps(error).decode())
+                continue
+            async for event in session.handle(message.get("text") or ""):
+                await websocket.send_text(orjson.dumps(event).decode())
+    except WebSocketDisconnect:
+        pass
+
+
+_BATCH_UPLOAD_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+                "required": ["files"],
+            }
+        }
+    },
+}
+
+
+@app.post("/api/analyze-batch", openapi_extra={"requestBody": _BATCH_UPLOAD_BODY})
+async def analyze_batch_images(request: Request, db: Session = Depends(get_db)):
     """
     Analyze multiple property images and return correlated results.
     
     Accepts multiple image files and returns both individual analyses
-    and a synthesized overview of the entire property.
+    and a synthesized overview of the entire property. The multipart body is
+    parsed as it is received (large uploads spooled to disk), and each image
+    is preprocessed as soon as its part has ended, while later ones are
+    still arriving. Each analysis goes through the analysis store, keyed by
+    the upload's SHA-256.
     
     ## Request
-    - `files`: List of image files (JPEG, PNG, etc.)
+    - `files`: List of image files (JPEG, PNG, etc.), at most 10, each at most `UPLOAD_MAX_BYTES`
     
     ## Response
     ```json
     {
         "status": "success",
-        "individual_analyses": [...],  # Analysis of each image
+        "individual_analyses": [...],  # Analysis of each image, with its "image_sha256"
         "synthesis": {
             "total_rooms": 6,
             "room_breakdown": {"bedroom": 2, "kitchen": 1, ...},
             "amenities_by_room": {...},
             "unified_description": "This property has 6 rooms...",
             "property_overview": {...}
-        }
+        },
+        "usage": {"input_tokens": 3120, "output_tokens": 840, "cost_usd": 0.0130, ...}
     }
     ```
     """
-    if not files:
-        raise HTTPException(status_code=400, detail="Nu au fost furnizate fișiere")
-    
-    if len(files) > 10:
-        raise HTTPException(status_code=400, detail="Maximum 10 imagini permise per lot")
-    
+    ingested = []
     try:
-        # Read all image data
-        image_data_list = []
-        for file in files:
-            # Validate file type
-            if not file.content_type or not file.content_type.startswith("image/"):
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Fișierul {file.filename} nu este o imagine"
-                )
-            
-            image_data = await file.read()
-            if len(image_data) == 0:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Fișierul {file.filename} este gol"
-                )
-            
-            image_data_list.append(image_data)
+        with span("ingest") as ingest_span:
+            ingested = await ingest_multipart(request, max_files=10)
+            if ingest_span is not None:
+                ingest_span.attributes["images"] = len(ingested)
+            image_data_list = [await image.processed() for image in ingested]
         
         # Analyze multiple images
-        model_type = "openai" if os.getenv("OPENAI_API_KEY") else "mock"
-        result = analyze_multiple_images(
+        model_type, model_kwargs = vision_model_settings()
+        result = await run_in_threadpool(
+            analyze_multiple_images,
             images=image_data_list,
             model_type=model_type,
-            api_key=os.getenv("OPENAI_API_KEY") if model_type == "openai" else None
+            preprocess=False,
+            analyze_image=lambda i, image_data: _stored_image_analysis(
+                db, image_data, model_type, model_kwargs, key=ingested[i].sha256, preprocess=False
+            ),
         )
+        for analysis in result["individual_analyses"]:
+            analysis["image_sha256"] = ingested[analysis["image_index"]].sha256
         
         return {
             "status": "success",
             "individual_analyses": result["individual_analyses"],
-            "synthesis": result["synthesis"]
+            "synthesis": result["synthesis"],
+            "usage": result["usage"]
         }
         
+    except HTTPException:
+        raise
     except VisionModelError as e:
         logger.error(f"Vision model error in batch analysis: {e}")
         raise HTTPException(status_code=500, detail=f"Analiza imaginii a eșuat: {str(e)}")
     except Exception as e:
         logger.error(f"Unexpected error in batch analysis: {e}")
         raise HTTPException(status_code=500, detail=f"Analiza lotului a eșuat: {str(e)}")
+    finally:
+        for image in ingested:
+            image.discard()
 
 
 @app.get("/api/listings")
 def get_all_listings(
+    request: Request,
     limit: int = 100,
     offset: int = 0,
     db: Session = Depends(get_db)
@@ -399,6 +664,8 @@ def get_all_listings(
     - synthesis: Property synthesis data if available
     - created_at: Creation timestamp
     - updated_at: Last update timestamp
+    
+    Responses carry a strong ETag; `If-None-Match` with the current tag gets 304.
     """
     # Validate limit to prevent excessive queries
     if limit > 1000:
@@ -409,62 +676,129 @@ def get_all_listings(
         offset = 0
     
     # Query listings with related data
-    listings = db.query(Listing).order_by(Listing.created_at.desc()).limit(limit).offset(offset).all()
-    
-    # Convert to response format
-    result = []
-    for listing in listings:
-        # Get images with their analysis data
-        images = []
-        for image in listing.images:
-            images.append({
-                "id": image.id,
-                "image_data": image.image_data,
-                "image_url": image.image_url,
-                "ai_description": image.ai_description,
-                "detected_rooms": image.detected_rooms,
-                "detected_amenities": image.detected_amenities,
-                "property_type": image.property_type,
-                "style": image.style,
-                "condition": image.condition,
-                "order_index": image.order_index,
-                "created_at": image.created_at.isoformat() if image.created_at else None
-            })
-        
-        # Get synthesis data if available
-        synthesis = None
-        if listing.synthesis:
-            synthesis = {
-                "id": listing.synthesis.id,
-                "total_rooms": listing.synthesis.total_rooms,
-                "layout_type": listing.synthesis.layout_type,
-                "unified_description": listing.synthesis.unified_description,
-                "room_breakdown": listing.synthesis.room_breakdown,
-                "property_overview": listing.synthesis.property_overview,
-                "interior_features": listing.synthesis.interior_features,
-                "exterior_features": listing.synthesis.exterior_features,
-                "created_at": listing.synthesis.created_at.isoformat() if listing.synthesis.created_at else None
-            }
-        
-        result.append({
-            "id": listing.id,
-            "property_type": listing.property_type,
-            "price": listing.price,
-            "bedrooms": listing.bedrooms,
-            "bathrooms": listing.bathrooms,
-            "square_feet": listing.square_feet,
-            "address": listing.address,
-            "city": listing.city,
-            "state": listing.state,
-            "zip_code": listing.zip_code,
-            "status": listing.status,
-            "images": images,
-            "synthesis": synthesis,
-            "created_at": listing.created_at.isoformat() if listing.created_at else None,
-            "updated_at": listing.updated_at.isoformat() if listing.updated_at else None
+    listings = db.scalars(
+        select(Listing)
+        .options(selectinload(Listing.images), selectinload(Listing.synthesis))
+        .order_by(Listing.created_at.desc())
+        .limit(limit)
+        .offset(offset)
+    ).all()
+    
+    # Already JSON-ready: skip the jsonable_encoder walk over the image payloads
+    return conditional_response(request, [_serialize_listing(listing) for listing in listings])
+
+
+@app.post("/api/listings/search")
+def search_listings_endpoint(request: ListingSearchRequest, db: Session = Depends(get_db)):
+    """
+    Search listings with a declarative filter and sort spec.
+    
+    See `app.search` for the request format. Filters are whitelisted
+    field/operator pairs translated into indexed SQL predicates; `amenities`
+    requires every listed amenity and `detected_rooms` minimum room counts
+    found by image analysis (e.g. `{"bedrooms": 3}`).
+    
+    Returns:
+    - total: Number of matching listings
+    - items: The requested page, in the same format as `GET /api/listings`
+    """
+    total, listings = search_listings(db, request)
+    return ORJSONResponse({
+        "total": total,
+        "limit": request.limit,
+        "offset": request.offset,
+        "items": [_serialize_listing(listing) for listing in listings],
+    })
+
+
+@app.get("/api/listings/search/text")
+def search_listings_text(q: str, limit: int = 20, offset: int = 0, db: Session = Depends(get_db)):
+    """
+    Ranked full-text search over listing descriptions.
+    
+    Matches the synthesis description and image descriptions of each listing.
+    Search is diacritic-insensitive and matches Romanian inflections
+    ("balcon parchet" finds "balconul" and "parchetul"); all terms must match.
+    
+    Returns:
+    - total: Number of matching listings
+    - items: Listings on the requested page, best match first, each with its "score"
+    """
+    limit = min(max(limit, 1), 100)
+    offset = max(offset, 0)
+    
+    total, ranked = search_text(db, q, limit=limit, offset=offset)
+    listings = {
+        listing.id: listing
+        for listing in db.scalars(
+            select(Listing)
+            .where(Listing.id.in_([listing_id for listing_id, _ in ranked]))
+            .options(selectinload(Listing.images), selectinload(Listing.synthesis))
+        )
+    }
+    items = []
+    for listing_id, score in ranked:
+        if listing_id in listings:
+            items.append({**_serialize_listing(listings[listing_id]), "score": score})
+    return ORJSONResponse({"query": q, "total": total, "limit": limit, "offset": offset, "items": items})
+
+
+def _serialize_listing(listing: Listing) -> dict:
+    """
+    Convert a listing with its images and synthesis to the API response format.
+    
+    Only JSON primitives (timestamps as ISO strings), so the result can go
+    straight to `ORJSONResponse` without `jsonable_encoder`.
+    """
+    # Get images with their analysis data
+    images = []
+    for image in listing.images:
+        images.append({
+            "id": image.id,
+            "image_data": image.image_data,
+            "image_url": image.image_url,
+            "ai_description": image.ai_description,
+            "detected_rooms": image.detected_rooms,
+            "detected_amenities": image.detected_amenities,
+            "property_type": image.property_type,
+            "style": image.style,
+            "condition": image.condition,
+            "order_index": image.order_index,
+            "created_at": image.created_at.isoformat() if image.created_at else None
         })
     
-    return result
+    # Get synthesis data if available
+    synthesis = None
+    if listing.synthesis:
+        synthesis = {
+            "id": listing.synthesis.id,
+            "total_rooms": listing.synthesis.total_rooms,
+            "layout_type": listing.synthesis.layout_type,
+            "unified_description": listing.synthesis.unified_description,
+            "room_breakdown": listing.synthesis.room_breakdown,
+            "property_overview": listing.synthesis.property_overview,
+            "interior_features": listing.synthesis.interior_features,
+            "exterior_features": listing.synthesis.exterior_features,
+            "created_at": listing.synthesis.created_at.isoformat() if listing.synthesis.created_at else None
+        }
+    
+    return {
+        "id": listing.id,
+        "property_type": listing.property_type,
+        "price": listing.price,
+        "bedrooms": listing.bedrooms,
+        "bathrooms": listing.bathrooms,
+        "square_feet": listing.square_feet,
+        "address": listing.address,
+        "city": listing.city,
+        "state": listing.state,
+        "zip_code": listing.zip_code,
+        "status": listing.status,
+        "images": images,
+        "synthesis": synthesis,
+        "created_at": listing.created_at.isoformat() if listing.created_at else None,
+        "updated_at": listing.updated_at.isoformat() if listing.updated_at else None
+    }
 
 
 @app.post("/api/listings", response_model=SaveListingResponse)
@@ -539,6 +873,11 @@ def save_listing(request: SaveListingRequest, db: Session = Depends(get_db)):
             )
             db.add(synthesis)
         
+        # Index amenities and room counts in the normalized tables for filtering
+        db.flush()
+        index_listing(db, listing)
+        index_listing_text(db, listing)
+        
         # Commit transaction
         db.commit()
         db.refresh(listing)
@@ -559,13 +898,196 @@ def save_listing(request: SaveListingRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to save listing: {str(e)}")
 
 
+def _get_draft(db: Session, draft_id: str) -> Draft:
+    try:
+        return drafts.get(db, draft_id)
+    except DraftNotFoundError:
+        raise HTTPException(status_code=404, detail="Ciorna nu a fost găsită sau a expirat")
+
+
+def _draft_response(draft: Draft) -> DraftResponse:
+    return DraftResponse(
+        draft_id=draft.id,
+        current_data=draft.form_data,
+        vision_results=draft.vision_results,
+        detected_features=draft.detected_features,
+        version=draft.version,
+        expires_at=draft.expires_at,
+    )
+
+
+@app.post("/api/drafts", response_model=DraftResponse)
+def create_draft(request: Optional[DraftCreateRequest] = None, db: Session = Depends(get_db)):
+    """
+    Start a server-side draft for the guided listing flow.
+    
+    Pass the returned `draft_id` to `/api/analyze-step` to send only changes
+    on each step. Drafts expire `DRAFT_TTL_SECONDS` after their last change.
+    """
+    return _draft_response(drafts.create(db, request.current_data if request else None))
+
+
+@app.get("/api/drafts/{draft_id}", response_model=DraftResponse)
+def get_draft(draft_id: str, db: Session = Depends(get_db)):
+    """Current form state, vision results and detected features of a draft."""
+    return _draft_response(_get_draft(db, draft_id))
+
+
+@app.patch("/api/drafts/{draft_id}", response_model=DraftResponse)
+def patch_draft(draft_id: str, request: DraftPatchRequest, db: Session = Depends(get_db)):
+    """Apply merge patches to a draft's form state and detected features."""
+    _get_draft(db, draft_id)
+    try:
+        draft = drafts.patch(db, draft_id, form_data=request.current_data, detected_features=request.detected_features)
+    except DraftNotFoundError:
+        raise HTTPException(status_code=404, detail="Ciorna nu a fost găsită sau a expirat")
+    return _draft_response(draft)
+
+
+@app.delete("/api/drafts/{draft_id}", status_code=204)
+def delete_draft(draft_id: str, db: Session = Depends(get_db)):
+    """Discard a draft."""
+    drafts.delete(db, draft_id)
+    return Response(status_code=204)
+
+
+# SaveListingRequest fields that can come from a draft's form state
+_DRAFT_LISTING_FIELDS = tuple(
+    name for name in SaveListingRequest.model_fields if name not in ("additional_fields", "images", "synthesis")
+)
+
+
+@app.post("/api/drafts/{draft_id}/save", response_model=SaveListingResponse)
+def save_draft(draft_id: str, request: DraftSaveRequest, db: Session = Depends(get_db)):
+    """
+    Save a draft as a listing, then discard the draft.
+    
+    Property fields come from the draft's form state (fields without a listing
+    column go to `additional_fields`); the request supplies the images and
+    synthesis. Images without `ai_analysis` get the draft's vision result at
+    the same position.
+    """
+    draft = _get_draft(db, draft_id)
+    form_data = dict(draft.form_data)
+    columns = {name: form_data.pop(name) for name in _DRAFT_LISTING_FIELDS if name in form_data}
+    images = [
+        image.model_copy(update={"ai_analysis": draft.vision_results[i]})
+        if image.ai_analysis is None and i < len(draft.vision_results) else image
+        for i, image in enumerate(request.images)
+    ]
+    try:
+        listing_request = SaveListingRequest(
+            **columns, additional_fields=form_data, images=images, synthesis=request.synthesis
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Ciorna nu poate fi salvată: {e.errors()[0]['msg']}")
+    
+    response = save_listing(listing_request, db)
+    drafts.delete(db, draft_id)
+    return response
+
+
+async def _ndjson_lines(chunks, max_line_bytes: int):
+    """
+    Split a byte stream into lines (the last one may lack a newline).
+
+    Raises:
+        HTTPException: 413 for a line longer than `max_line_bytes`
+    """
+    # Pieces of the unfinished line; only new chunks are scanned for newlines
+    pending: List[bytes] = []
+    pending_size = 0
+
+    def check(size: int) -> None:
+        if size > max_line_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"O linie depășește dimensiunea maximă de {max_line_bytes // (1024 * 1024)} MB"
+            )
+
+    async for chunk in chunks:
+        start = 0
+        end = chunk.find(b"\n")
+        while end >= 0:
+            check(pending_size + end - start)
+            pending.append(chunk[start:end])
+            yield b"".join(pending)
+            pending, pending_size = [], 0
+            start = end + 1
+            end = chunk.find(b"\n", start)
+        if start < len(chunk):
+            pending.append(chunk[start:])
+            pending_size += len(chunk) - start
+            check(pending_size)
+    if pending:
+        yield b"".join(pending)
+
+
+@app.post("/api/listings/import")
+async def import_listings_endpoint(request: Request, chunk_size: int = 500, db: Session = Depends(get_db)):
+    """
+    Bulk-import listings from an NDJSON body.
+    
+    Each line is a `SaveListingRequest` object. The body is read as a stream
+    and listings are inserted in batches of `chunk_size`, committed per batch;
+    invalid lines are skipped and reported. Lines are parsed and validated in
+    the threadpool, a batch at a time. A line over `UPLOAD_MAX_BYTES` aborts
+    the import with 413 (batches committed before it stay).
+    
+    Returns:
+    - imported: Number of listings saved
+    - failed: Number of rejected lines
+    - errors: [{line, error}] for rejected lines
+    """
+    if not 1 <= chunk_size <= 5000:
+        raise HTTPException(status_code=400, detail="chunk_size trebuie să fie între 1 și 5000")
+
+    importer = ListingImporter(db, chunk_size)
+    line_number = 0
+    lines = []
+    async for line in _ndjson_lines(request.stream(), max_upload_bytes()):
+        line_number += 1
+        lines.append((line_number, line))
+        if len(lines) >= chunk_size:
+            await run_in_threadpool(importer.add_lines, lines)
+            lines = []
+    await run_in_threadpool(importer.add_lines, lines)
+    await run_in_threadpool(importer.flush)
+
+    report = importer.report()
+    logger.info(f"Listing import finished: {report['imported']} imported, {report['failed']} failed")
+    return report
+
+
+@app.get("/api/listings/export")
+def export_listings(include_images: bool = False, session_factory=Depends(get_session_factory)):
+    """
+    Stream every listing with its image analyses and synthesis as NDJSON.
+    
+    Listings are read in batches with a server-side cursor, so memory stays
+    constant regardless of table size. Image payloads are left out unless
+    `include_images` is set. For Parquet use `python -m app.cli export`.
+    """
+    def stream():
+        db = session_factory()
+        try:
+            yield from iter_ndjson(db, include_images=include_images)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="listings.ndjson"'},
+    )
+
+
 # Romanian error handling
 from fastapi.responses import JSONResponse
-from fastapi import Request
 
 
 @app.get("/api/listings/{listing_id}")
-def get_listing(listing_id: int, db: Session = Depends(get_db)):
+def get_listing(listing_id: int, request: Request, db: Session = Depends(get_db)):
     """
     Get a single listing by ID.
     
@@ -575,68 +1097,73 @@ def get_listing(listing_id: int, db: Session = Depends(get_db)):
     - Status and metadata (created_at, updated_at)
     - Related images and synthesis data
     
-    Returns 404 if listing not found.
+    Returns 404 if listing not found, 304 if `If-None-Match` matches the ETag.
     """
-    listing = db.query(Listing).filter(Listing.id == listing_id).first()
+    listing = db.scalars(
+        select(Listing)
+        .options(selectinload(Listing.images), selectinload(Listing.synthesis))
+        .where(Listing.id == listing_id)
+    ).first()
     
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
     
-    # Build the response with all fields
-    response_data = {
-        "id": listing.id,
-        "property_type": listing.property_type,
-        "price": listing.price,
-        "bedrooms": listing.bedrooms,
-        "bathrooms": listing.bathrooms,
-        "square_feet": listing.square_feet,
-        "address": listing.address,
-        "city": listing.city,
-        "state": listing.state,
-        "zip_code": listing.zip_code,
-        "status": listing.status,
-        "created_at": listing.created_at.isoformat() if listing.created_at else None,
-        "updated_at": listing.updated_at.isoformat() if listing.updated_at else None,
-    }
-    
-    # Add images if available
-    if listing.images:
-        response_data["images"] = [
-            {
-                "id": img.id,
-                "image_data": img.image_data,
-                "image_url": img.image_url,
-                "ai_description": img.ai_description,
-                "detected_rooms": img.detected_rooms,
-                "detected_amenities": img.detected_amenities,
-                "property_type": img.property_type,
-                "style": img.style,
-                "condition": img.condition,
-                "order_index": img.order_index,
-                "created_at": img.created_at.isoformat() if img.created_at else None,
-            }
-            for img in listing.images
-        ]
-    else:
-        response_data["images"] = []
     
-    # Add synthesis data if available
-    if listing.synthesis:
-        response_data["synthesis"] = {
-            "id": listing.synthesis.id,
-            "total_rooms": listing.synthesis.total_rooms,
-            "layout_type": listing.synthesis.layout_type,
-            "unified_description": listing.synthesis.unified_description,
-            "room_breakdown": listing.synthesis.room_breakdown,
-            "property_overview": listing.synthesis.property_overview,
-            "interior_features": listing.synthesis.interior_features,
-            "exterior_features": listing.synthesis.exterior_features,
-            "created_at": listing.synthesis.created_at.isoformat() if listing.synthesis.created_at else None,
-        }
-    else:
-        response_data["synthesis"] = None
+    return conditional_response(request, _serialize_listing(listing))
+
+
+_IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF8", "image/gif"),
+)
+
+
+def _decode_image_data(image_data: str) -> tuple[bytes, str]:
+    """Decode stored base64 (optionally a data: URL) into bytes and a media type."""
+    media_type = None
+    if image_data.startswith("data:"):
+        header, _, image_data = image_data.partition(",")
+        media_type = header[5:].split(";")[0] or None
+    missing_padding = len(image_data) % 4
+    if missing_padding:
+        image_data += "=" * (4 - missing_padding)
+    data = base64.b64decode(image_data, validate=True)
+    if media_type is None:
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            media_type = "image/webp"
+        else:
+            media_type = next(
+                (kind for signature, kind in _IMAGE_SIGNATURES if data.startswith(signature)),
+                "application/octet-stream",
+            )
+    return data, media_type
+
+
+@app.get("/api/listings/{listing_id}/images/{image_id}")
+def get_listing_image(listing_id: int, image_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Raw bytes of a listing image, with a strong ETag and 304 revalidation.
     
-    return response_data
+    Lets clients cache photos separately instead of re-downloading the
+    base64 payloads embedded in listing responses.
+    """
+    image = db.scalars(
+        select(ListingImage).where(ListingImage.id == image_id, ListingImage.listing_id == listing_id)
+    ).first()
+    if not image or not image.image_data:
+        raise HTTPException(status_code=404, detail="Imaginea nu a fost găsită")
+    try:
+        data, media_type = _decode_image_data(image.image_data)
+    except (binascii.Error, ValueError):
+        # Stored as an external URL or otherwise not base64
+        raise HTTPException(status_code=404, detail="Imaginea nu a fost găsită")
+
+    cache_control = "private, max-age=86400"
+    etag = compute_etag(data)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(request, etag, cache_control, media_type, len(data))
+    return Response(content=data, media_type=media_type, headers={"ETag": etag, "Cache-Control": cache_control})
 
 
 @app.exception_handler(HTTPException)
@@ -0,0 +1,178 @@
+"""
+Prometheus instrumentation for the Mobi backend.
+
+This module defines the metrics recorded around vision model calls and HTTP
+requests, plus helpers for token/cost accounting. Metrics are exposed in the
+Prometheus text format by the `/metrics` endpoint in `app.main`.
+"""
+
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+
+
+# USD price per 1M tokens (input, output) for the models we call.
+# Unknown models are accounted with zero cost but still get token counts.
+MODEL_PRICING = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4o": (2.50, 10.00),
+    "claude-3-sonnet-20240229": (3.00, 15.00),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+    "claude-3-haiku-20240307": (0.25, 1.25),
+}
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+IMAGE_BYTES_BUCKETS = (10_000, 25_000, 50_000, 100_000, 200_000, 400_000, 800_000, 1_600_000)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000)
+
+
+VISION_TOKENS = Counter(
+    "mobi_vision_tokens_total",
+    "Tokens consumed by vision model calls",
+    ["model_type", "model", "direction"],
+)
+VISION_COST = Counter(
+    "mobi_vision_cost_usd_total",
+    "Estimated USD cost of vision model calls",
+    ["model_type", "model"],
+)
+VISION_CALL_TOKENS = Histogram(
+    "mobi_vision_call_tokens",
+    "Tokens per vision model call",
+    ["model_type", "direction"],
+    buckets=TOKEN_BUCKETS,
+)
+VISION_LATENCY = Histogram(
+    "mobi_vision_model_latency_seconds",
+    "Latency of vision model calls",
+    ["model_type", "model"],
+    buckets=LATENCY_BUCKETS,
+)
+VISION_IMAGE_BYTES = Histogram(
+    "mobi_vision_image_bytes",
+    "Size of images sent to the vision model after preprocessing",
+    ["model_type"],
+    buckets=IMAGE_BYTES_BUCKETS,
+)
+VISION_PARSE_PATH = Counter(
+    "mobi_vision_parse_path_total",
+    "How vision model responses were parsed (json, markdown_json, text, decode_error)",
+    ["model_type", "path"],
+)
+VISION_CACHE = Counter(
+    "mobi_vision_cache_requests_total",
+    "Vision analysis cache lookups",
+    ["cache", "result"],
+)
+VISION_ERRORS = Counter(
+    "mobi_vision_errors_total",
+    "Vision model calls that raised an error",
+    ["model_type"],
+)
+IMAGE_PREPROCESS_MODE = Counter(
+    "mobi_image_preprocess_total",
+    "Images preprocessed, by where the work ran (pool, inline, queue_full, fallback)",
+    ["mode"],
+)
+HTTP_REQUEST_LATENCY = Histogram(
+    "mobi_http_request_duration_seconds",
+    "HTTP request latency per endpoint",
+    ["method", "endpoint", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimate the USD cost of a call from its token counts."""
+    input_price, output_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def record_vision_usage(
+    model_type: str,
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    latency_seconds: float,
+) -> Dict[str, Any]:
+    """
+    Record token and cost metrics for one vision model call.
+
+    Call latency is observed by `analyze_property_image`, which wraps every
+    model type; here it is only copied into the returned summary.
+
+    Returns:
+        Usage summary that is attached to the analysis result under "usage"
+    """
+    cost = estimate_cost(model, input_tokens, output_tokens)
+
+    VISION_TOKENS.labels(model_type, model, "input").inc(input_tokens)
+    VISION_TOKENS.labels(model_type, model, "output").inc(output_tokens)
+    VISION_CALL_TOKENS.labels(model_type, "input").observe(input_tokens)
+    VISION_CALL_TOKENS.labels(model_type, "output").observe(output_tokens)
+    VISION_COST.labels(model_type, model).inc(cost)
+
+    return {
+        "model": model,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "latency_ms": round(latency_seconds * 1000, 1),
+        "cost_usd": round(cost, 6),
+    }
+
+
+def record_parse_path(model_type: str, path: str) -> None:
+    """Record which parsing path was taken for a model response."""
+    VISION_PARSE_PATH.labels(model_type, path).inc()
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Record a hit or miss for one of the analysis caches."""
+    VISION_CACHE.labels(cache, "hit" if hit else "miss").inc()
+
+
+def summarize_usage(analyses: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sum the per-image usage of several analyses into a per-listing total.
+
+    Analyses without usage (mock model, failed images) are skipped.
+    """
+    summary = {"input_tokens": 0, "output_tokens": 0, "latency_ms": 0.0, "cost_usd": 0.0, "model_calls": 0}
+    for analysis in analyses:
+        usage: Optional[Dict[str, Any]] = analysis.get("usage")
+        if not usage:
+            continue
+        summary["input_tokens"] += usage.get("input_tokens", 0)
+        summary["output_tokens"] += usage.get("output_tokens", 0)
+        summary["latency_ms"] += usage.get("latency_ms", 0.0)
+        summary["cost_usd"] += usage.get("cost_usd", 0.0)
+        summary["model_calls"] += 1
+    summary["latency_ms"] = round(summary["latency_ms"], 1)
+    summary["cost_usd"] = round(summary["cost_usd"], 6)
+    return summary
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    When PROMETHEUS_MULTIPROC_DIR is set (multi-worker deployments), values
+    from every worker process are aggregated.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
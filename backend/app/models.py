@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Index, JSON
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -33,6 +33,18 @@ class Listing(Base):
     # Relationships
     images = relationship("ListingImage", back_populates="listing", cascade="all, delete-orphan")
     synthesis = relationship("ListingSynthesis", back_populates="listing", uselist=False, cascade="all, delete-orphan")
+    amenity_links = relationship("ListingAmenity", cascade="all, delete-orphan")
+    room_counts = relationship("ListingRoomCounts", uselist=False, cascade="all, delete-orphan")
+    search_document = relationship("ListingSearchDocument", uselist=False, cascade="all, delete-orphan")
+    
+    # Composite indexes for the common search predicates (see app/search.py):
+    # equality columns first, then the range/sort column
+    __table_args__ = (
+        Index("ix_listings_city_type_price", "city", "property_type", "price"),
+        Index("ix_listings_type_price", "property_type", "price"),
+        Index("ix_listings_status_created", "status", "created_at"),
+        Index("ix_listings_created", "created_at"),
+    )
 
 
 class ListingImage(Base):
@@ -61,6 +73,7 @@ class ListingImage(Base):
     
     # Relationships
     listing = relationship("Listing", back_populates="images")
+    amenity_links = relationship("ListingImageAmenity", cascade="all, delete-orphan")
 
 
 class ListingSynthesis(Base):
@@ -82,4 +95,112 @@ class ListingSynthesis(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    listing = relationship("Listing", back_populates="synthesis")
\ No newline at end of file
+    listing = relationship("Listing", back_populates="synthesis")
+
+
+class ListingDraft(Base):
+    __tablename__ = "listing_drafts"
+    
+    # Random token handed to the client; see app/drafts.py
+    id = Column(String(32), primary_key=True)
+    
+    # Guided-flow state
+    form_data = Column(JSON, nullable=False, default=dict)  # field_id: value
+    vision_results = Column(JSON, nullable=False, default=list)  # image analyses, in order
+    detected_features = Column(JSON, nullable=False, default=dict)  # e.g. {"amenities": [...], "amenities_confidence": {...}}
+    
+    # Incremented on every write, for compare-and-swap between workers
+    version = Column(Integer, nullable=False, default=1)
+    
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class AnalysisResult(Base):
+    __tablename__ = "analysis_results"
+    
+    id = Column(Integer, primary_key=True)
+    
+    # What was analyzed, and how; see app/analysis_store.py
+    image_hash = Column(String(64), nullable=False)  # sha256 of the uploaded image bytes
+    model_type = Column(String, nullable=False)  # openai, anthropic, mock, ...
+    model = Column(String, nullable=False)  # e.g. "gpt-4.1"
+    prompt_version = Column(String(16), nullable=False)  # see vision_model.prompt_version
+    
+    # Parsed analysis, without its usage summary
+    result = Column(JSON, nullable=False)
+    
+    # Usage of the call that produced the result
+    input_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    latency_ms = Column(Float, nullable=False, default=0.0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+    
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ux_analysis_results_key", "image_hash", "model", "prompt_version", unique=True),
+        Index("ix_analysis_results_model_prompt", "model", "prompt_version"),
+    )
+
+
+# Normalized, indexed copies of the JSON analysis fields above (see app/listing_index.py).
+# The JSON columns stay the source of truth; these tables exist for filtering.
+
+
+class Amenity(Base):
+    __tablename__ = "amenities"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True)  # normalized, e.g. "pool", "hardwood_floors"
+
+
+class ListingAmenity(Base):
+    __tablename__ = "listing_amenities"
+    
+    listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), primary_key=True)
+    amenity_id = Column(Integer, ForeignKey("amenities.id"), primary_key=True)
+    
+    # "Listings with amenity X" scans this index instead of every listing's JSON
+    __table_args__ = (
+        Index("ix_listing_amenities_amenity_listing", "amenity_id", "listing_id"),
+    )
+
+
+class ListingImageAmenity(Base):
+    __tablename__ = "listing_image_amenities"
+    
+    image_id = Column(Integer, ForeignKey("listing_images.id", ondelete="CASCADE"), primary_key=True)
+    amenity_id = Column(Integer, ForeignKey("amenities.id"), primary_key=True)
+    
+    __table_args__ = (
+        Index("ix_listing_image_amenities_amenity_image", "amenity_id", "image_id"),
+    )
+
+
+class ListingRoomCounts(Base):
+    __tablename__ = "listing_room_counts"
+    
+    listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Detected room counts, from the synthesis room_breakdown when present
+    bedrooms = Column(Integer, nullable=False, default=0, index=True)
+    bathrooms = Column(Integer, nullable=False, default=0, index=True)
+    kitchens = Column(Integer, nullable=False, default=0)
+    living_rooms = Column(Integer, nullable=False, default=0)
+    dining_rooms = Column(Integer, nullable=False, default=0)
+    other_rooms = Column(Integer, nullable=False, default=0)
+    total_rooms = Column(Integer, nullable=False, default=0, index=True)
+
+
+class ListingSearchDocument(Base):
+    __tablename__ = "listing_search_documents"
+    
+    listing_id = Column(Integer, ForeignKey("listings.id", ondelete="CASCADE"), primary_key=True)
+    
+    # Analyzed (folded, stemmed) terms of the listing's descriptions, see app/text_search.py.
+    # SQLite indexes it in the listing_fts FTS5 table, Postgres in a generated tsvector column.
+    document = Column(Text, nullable=False, default="")
@@ -4,181 +4,25 @@ Orchestration logic for determining which fields to show next in the AI-guided l
 This module implements the "brain" that decides what questions to ask based on the current form state.
 """
 
-from typing import Optional, Dict, Any
-from app.schemas import UIField, FieldOption, AnalyzeStepResponse
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Dict, Any, FrozenSet, Tuple
+from app.schemas import UIField
+# Field tables live in the registry; re-exported here for existing imports
+from app.field_registry import COMMON_FIELDS, DEFAULT_PRIORITY, PROPERTY_TYPE_FIELDS, PROPERTY_TYPE_FIELD, registry
+from app.localization import get_locale, render_ai_message
 
 
-# Define field configurations for different property types
-PROPERTY_TYPE_FIELDS = {
-    "house": [
-        {
-            "id": "lot_size",
-            "component_type": "number",
-            "label": "Lot Size (sq ft)",
-            "min": 0,
-            "max": 100000,
-            "step": 100,
-            "required": False,
-        },
-        {
-            "id": "roof_age",
-            "component_type": "number", 
-            "label": "Roof Age (years)",
-            "min": 0,
-            "max": 100,
-            "required": False,
-        },
-        {
-            "id": "garage",
-            "component_type": "select",
-            "label": "Garage Type",
-            "options": [
-                FieldOption(value="none", label="No Garage"),
-                FieldOption(value="attached", label="Attached"),
-                FieldOption(value="detached", label="Detached"),
-                FieldOption(value="carport", label="Carport"),
-            ],
-            "required": False,
-        },
-        {
-            "id": "stories",
-            "component_type": "number",
-            "label": "Number of Stories",
-            "min": 1,
-            "max": 10,
-            "default": 1,
-            "required": False,
-        }
-    ],
-    "apartment": [
-        {
-            "id": "floor_number",
-            "component_type": "number",
-            "label": "Floor Number",
-            "min": 1,
-            "max": 100,
-            "required": False,
-        },
-        {
-            "id": "elevator",
-            "component_type": "toggle",
-            "label": "Has Elevator",
-            "required": False,
-        },
-        {
-            "id": "building_age",
-            "component_type": "number",
-            "label": "Building Age (years)",
-            "min": 0,
-            "max": 200,
-            "required": False,
-        },
-        {
-            "id": "pets_allowed",
-            "component_type": "toggle",
-            "label": "Pets Allowed",
-            "required": False,
-        }
-    ],
-    "condo": [
-        {
-            "id": "condo_fees",
-            "component_type": "number",
-            "label": "Monthly Condo Fees",
-            "min": 0,
-            "max": 10000,
-            "step": 50,
-            "required": False,
-        },
-        {
-            "id": "amenities",
-            "component_type": "select",
-            "label": "Building Amenities",
-            "options": [
-                FieldOption(value="gym", label="Gym/Fitness"),
-                FieldOption(value="pool", label="Swimming Pool"),
-                FieldOption(value="concierge", label="Concierge"),
-                FieldOption(value="parking", label="Parking"),
-                FieldOption(value="storage", label="Storage"),
-            ],
-            "required": False,
-        }
-    ]
-}
+# Distinct (property type, filled fields) states kept by the manifest cache
+MANIFEST_CACHE_SIZE = int(os.getenv("MANIFEST_CACHE_SIZE", "4096"))
 
-# Common fields that apply to all property types
-COMMON_FIELDS = [
-    {
-        "id": "bedrooms",
-        "component_type": "number",
-        "label": "Number of Bedrooms",
-        "min": 0,
-        "max": 20,
-        "default": 2,
-        "required": True,
-        "priority": 1,
-    },
-    {
-        "id": "bathrooms",
-        "component_type": "number",
-        "label": "Number of Bathrooms",
-        "min": 0,
-        "max": 10,
-        "default": 1,
-        "required": True,
-        "priority": 2,
-    },
-    {
-        "id": "square_feet",
-        "component_type": "number",
-        "label": "Square Feet",
-        "min": 100,
-        "max": 50000,
-        "step": 50,
-        "required": True,
-        "priority": 3,
-    },
-    {
-        "id": "price",
-        "component_type": "number",
-        "label": "Price",
-        "min": 50000,
-        "max": 10000000,
-        "step": 1000,
-        "required": True,
-        "priority": 4,
-    },
-    {
-        "id": "address",
-        "component_type": "text",
-        "label": "Address",
-        "placeholder": "123 Main St, City, State",
-        "required": True,
-        "priority": 5,
-    },
-    {
-        "id": "description",
-        "component_type": "text",
-        "label": "Description",
-        "placeholder": "Describe your property...",
-        "required": False,
-        "priority": 6,
-    },
-    {
-        "id": "has_parking",
-        "component_type": "toggle",
-        "label": "Has Parking",
-        "required": False,
-        "priority": 7,
-    },
-    {
-        "id": "has_pool",
-        "component_type": "toggle",
-        "label": "Has Pool",
-        "required": False,
-        "priority": 8,
-    }
-]
+
+@dataclass(frozen=True)
+class ManifestFragment:
+    """Next fields and completion for one form state; shared, do not mutate."""
+    fields: Tuple[UIField, ...]
+    completion_percentage: float
 
 
 class FieldOrchestrator:
@@ -188,6 +32,7 @@ class FieldOrchestrator:
     
     def __init__(self):
         self.max_fields_per_step = 3
+        self._cached_manifest = lru_cache(maxsize=MANIFEST_CACHE_SIZE)(self._build_manifest)
     
     def get_next_fields(self, current_data: Dict[str, Any]) -> list[UIField]:
         """
@@ -199,129 +44,86 @@ class FieldOrchestrator:
         Returns:
             List of UIField objects to display next (max 3 fields)
         """
-        # If property_type is missing, it should be the first field
-        if "property_type" not in current_data:
-            return [
-                UIField(
-                    id="property_type",
-                    component_type="select",
-                    label="Tipul Proprietății",
-                    placeholder="Selectați tipul proprietății",
-                    options=[
-                        FieldOption(value="house", label="Casă"),
-                        FieldOption(value="apartment", label="Apartament"),
-                        FieldOption(value="condo", label="Condominium"),
-                        FieldOption(value="townhouse", label="Casă în Șir"),
-                        FieldOption(value="land", label="Teren"),
-                        FieldOption(value="commercial", label="Comercial"),
-                    ],
-                    required=True,
-                )
-            ]
-        
-        property_type = current_data.get("property_type")
-        
-        # Get fields that haven't been filled yet
-        unfilled_fields = self._get_unfilled_fields(current_data, property_type)
+        return list(self.manifest(current_data).fields)
+    
+    def manifest(self, current_data: Dict[str, Any]) -> ManifestFragment:
+        """
+        Next fields and completion percentage for a form state, memoized.
         
-        # Prioritize fields and limit to max_fields_per_step
-        prioritized_fields = self._prioritize_fields(unfilled_fields, current_data)
+        Both depend only on the property type and which fields are filled (not
+        their values), so results are cached on that signature in a bounded
+        LRU. The returned fragment is shared between callers.
+        """
+        signature = (current_data.get("property_type"), frozenset(current_data), self.max_fields_per_step)
+        try:
+            return self._cached_manifest(*signature)
+        except TypeError:
+            # Unhashable property_type value: nothing to cache on
+            return self._build_manifest(*signature)
+    
+    def _build_manifest(self, property_type: Any, filled: FrozenSet[str], max_fields: int) -> ManifestFragment:
+        return ManifestFragment(
+            fields=self._select_fields(property_type, filled, max_fields),
+            completion_percentage=self._completion_percentage(property_type, len(filled)),
+        )
+    
+    def _select_fields(self, property_type: Any, filled: FrozenSet[str], max_fields: int) -> Tuple[UIField, ...]:
+        # If property_type is missing, it should be the first field
+        if "property_type" not in filled:
+            return (PROPERTY_TYPE_FIELD,)
         
-        # Convert to UIField objects
+        # Registry fields are pre-sorted by priority: take the first unfilled ones
         ui_fields = []
-        for field_config in prioritized_fields[:self.max_fields_per_step]:
-            ui_field = UIField(**field_config)
-            ui_fields.append(ui_field)
+        for definition in registry.manifest_fields(property_type):
+            if definition.id not in filled:
+                ui_fields.append(definition.ui_field)
+                if len(ui_fields) == max_fields:
+                    break
         
-        return ui_fields
+        return tuple(ui_fields)
     
     def _get_unfilled_fields(self, current_data: Dict[str, Any], property_type: Optional[str]) -> list[Dict[str, Any]]:
         """
         Get all fields that haven't been filled in the current data.
         """
-        unfilled_fields = []
-        
-        # Get property-specific fields
-        if property_type in PROPERTY_TYPE_FIELDS:
-            property_fields = PROPERTY_TYPE_FIELDS[property_type]
-            for field in property_fields:
-                if field["id"] not in current_data:
-                    unfilled_fields.append(field)
-        
-        # Get common fields that haven't been filled
-        for field in COMMON_FIELDS:
-            if field["id"] not in current_data:
-                unfilled_fields.append(field)
-        
-        return unfilled_fields
+        return [
+            definition.config
+            for definition in registry.manifest_fields(property_type)
+            if definition.id not in current_data
+        ]
     
     def _prioritize_fields(self, unfilled_fields: list[Dict[str, Any]], current_data: Dict[str, Any]) -> list[Dict[str, Any]]:
         """
         Prioritize fields based on importance and current form state.
         """
-        # Add priority to fields that don't have it
-        for field in unfilled_fields:
-            if "priority" not in field:
-                field["priority"] = 10  # Default priority for non-essential fields
-        
-        # Sort by priority (lower number = higher priority)
-        return sorted(unfilled_fields, key=lambda x: x["priority"])
+        # Sort by priority (lower number = higher priority); fields without one come last
+        return sorted(unfilled_fields, key=lambda x: x.get("priority", DEFAULT_PRIORITY))
     
-    def generate_ai_message(self, current_data: Dict[str, Any], next_fields: list[UIField]) -> str:
+    def generate_ai_message(self, current_data: Dict[str, Any], next_fields: list[UIField], locale: Optional[str] = None) -> str:
         """
         Generate an appropriate AI message based on the current state and next fields.
         """
-        return self._generate_ai_message(current_data, len(current_data))
+        return self._generate_ai_message(current_data, len(current_data), locale)
     
-    def _generate_ai_message(self, current_data: Dict[str, Any], step: int) -> str:
-        """Generate Romanian AI guidance message based on current state."""
-        
-        # No property type yet
-        if not current_data.get("property_type"):
-            return "Să începem prin a identifica ce tip de proprietate afișați."
-        
-        property_type_ro = self._translate_property_type(current_data.get("property_type"))
-        
-        # Early steps
-        if step < 3:
-            return f"Excelent! Am identificat că este vorba despre un {property_type_ro}. Să continuăm cu detaliile esențiale."
-        
-        # Middle steps
-        if step < 5:
-            return "Faceți progrese bune! Încă câteva detalii cheie pentru anunțul dvs."
-        
-        # Later steps
-        if step < 7:
-            return "Aproape gata! Permiteți-mi să completez informațiile finale."
-        
-        # Complete
-        return "Perfect! Ați completat toate informațiile necesare. Sunteți gata să previzualizați și să salvați anunțul?"
+    def _generate_ai_message(self, current_data: Dict[str, Any], step: int, locale: Optional[str] = None) -> str:
+        """Generate the AI guidance message (Romanian by default) for the current state."""
+        return render_ai_message(current_data.get("property_type"), step, locale)
 
     def _translate_property_type(self, property_type: str) -> str:
         """Translate property type to Romanian."""
-        translations = {
-            'apartment': 'apartament',
-            'house': 'casă',
-            'condo': 'condominium',
-            'townhouse': 'casă în șir',
-            'land': 'teren',
-            'commercial': 'proprietate comercială'
-        }
-        return translations.get(property_type, property_type)
+        return get_locale().property_type(property_type)
     
     def calculate_completion_percentage(self, current_data: Dict[str, Any]) -> float:
         """
         Calculate estimated completion percentage based on fields filled.
         """
+        return self._completion_percentage(current_data.get("property_type"), len(current_data))
+    
+    def _completion_percentage(self, property_type: Any, filled_fields: int) -> float:
         # Count total possible fields (common + property-specific)
-        property_type = current_data.get("property_type")
-        total_fields = len(COMMON_FIELDS)
-        
-        if property_type in PROPERTY_TYPE_FIELDS:
-            total_fields += len(PROPERTY_TYPE_FIELDS[property_type])
+        total_fields = registry.field_count(property_type)
         
         # Calculate percentage
-        filled_fields = len(current_data)
         if total_fields == 0:
             return 0.0
         
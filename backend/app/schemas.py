@@ -2,15 +2,19 @@
 Pydantic schemas for the Mobi AI-guided listing system.
 
 This module defines the UI Manifest schema that serves as the contract
-between the backend and frontend for dynamic form rendering.
+between the backend and frontend for dynamic form rendering, and the
+request/response schemas for saving listings.
 """
 
-from typing import Any, Literal, Optional
-from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, validator
 
 
 class FieldOption(BaseModel):
     """Option for select-type fields"""
+    model_config = ConfigDict(frozen=True)
+
     value: str
     label: str
 
@@ -20,8 +24,12 @@ class UIField(BaseModel):
     Single field definition in the UI schema.
     
     The frontend's component registry will map `component_type` to
-    the appropriate Svelte component.
+    the appropriate Svelte component. Instances are frozen because the
+    field registry shares them between requests; use `model_copy(update=...)`
+    to change a field.
     """
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(..., description="Unique identifier for this field")
     component_type: Literal['text', 'select', 'number', 'toggle'] = Field(
         ..., 
@@ -116,6 +124,10 @@ class AnalyzeStepRequest(BaseModel):
         None,
         description="Alternative to new_input: URL of an uploaded image"
     )
+    draft_id: Optional[str] = Field(
+        None,
+        description="Server-side draft to work from; current_data is then a merge patch on its form state"
+    )
 
 
 class AnalyzeStepResponse(UIManifest):
@@ -136,3 +148,108 @@ class AnalyzeStepResponse(UIManifest):
         None,
         description="Full AI analysis result from image processing (includes description, detected features, condition)"
     )
+    draft_id: Optional[str] = Field(
+        None,
+        description="Draft the step was stored in, if the request named one"
+    )
+
+
+class AnalyzeStepBatchItem(BaseModel):
+    """
+    One result from /api/analyze-step/batch, in request order.
+    
+    Exactly one of `response` and `error` is set.
+    """
+    index: int = Field(..., description="Position of the item in the request array")
+    response: Optional[AnalyzeStepResponse] = None
+    error: Optional[str] = Field(None, description="Why this item could not be processed")
+
+
+# Request schemas for save listing endpoint
+class ImageDataSchema(BaseModel):
+    image_data: str  # base64 encoded
+    ai_analysis: Optional[dict] = None
+    order_index: int = 0
+
+
+class SynthesisDataSchema(BaseModel):
+    total_rooms: int
+    layout_type: str
+    unified_description: str
+    room_breakdown: dict
+    property_overview: dict
+    interior_features: list = []
+    exterior_features: list = []
+
+
+class SaveListingRequest(BaseModel):
+    # Property data
+    property_type: str
+    price: Optional[int] = None
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[float] = None
+    square_feet: Optional[int] = None
+    
+    # Location
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip_code: Optional[str] = None
+    
+    # Additional form fields (dynamic)
+    additional_fields: Optional[dict] = {}
+    
+    # Images
+    images: List[ImageDataSchema] = []
+    
+    # Synthesis
+    synthesis: Optional[SynthesisDataSchema] = None
+    
+    @validator('property_type', pre=True)
+    def validate_property_type(cls, v):
+        if not v or (isinstance(v, str) and not v.strip()):
+            raise ValueError('property_type is required')
+        return v
+    
+    @validator('images', pre=True)
+    def validate_images(cls, v):
+        if not v or len(v) == 0:
+            raise ValueError('At least one image is required')
+        return v
+
+
+class SaveListingResponse(BaseModel):
+    success: bool
+    listing_id: int
+    message: str
+
+
+# Draft store schemas (see app/drafts.py)
+class DraftCreateRequest(BaseModel):
+    current_data: dict[str, Any] = Field(default_factory=dict, description="Initial form state")
+
+
+class DraftPatchRequest(BaseModel):
+    """Merge patches (RFC 7396): a null value removes the key."""
+    current_data: dict[str, Any] = Field(default_factory=dict, description="Changes to the form state")
+    detected_features: dict[str, Any] = Field(default_factory=dict, description="Changes to the detected features")
+
+
+class DraftResponse(BaseModel):
+    draft_id: str
+    current_data: dict[str, Any]
+    vision_results: List[dict[str, Any]]
+    detected_features: dict[str, Any]
+    version: int
+    expires_at: datetime
+
+
+class DraftSaveRequest(BaseModel):
+    """
+    Images and synthesis for saving a draft as a listing.
+    
+    Property fields come from the draft; images without `ai_analysis` get the
+    draft's vision result at the same position.
+    """
+    images: List[ImageDataSchema] = []
+    synthesis: Optional[SynthesisDataSchema] = None
@@ -0,0 +1,166 @@
+"""
+Declarative listing search.
+
+`POST /api/listings/search` accepts a filter and sort spec instead of raw
+query parameters:
+
+    {
+        "filters": {
+            "property_type": {"in": ["apartment", "house"]},
+            "city": {"eq": "Cluj-Napoca"},
+            "price": {"gte": 80000, "lte": 150000},
+            "bedrooms": {"gte": 2}
+        },
+        "amenities": ["pool"],
+        "detected_rooms": {"bedrooms": 3},
+        "sort": [{"field": "price", "direction": "asc"}],
+        "limit": 20,
+        "offset": 0
+    }
+
+Only whitelisted fields and operators are accepted. Each predicate becomes a
+plain comparison on a `Listing` column, so the composite indexes declared on
+the model ((city, property_type, price), (property_type, price),
+(status, created_at)) serve the common combinations; `amenities` uses the
+normalized amenity index from `app.listing_index`, and `detected_rooms`
+(minimum room counts found by image analysis, as opposed to the seller-entered
+`bedrooms`/`bathrooms`) its `listing_room_counts` table. Results are always
+ordered by `id` last so offset pagination is stable.
+"""
+
+from typing import Any, Dict, List, Literal
+
+from pydantic import BaseModel, Field, validator
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.listing_index import ROOM_COLUMNS, amenity_filter, min_rooms_filter
+from app.models import Listing
+
+# Filterable fields -> allowed operators
+FILTER_FIELDS = {
+    "property_type": {"eq", "ne", "in"},
+    "city": {"eq", "ne", "in"},
+    "state": {"eq", "in"},
+    "zip_code": {"eq", "in"},
+    "status": {"eq", "ne", "in"},
+    "price": {"eq", "gt", "gte", "lt", "lte"},
+    "bedrooms": {"eq", "gt", "gte", "lt", "lte", "in"},
+    "bathrooms": {"eq", "gt", "gte", "lt", "lte"},
+    "square_feet": {"eq", "gt", "gte", "lt", "lte"},
+}
+
+# Detected room-count filters: ListingRoomCounts columns, each a minimum
+DETECTED_ROOM_FIELDS = (*ROOM_COLUMNS.values(), "other_rooms", "total_rooms")
+
+NUMERIC_FIELDS = {"price", "bedrooms", "bathrooms", "square_feet"}
+
+SORT_FIELDS = ("created_at", "updated_at", "price", "bedrooms", "bathrooms", "square_feet")
+
+MAX_LIMIT = 100
+
+_OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+    "in": lambda column, value: column.in_(value),
+}
+
+
+class SortSpec(BaseModel):
+    field: Literal[SORT_FIELDS]
+    direction: Literal["asc", "desc"] = "desc"
+
+
+class ListingSearchRequest(BaseModel):
+    filters: Dict[str, Dict[str, Any]] = {}
+    amenities: List[str] = []
+    detected_rooms: Dict[str, int] = {}
+    sort: List[SortSpec] = Field([SortSpec(field="created_at", direction="desc")], max_length=3)
+    limit: int = Field(20, ge=1, le=MAX_LIMIT)
+    offset: int = Field(0, ge=0)
+
+    @validator("filters")
+    def validate_filters(cls, filters):
+        for field, conditions in filters.items():
+            allowed = FILTER_FIELDS.get(field)
+            if allowed is None:
+                raise ValueError(f"Unknown filter field: {field}")
+            if not conditions:
+                raise ValueError(f"Filter for {field} has no conditions")
+            for op, value in conditions.items():
+                if op not in allowed:
+                    raise ValueError(f"Operator {op} is not supported for {field}")
+                if op == "in" and (not isinstance(value, list) or not value):
+                    raise ValueError(f"Operator in for {field} needs a non-empty list")
+                for item in value if op == "in" else [value]:
+                    if not _valid_value(field, item):
+                        raise ValueError(f"Invalid value for {field}: {item!r}")
+        return filters
+
+    @validator("detected_rooms")
+    def validate_detected_rooms(cls, detected_rooms):
+        for field, minimum in detected_rooms.items():
+            if field not in DETECTED_ROOM_FIELDS:
+                raise ValueError(f"Unknown detected room field: {field}")
+            if minimum < 0:
+                raise ValueError(f"Minimum for {field} must not be negative")
+        return detected_rooms
+
+
+def _valid_value(field: str, value: Any) -> bool:
+    if field in NUMERIC_FIELDS:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, str)
+
+
+def build_search_query(db: Session, request: ListingSearchRequest):
+    """
+    Translate a search request into a SELECT on `Listing` (without paging).
+
+    Returns:
+        The filtered statement; callers add ordering and limits
+    """
+    conditions = []
+    for field, ops in request.filters.items():
+        column = getattr(Listing, field)
+        for op, value in ops.items():
+            conditions.append(_OPERATORS[op](column, value))
+    if request.amenities:
+        conditions.append(amenity_filter(db, request.amenities))
+    if request.detected_rooms:
+        conditions.append(min_rooms_filter(**request.detected_rooms))
+    return select(Listing).where(*conditions)
+
+
+def order_clauses(sort: List[SortSpec]) -> list:
+    clauses = []
+    for spec in sort:
+        column = getattr(Listing, spec.field)
+        clauses.append(column.asc() if spec.direction == "asc" else column.desc())
+    # Tie-breaker so pages don't overlap when sort keys repeat
+    last_desc = sort[-1].direction == "desc" if sort else True
+    clauses.append(Listing.id.desc() if last_desc else Listing.id.asc())
+    return clauses
+
+
+def search_listings(db: Session, request: ListingSearchRequest) -> tuple[int, List[Listing]]:
+    """
+    Run a listing search.
+
+    Returns:
+        (total number of matches, listings on the requested page) with
+        images and synthesis eagerly loaded
+    """
+    query = build_search_query(db, request)
+    total = db.scalar(select(func.count()).select_from(query.with_only_columns(Listing.id).subquery()))
+    listings = db.scalars(
+        query.options(selectinload(Listing.images), selectinload(Listing.synthesis))
+        .order_by(*order_clauses(request.sort))
+        .limit(request.limit)
+        .offset(request.offset)
+    ).all()
+    return total, listings
@@ -0,0 +1,69 @@
+"""
+Production process model for the Mobi backend.
+
+`gunicorn.conf.py` runs the app under gunicorn with `MobiUvicornWorker`: the
+app is imported once in the master (preload) and forked into N uvicorn worker
+processes. This module holds the worker class and the fork-safety hooks the
+config calls.
+"""
+
+import importlib.util
+import logging
+import os
+
+from uvicorn_worker import UvicornWorker
+
+logger = logging.getLogger(__name__)
+
+
+def _fastest(module: str, preferred: str) -> str:
+    """Use the compiled implementation when installed, else let uvicorn choose."""
+    return preferred if importlib.util.find_spec(module) else "auto"
+
+
+class MobiUvicornWorker(UvicornWorker):
+    """
+    Uvicorn worker using uvloop and httptools.
+    
+    On SIGTERM the worker stops accepting connections and waits for in-flight
+    requests (e.g. long vision analyses) to finish, up to just under gunicorn's
+    `graceful_timeout` so lifespan shutdown still runs before the hard kill.
+    """
+    
+    CONFIG_KWARGS = {
+        "loop": _fastest("uvloop", "uvloop"),
+        "http": _fastest("httptools", "httptools"),
+    }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(self.cfg.graceful_timeout - 5, 1)
+
+
+def prepare_master() -> None:
+    """
+    Run one-time setup in the gunicorn master before workers are forked.
+    
+    Tables are created and expired drafts purged here once, and workers are
+    told to skip `init_db` so they don't race on `CREATE TABLE`.
+    """
+    from app.main import init_db, purge_expired_drafts
+    
+    init_db()
+    purge_expired_drafts()
+    os.environ["MOBI_SKIP_INIT_DB"] = "1"
+    logger.info("Database initialized in master process")
+
+
+def reset_after_fork() -> None:
+    """
+    Drop state inherited from the master that must not be shared across processes.
+    
+    Pooled DB connections and provider clients (sockets, locks) are only safe
+    in the process that created them.
+    """
+    from app.main import engine
+    from app.vision_model import reset_vision_model_cache
+    
+    engine.dispose(close=False)
+    reset_vision_model_cache()
@@ -0,0 +1,152 @@
+"""
+Simulated vision provider for load testing.
+
+`SimulatedVisionModel` returns the same canned analyses as `MockVisionModel`
+but behaves like a remote provider: it sleeps for a configurable latency
+distribution, paces output tokens like a streamed completion, fails a
+configurable share of calls and answers others with rate-limit (429) errors.
+Token usage is recorded like a real model so `/metrics` is exercised too.
+
+Select it with `VISION_MODEL_TYPE=simulated`. Behaviour is configured through
+`SimulationConfig`, or from the environment:
+
+- `SIM_VISION_LATENCY_DIST`: `fixed`, `uniform`, `normal` or `lognormal` (default)
+- `SIM_VISION_LATENCY_MS`: median (lognormal), mean (normal) or value (fixed); default 1500
+- `SIM_VISION_LATENCY_SPREAD`: sigma for lognormal (default 0.4), stddev in ms
+  for normal, or +/- half-width in ms for uniform
+- `SIM_VISION_ERROR_RATE`: share of calls failing with a provider error (default 0)
+- `SIM_VISION_RATE_LIMIT_RATE`: share of calls rejected with a 429 (default 0)
+- `SIM_VISION_OUTPUT_TOKENS`: completion tokens per call (default 250)
+- `SIM_VISION_TOKENS_PER_SECOND`: output streaming speed, 0 disables pacing (default 0)
+- `SIM_VISION_SEED`: seed for reproducible runs
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.metrics import VISION_ERRORS, record_vision_usage
+from app.vision_model import (
+    MockVisionModel,
+    VisionModelError,
+    VisionModelInterface,
+    VisionModelRateLimitError,
+)
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+# Streamed tokens are released in chunks, like SSE deltas from the providers
+STREAM_CHUNK_TOKENS = 16
+
+
+@dataclass
+class SimulationConfig:
+    """Behaviour of the simulated provider."""
+    latency_dist: str = "lognormal"
+    latency_ms: float = 1500.0
+    latency_spread: float = 0.4
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    output_tokens: int = 250
+    tokens_per_second: float = 0.0
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise VisionModelError(
+                f"Unknown latency distribution: {self.latency_dist} (expected one of {', '.join(LATENCY_DISTRIBUTIONS)})"
+            )
+        if not 0 <= self.error_rate + self.rate_limit_rate <= 1:
+            raise VisionModelError("error_rate + rate_limit_rate must be between 0 and 1")
+
+    @classmethod
+    def from_env(cls) -> "SimulationConfig":
+        seed = os.getenv("SIM_VISION_SEED")
+        return cls(
+            latency_dist=os.getenv("SIM_VISION_LATENCY_DIST", "lognormal"),
+            latency_ms=float(os.getenv("SIM_VISION_LATENCY_MS", "1500")),
+            latency_spread=float(os.getenv("SIM_VISION_LATENCY_SPREAD", "0.4")),
+            error_rate=float(os.getenv("SIM_VISION_ERROR_RATE", "0")),
+            rate_limit_rate=float(os.getenv("SIM_VISION_RATE_LIMIT_RATE", "0")),
+            output_tokens=int(os.getenv("SIM_VISION_OUTPUT_TOKENS", "250")),
+            tokens_per_second=float(os.getenv("SIM_VISION_TOKENS_PER_SECOND", "0")),
+            seed=int(seed) if seed else None,
+        )
+
+
+class SimulatedVisionModel(VisionModelInterface):
+    """Mock responses with provider-like latency, pacing and failures."""
+
+    model_type = "simulated"
+    model = "simulated"
+
+    def __init__(self, config: Optional[SimulationConfig] = None, **kwargs):
+        # kwargs such as api_key are accepted for factory compatibility and ignored
+        self.config = config or SimulationConfig.from_env()
+        self._random = random.Random(self.config.seed)
+        self._random_lock = threading.Lock()
+        self._mock = MockVisionModel()
+
+    def analyze_image(self, image_data: bytes, prompt: str) -> Dict[str, Any]:
+        """Sleep like a remote call, then fail or return a mock analysis."""
+        with self._random_lock:
+            latency = self.sample_latency()
+            outcome = self._random.random()
+
+        started = time.perf_counter()
+        time.sleep(latency)
+
+        if outcome < self.config.rate_limit_rate:
+            VISION_ERRORS.labels(self.model_type).inc()
+            raise VisionModelRateLimitError("Simulated provider rate limit (429)")
+        if outcome < self.config.rate_limit_rate + self.config.error_rate:
+            VISION_ERRORS.labels(self.model_type).inc()
+            raise VisionModelError("Failed to analyze image: simulated provider error")
+
+        self._stream_tokens(self.config.output_tokens)
+
+        result = self._mock.analyze_image(image_data, prompt)
+        result["usage"] = record_vision_usage(
+            self.model_type,
+            self.model,
+            estimate_image_tokens(len(image_data)) + len(prompt) // 4,
+            self.config.output_tokens,
+            time.perf_counter() - started,
+        )
+        return result
+
+    def sample_latency(self) -> float:
+        """Draw one time-to-first-token latency in seconds."""
+        config = self.config
+        if config.latency_dist == "fixed":
+            latency_ms = config.latency_ms
+        elif config.latency_dist == "uniform":
+            latency_ms = self._random.uniform(config.latency_ms - config.latency_spread,
+                                              config.latency_ms + config.latency_spread)
+        elif config.latency_dist == "normal":
+            latency_ms = self._random.gauss(config.latency_ms, config.latency_spread)
+        else:
+            latency_ms = config.latency_ms * self._random.lognormvariate(0, config.latency_spread)
+        return max(latency_ms, 0.0) / 1000
+
+    def _stream_tokens(self, tokens: int) -> None:
+        """Pace output like a streamed completion at `tokens_per_second`."""
+        if self.config.tokens_per_second <= 0:
+            return
+        chunk_delay = STREAM_CHUNK_TOKENS / self.config.tokens_per_second
+        remaining = tokens
+        while remaining > 0:
+            chunk = min(STREAM_CHUNK_TOKENS, remaining)
+            time.sleep(chunk_delay * chunk / STREAM_CHUNK_TOKENS)
+            remaining -= chunk
+
+
+def estimate_image_tokens(image_bytes: int) -> int:
+    """Rough input-token cost of an image, scaled from its encoded size."""
+    return 85 + 170 * max(1, image_bytes // 60_000)
@@ -0,0 +1,415 @@
+"""
+Re-synthesis backfill over stored listings.
+
+After a change to `synthesize_property_overview` or
+`generate_unified_description`, stored `ListingSynthesis` rows can be rebuilt
+from the per-image analysis columns of `listing_images` without calling the
+vision model again:
+
+- listings with a synthesis row are read in batches in `listing_id` order
+  (keyset pagination), with their images' analysis columns
+- each listing is re-synthesized in a process pool; near-duplicate photos are
+  found again from the stored image data (`app.image_hash`), since the
+  "duplicate_of" marks are not stored. Image data is read one listing at a
+  time, right before the listing is handed to a worker, and at most two
+  listings per worker are queued, so only a few listings' photos are in
+  memory at once whatever the batch size
+- only rows whose synthesis changed are written, with one bulk UPDATE per
+  batch; their amenity, room-count and search-document index rows are
+  rebuilt in the same transaction
+- after each committed batch the last listing ID is written to a checkpoint
+  file, so an interrupted run resumes after it
+- listings whose re-synthesis failed are listed in the report and the
+  checkpoint; a resumed run retries them before continuing
+
+Per-image materials are not stored either; every image gets the listing's
+stored `common_materials`, which leaves their union unchanged.
+
+Used by `python -m app.cli resynthesize`.
+"""
+
+import base64
+import binascii
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, selectinload
+
+from app.image_hash import dhash, group_near_duplicates
+from app.listing_index import index_listing
+from app.models import Listing, ListingImage, ListingSynthesis
+from app.text_search import index_listing_text
+from app.vision_model import synthesize_property_overview
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+
+# ListingSynthesis columns rebuilt from a synthesis
+SYNTHESIS_COLUMNS = (
+    "total_rooms",
+    "layout_type",
+    "unified_description",
+    "room_breakdown",
+    "property_overview",
+    "interior_features",
+    "exterior_features",
+)
+
+_IMAGE_COLUMNS = (
+    ListingImage.id,
+    ListingImage.listing_id,
+    ListingImage.ai_description,
+    ListingImage.detected_rooms,
+    ListingImage.detected_amenities,
+    ListingImage.property_type,
+    ListingImage.style,
+    ListingImage.condition,
+)
+
+
+def stored_image_bytes(image_data: Optional[str]) -> Optional[bytes]:
+    """Stored base64 (optionally a data: URL) as bytes; None if it cannot be decoded."""
+    if not image_data:
+        return None
+    if image_data.startswith("data:"):
+        image_data = image_data.partition(",")[2]
+    missing_padding = len(image_data) % 4
+    if missing_padding:
+        image_data += "=" * (4 - missing_padding)
+    try:
+        return base64.b64decode(image_data, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def stored_analysis(image: Dict[str, Any], materials: List[str]) -> Dict[str, Any]:
+    """Rebuild an image analysis from its `listing_images` columns."""
+    return {
+        "description": image["ai_description"] or "",
+        "property_type": image["property_type"],
+        "rooms": image["detected_rooms"] or {},
+        "amenities": image["detected_amenities"] or [],
+        "style": image["style"],
+        "materials": materials,
+        "condition": image["condition"] or "unknown",
+    }
+
+
+def resynthesize(images: Sequence[Dict[str, Any]], materials: List[str]) -> Dict[str, Any]:
+    """
+    Synthesis column values for one listing.
+
+    Runs in the backfill's worker processes.
+
+    Args:
+        images: Image rows in upload order; with an "image_data" key,
+            near-duplicates are grouped as in `analyze_multiple_images`
+        materials: The listing's stored `common_materials`
+    """
+    analyses = [stored_analysis(image, materials) for image in images]
+    if images and "image_data" in images[0]:
+        hashes = [None] * len(images)
+        for i, image in enumerate(images):
+            data = stored_image_bytes(image["image_data"])
+            if data is not None:
+                hashes[i] = dhash(data)
+        for i, representative in enumerate(group_near_duplicates(hashes)):
+            if representative != i:
+                analyses[i]["duplicate_of"] = representative
+
+    synthesis = synthesize_property_overview(analyses)
+    return {column: synthesis.get(column) for column in SYNTHESIS_COLUMNS}
+
+
+def _make_executor(workers: int) -> Optional[Executor]:
+    if workers <= 0:
+        return None
+    # As in app.image_pool: do not fork a process that may hold threads
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def _read_checkpoint_file(path: str) -> Dict[str, Any]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def read_checkpoint(path: str) -> int:
+    """Last listing ID recorded in a checkpoint file (0 if there is none)."""
+    return int(_read_checkpoint_file(path).get("last_listing_id", 0))
+
+
+def read_failed_listing_ids(path: str) -> List[int]:
+    """Listings recorded as failed in a checkpoint file, to be retried."""
+    return [int(listing_id) for listing_id in _read_checkpoint_file(path).get("failed_listing_ids", [])]
+
+
+def write_checkpoint(path: str, last_listing_id: int, failed_listing_ids: Optional[Sequence[int]] = None) -> None:
+    # Write-then-rename, so an interrupted write leaves the previous checkpoint
+    state: Dict[str, Any] = {"last_listing_id": last_listing_id}
+    if failed_listing_ids is not None:
+        state["failed_listing_ids"] = list(failed_listing_ids)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+class SynthesisBackfill:
+    """
+    Rebuilds stored syntheses batch by batch; see the module docstring.
+
+    Args:
+        db: Database session (committed once per batch)
+        batch_size: Listings per batch, UPDATE and commit
+        workers: Worker processes (0: synthesize in this process;
+            default: CPU count)
+        dedupe: Group near-duplicate photos from the stored image data (read
+            per listing); without it the (large) image column is not read
+        dry_run: Count what would change without writing
+        checkpoint_path: File recording the last committed listing ID and the
+            listings that failed
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: Optional[int] = None,
+        dedupe: bool = True,
+        dry_run: bool = False,
+        checkpoint_path: Optional[str] = None,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.db = db
+        self.batch_size = batch_size
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.dedupe = dedupe
+        self.dry_run = dry_run
+        self.checkpoint_path = checkpoint_path
+
+        self.processed = 0
+        self.changed = 0
+        self.failed = 0
+        self.failed_listing_ids: List[int] = []
+        self.last_listing_id = 0
+        # Listings from `run(retry=...)` not attempted yet
+        self._retry_pending: List[int] = []
+        self._started = time.monotonic()
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self._started
+        return {
+            "processed": self.processed,
+            "changed": self.changed,
+            "failed": self.failed,
+            "failed_listing_ids": list(self.failed_listing_ids),
+            "last_listing_id": self.last_listing_id,
+            "elapsed_seconds": round(elapsed, 3),
+            "listings_per_second": round(self.processed / elapsed, 1) if elapsed > 0 else 0.0,
+            "dry_run": self.dry_run,
+        }
+
+    def run(
+        self,
+        start_after: int = 0,
+        limit: Optional[int] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        retry: Sequence[int] = (),
+    ) -> Dict[str, Any]:
+        """
+        Backfill listings with an ID above `start_after`.
+
+        Args:
+            start_after: Resume point, e.g. from `read_checkpoint`
+            limit: Stop after about this many listings (whole batches)
+            progress: Called with `report()` after every batch
+            retry: Listings to re-synthesize first, e.g. from
+                `read_failed_listing_ids`
+
+        Returns:
+            The final `report()`
+        """
+        self.last_listing_id = start_after
+        self._retry_pending = sorted(set(retry))
+        self._started = time.monotonic()
+        executor = _make_executor(self.workers)
+        try:
+            while self._retry_pending:
+                listing_ids = self._retry_pending[:self.batch_size]
+                self._retry_pending = self._retry_pending[self.batch_size:]
+                rows = self._synthesis_rows(ListingSynthesis.listing_id.in_(listing_ids))
+                if rows:
+                    self._process(rows, executor, advance=False)
+                    if progress is not None:
+                        progress(self.report())
+            while limit is None or self.processed < limit:
+                rows = self._synthesis_rows(ListingSynthesis.listing_id > self.last_listing_id)
+                if not rows:
+                    break
+                self._process(rows, executor)
+                if progress is not None:
+                    progress(self.report())
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return self.report()
+
+    def _synthesis_rows(self, condition: Any) -> Sequence[Any]:
+        return self.db.execute(
+            select(ListingSynthesis.__table__)
+            .where(condition)
+            .order_by(ListingSynthesis.listing_id)
+            .limit(self.batch_size)
+        ).mappings().all()
+
+    def _load_images(self, listing_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """Analysis columns of the batch's images (not the image data)."""
+        rows = self.db.execute(
+            select(*_IMAGE_COLUMNS)
+            .where(ListingImage.listing_id.in_(listing_ids))
+            .order_by(ListingImage.listing_id, ListingImage.order_index, ListingImage.id)
+        ).mappings()
+        images: Dict[int, List[Dict[str, Any]]] = {}
+        for row in rows:
+            images.setdefault(row["listing_id"], []).append(dict(row))
+        return images
+
+    def _load_image_data(self, listing_id: int) -> Dict[int, Optional[str]]:
+        """Stored image data of one listing, by image ID."""
+        return dict(self.db.execute(
+            select(ListingImage.id, ListingImage.image_data).where(ListingImage.listing_id == listing_id)
+        ).all())
+
+    def _job(self, row: Any, images: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        materials = (row["property_overview"] or {}).get("common_materials") or []
+        if self.dedupe and images:
+            image_data = self._load_image_data(row["listing_id"])
+            images = [{**image, "image_data": image_data.get(image["id"])} for image in images]
+        return images, materials
+
+    def _resynthesized(
+        self,
+        rows: Sequence[Any],
+        images: Dict[int, List[Dict[str, Any]]],
+        executor: Optional[Executor],
+    ) -> Iterator[Tuple[Any, Optional[Dict[str, Any]]]]:
+        """(row, synthesis values) in row order; values are None if re-synthesis failed."""
+        def outcome(row, compute):
+            try:
+                return row, compute()
+            except Exception as e:
+                logger.error(f"Re-synthesis failed for listing {row['listing_id']}: {e}")
+                self.failed += 1
+                self.failed_listing_ids.append(row["listing_id"])
+                return row, None
+
+        if executor is None:
+            for row in rows:
+                job = self._job(row, images.get(row["listing_id"], []))
+                yield outcome(row, lambda: resynthesize(*job))
+            return
+
+        # Bounded, so only a few listings' image data is loaded or queued at a time
+        max_pending = max(self.workers, 1) * 2
+        pending = deque()
+        for row in rows:
+            job = self._job(row, images.get(row["listing_id"], []))
+            pending.append((row, executor.submit(resynthesize, *job)))
+            if len(pending) >= max_pending:
+                queued_row, future = pending.popleft()
+                yield outcome(queued_row, future.result)
+        while pending:
+            queued_row, future = pending.popleft()
+            yield outcome(queued_row, future.result)
+
+    def _process(self, rows: Sequence[Any], executor: Optional[Executor], advance: bool = True) -> None:
+        """Re-synthesize and commit one batch; `advance` moves the resume point past it."""
+        db = self.db
+        images = self._load_images([row["listing_id"] for row in rows])
+
+        updates, changed_listings = [], []
+        for row, values in self._resynthesized(rows, images, executor):
+            if values is None:
+                continue
+            if any(values[column] != row[column] for column in SYNTHESIS_COLUMNS):
+                updates.append({"id": row["id"], **values})
+                changed_listings.append(row["listing_id"])
+
+        if updates and not self.dry_run:
+            try:
+                db.execute(update(ListingSynthesis), updates)
+                self._reindex(changed_listings)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+        self.processed += len(rows)
+        self.changed += len(updates)
+        if advance:
+            self.last_listing_id = rows[-1]["listing_id"]
+        if self.checkpoint_path and not self.dry_run:
+            write_checkpoint(
+                self.checkpoint_path, self.last_listing_id, self.failed_listing_ids + self._retry_pending
+            )
+
+    def _reindex(self, listing_ids: List[int]) -> None:
+        """Rebuild the index rows derived from the updated syntheses."""
+        db = self.db
+        listings = db.scalars(
+            select(Listing)
+            .where(Listing.id.in_(listing_ids))
+            .options(
+                selectinload(Listing.images).selectinload(ListingImage.amenity_links),
+                selectinload(Listing.synthesis),
+                selectinload(Listing.amenity_links),
+                selectinload(Listing.room_counts),
+                selectinload(Listing.search_document),
+            )
+            .execution_options(populate_existing=True)
+        ).all()
+        for listing in listings:
+            index_listing(db, listing)
+            index_listing_text(db, listing)
+        db.flush()
+        # Keep the session's identity map from growing over the whole run
+        db.expunge_all()
+
+
+def backfill_synthesis(
+    db: Session,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: Optional[int] = None,
+    dedupe: bool = True,
+    dry_run: bool = False,
+    checkpoint_path: Optional[str] = None,
+    limit: Optional[int] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Rebuild stored syntheses, resuming from `checkpoint_path` if it exists
+    (listings that failed before are retried first).
+
+    Returns:
+        {"processed", "changed", "failed", "failed_listing_ids",
+         "last_listing_id", "elapsed_seconds", "listings_per_second", "dry_run"}
+    """
+    start_after = read_checkpoint(checkpoint_path) if checkpoint_path else 0
+    retry = read_failed_listing_ids(checkpoint_path) if checkpoint_path else []
+    if start_after:
+        logger.info(f"Resuming synthesis backfill after listing {start_after}, retrying {len(retry)} failed")
+    backfill = SynthesisBackfill(db, batch_size, workers, dedupe, dry_run, checkpoint_path)
+    return backfill.run(start_after=start_after, limit=limit, progress=progress, retry=retry)
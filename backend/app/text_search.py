@@ -0,0 +1,183 @@
+"""
+Full-text search over listing descriptions.
+
+Each listing gets one search document built from its synthesis
+`unified_description` and the `ai_description` of its images. The text is
+analyzed in Python (lowercased, diacritics folded so "parchet" matches
+"parchét" and "ș"/"ş" match "s", stop words dropped, Romanian inflections
+stemmed) and the resulting terms are indexed by the database:
+
+- SQLite: an FTS5 table `listing_fts` (rowid = listing id), ranked with bm25
+- Postgres: a generated `tsvector` column on `listing_search_documents` with a
+  GIN index, ranked with `ts_rank_cd`
+
+Analyzing in Python keeps stemming identical on both backends; the database
+only matches pre-stemmed terms. `index_listing_text` is called from
+`save_listing`, so the index is updated incrementally as listings are saved;
+listings stored without a search document are indexed with
+`python -m app.cli reindex`.
+"""
+
+import logging
+import re
+import unicodedata
+from typing import Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import Listing, ListingSearchDocument
+
+logger = logging.getLogger(__name__)
+
+MIN_STEM_LENGTH = 3
+
+STOP_WORDS = frozenset("""
+    a al ale ai cu cel cea cei cele de din dintre este fi in intr la mai o pe pentru prin sau se si
+    sunt un una unei unor unui care ca cum
+    an and are as at be by for from has have in is it its of on or the this to with
+""".split())
+
+# Romanian inflectional endings (articles, plurals, cases), longest first;
+# matched on diacritic-folded lowercase words
+SUFFIXES = (
+    "urilor", "ilor", "elor", "ului", "urile", "iile", "iei", "ele", "ile", "uri", "lor",
+    "ul", "le", "ii", "ei", "ea", "ia", "ie", "a", "e", "i", "u",
+)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Plurals like "dormitoare"/"balcoane" alternate o -> oa in the stem
+_OA_RE = re.compile(r"oa([b-df-hj-np-tv-z])$")
+
+
+def fold_diacritics(value: str) -> str:
+    """Strip diacritics ("ș" -> "s", "ă" -> "a") and lowercase."""
+    decomposed = unicodedata.normalize("NFKD", value.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def stem(word: str) -> str:
+    """Light Romanian stemmer: remove one inflectional ending."""
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return _OA_RE.sub(r"o\1", word[: -len(suffix)])
+    return word
+
+
+def analyze(value: Optional[str]) -> List[str]:
+    """Turn text into search terms (folded, stop words removed, stemmed)."""
+    if not value:
+        return []
+    return [stem(word) for word in _WORD_RE.findall(fold_diacritics(value)) if word not in STOP_WORDS]
+
+
+def listing_document(listing: Listing) -> str:
+    """Analyzed search document for a listing's synthesis and image descriptions."""
+    parts = []
+    if listing.synthesis is not None:
+        parts.append(listing.synthesis.unified_description)
+    parts.extend(image.ai_description for image in listing.images)
+    return build_document(parts)
+
+
+def build_document(descriptions: Iterable[Optional[str]]) -> str:
+    """Analyzed search document from raw description texts."""
+    return " ".join(term for description in descriptions for term in analyze(description))
+
+
+def ensure_text_index(engine: Engine) -> None:
+    """
+    Create the backend-specific full-text structures (idempotent).
+
+    `listing_search_documents` itself is created by `create_all`.
+    """
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            try:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS listing_fts USING fts5("
+                    "document, tokenize = 'unicode61 remove_diacritics 2')"
+                ))
+            except Exception as e:
+                logger.warning(f"SQLite FTS5 unavailable, text search falls back to LIKE: {e}")
+        elif engine.dialect.name == "postgresql":
+            conn.execute(text(
+                "ALTER TABLE listing_search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                "GENERATED ALWAYS AS (to_tsvector('simple', document)) STORED"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_listing_search_documents_vector "
+                "ON listing_search_documents USING GIN (search_vector)"
+            ))
+
+
+def _has_fts5(db: Session) -> bool:
+    return bool(db.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'listing_fts'"
+    )).first())
+
+
+def index_listing_text(db: Session, listing: Listing) -> None:
+    """
+    Store (or replace) a listing's search document; the caller commits.
+
+    Call after the listing, its images and synthesis have been flushed.
+    """
+    document = listing_document(listing)
+    if listing.search_document is None:
+        listing.search_document = ListingSearchDocument(listing_id=listing.id, document=document)
+    else:
+        listing.search_document.document = document
+
+    sync_fts(db, [(listing.id, document)])
+
+
+def sync_fts(db: Session, documents: List[tuple[int, str]]) -> None:
+    """Write (listing_id, document) pairs to the SQLite FTS5 table, if there is one."""
+    if not documents or db.get_bind().dialect.name != "sqlite" or not _has_fts5(db):
+        return
+    rows = [{"id": listing_id, "document": document} for listing_id, document in documents]
+    db.execute(text("DELETE FROM listing_fts WHERE rowid = :id"), rows)
+    db.execute(text("INSERT INTO listing_fts (rowid, document) VALUES (:id, :document)"), rows)
+
+
+def search_text(db: Session, query: str, limit: int = 20, offset: int = 0) -> tuple[int, List[tuple[int, float]]]:
+    """
+    Ranked full-text search; every query term must match.
+
+    Returns:
+        (total number of matches, [(listing_id, score), ...]) best match first;
+        higher scores are better
+    """
+    terms = list(dict.fromkeys(analyze(query)))
+    if not terms:
+        return 0, []
+
+    dialect = db.get_bind().dialect.name
+    params = {"limit": limit, "offset": offset}
+    if dialect == "sqlite" and _has_fts5(db):
+        params["match"] = " ".join(f'"{term}"' for term in terms)
+        where = "FROM listing_fts JOIN listing_search_documents d ON d.listing_id = listing_fts.rowid " \
+                "WHERE listing_fts MATCH :match"
+        # bm25() is lower for better matches
+        select_page = f"SELECT d.listing_id, -bm25(listing_fts) AS score {where} ORDER BY score DESC, d.listing_id DESC"
+    elif dialect == "postgresql":
+        params["tsquery"] = " & ".join(terms)
+        where = "FROM listing_search_documents d WHERE d.search_vector @@ to_tsquery('simple', :tsquery)"
+        select_page = (
+            "SELECT d.listing_id, ts_rank_cd(d.search_vector, to_tsquery('simple', :tsquery)) AS score "
+            f"{where} ORDER BY score DESC, d.listing_id DESC"
+        )
+    else:
+        # No full-text index: match whole terms in the stored documents
+        conditions = []
+        for i, term in enumerate(terms):
+            params[f"term{i}"] = f"% {term} %"
+            conditions.append(f"(' ' || d.document || ' ') LIKE :term{i}")
+        where = f"FROM listing_search_documents d WHERE {' AND '.join(conditions)}"
+        select_page = f"SELECT d.listing_id, 0.0 AS score {where} ORDER BY d.listing_id DESC"
+
+    total = db.execute(text(f"SELECT COUNT(*) {where}"), params).scalar_one()
+    rows = db.execute(text(f"{select_page} LIMIT :limit OFFSET :offset"), params).all()
+    return total, [(row[0], float(row[1])) for row in rows]
@@ -0,0 +1,242 @@
+"""
+Lightweight per-request tracing for the Mobi backend.
+
+Spans follow the OpenTelemetry data model (128-bit trace id, 64-bit span ids,
+parent links, unix-nanosecond timestamps, attributes) and finished traces are
+exported as OTLP/JSON lines, the format read by the OpenTelemetry collector's
+`otlpjsonfile` receiver. Incoming W3C `traceparent` headers are honoured.
+
+Export is configured with environment variables:
+- `MOBI_TRACE_EXPORT`: `stdout`, `file`, or unset/`none` to disable export
+- `MOBI_TRACE_FILE`: target file for the `file` exporter (default `traces.jsonl`)
+
+Independently of export, every request's spans are summarised in a
+`Server-Timing` response header so slow stages are visible in browser devtools.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "mobi-backend"
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    start_time_unix_nano: int = 0
+    end_time_unix_nano: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status_error: bool = False
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_time_unix_nano - self.start_time_unix_nano) / 1_000_000
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert to the OTLP/JSON span representation."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_time_unix_nano),
+            "endTimeUnixNano": str(self.end_time_unix_nano),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": 2 if self.status_error else 1},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+class Trace:
+    """Collects the spans of a single request."""
+
+    def __init__(self, name: str, traceparent: Optional[str] = None):
+        trace_id, remote_parent = _parse_traceparent(traceparent)
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.root = Span(
+            name=name,
+            trace_id=self.trace_id,
+            span_id=secrets.token_hex(8),
+            parent_span_id=remote_parent,
+            start_time_unix_nano=time.time_ns(),
+        )
+        self.root.attributes["span.kind"] = "server"
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def finish(self) -> None:
+        self.root.end_time_unix_nano = time.time_ns()
+
+    def server_timing(self) -> str:
+        """Render child spans plus the total as a Server-Timing header value."""
+        with self._lock:
+            spans = list(self.spans)
+        entries = [f"{s.name};dur={s.duration_ms:.1f}" for s in spans]
+        entries.append(f"total;dur={self.root.duration_ms:.1f}")
+        return ", ".join(entries)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert to an OTLP/JSON `resourceSpans` export request."""
+        with self._lock:
+            spans = [self.root] + list(self.spans)
+        return {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": "app.tracing"},
+                    "spans": [s.to_otlp() for s in spans],
+                }],
+            }]
+        }
+
+
+class SpanExporter:
+    """Writes finished traces as OTLP/JSON lines to a stream or file."""
+
+    def __init__(self, target: str, path: Optional[str] = None):
+        self.target = target
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps(trace.to_otlp(), separators=(",", ":"))
+        try:
+            with self._lock:
+                if self.target == "stdout":
+                    sys.stdout.write(line + "\n")
+                    sys.stdout.flush()
+                else:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"Trace export failed: {e}")
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("mobi_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("mobi_span", default=None)
+
+_exporter: Optional[SpanExporter] = None
+_exporter_configured = False
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    """Get the exporter configured through the environment (None when disabled)."""
+    global _exporter, _exporter_configured
+    if not _exporter_configured:
+        target = os.getenv("MOBI_TRACE_EXPORT", "none").lower()
+        if target == "stdout":
+            _exporter = SpanExporter("stdout")
+        elif target == "file":
+            _exporter = SpanExporter("file", os.getenv("MOBI_TRACE_FILE", "traces.jsonl"))
+        _exporter_configured = True
+    return _exporter
+
+
+def set_exporter(exporter: Optional[SpanExporter]) -> None:
+    """Override the configured exporter (used by tests and tooling)."""
+    global _exporter, _exporter_configured
+    _exporter = exporter
+    _exporter_configured = True
+
+
+def start_trace(name: str, traceparent: Optional[str] = None) -> tuple[Trace, contextvars.Token]:
+    """Start a trace and make it current for the calling context."""
+    trace = Trace(name, traceparent)
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(trace: Trace, token: contextvars.Token) -> None:
+    """Finish a trace, export it and restore the previous context."""
+    trace.finish()
+    _current_trace.reset(token)
+    exporter = get_exporter()
+    if exporter is not None:
+        exporter.export(trace)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time a block of work as a child span of the current span.
+
+    Outside of a traced request this is a no-op, so library code such as
+    `vision_model` can be instrumented unconditionally.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get() or trace.root
+    current = Span(
+        name=name,
+        trace_id=trace.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_span_id=parent.span_id,
+        start_time_unix_nano=time.time_ns(),
+        attributes=dict(attributes),
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status_error = True
+        current.attributes["exception.type"] = type(e).__name__
+        raise
+    finally:
+        current.end_time_unix_nano = time.time_ns()
+        _current_span.reset(token)
+        trace.add(current)
+
+
+def _parse_traceparent(header: Optional[str]) -> tuple[Optional[str], Optional[str]]:
+    """Extract (trace_id, parent_span_id) from a W3C traceparent header."""
+    if not header:
+        return None, None
+    match = _TRACEPARENT_RE.match(header.strip().lower())
+    if not match or match.group(1) == "0" * 32:
+        return None, None
+    return match.group(1), match.group(2)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
@@ -0,0 +1,270 @@
+"""
+Streaming ingest of uploaded images.
+
+`ingest_multipart` parses a `multipart/form-data` request body from
+`request.stream()` as it arrives, instead of letting FastAPI read the whole
+body (and spool every file) before the endpoint runs. Each file part is
+hashed as its chunks come in; parts up to `UPLOAD_SPOOL_THRESHOLD` bytes are
+kept in memory, larger ones are written to a temporary file and only its path
+is handed to the image preprocessing pool, which reads the full-resolution
+image in a worker process. Preprocessing of a file starts as soon as its part
+ends, so earlier photos are decoded and resized while later ones are still
+being received, and the request process holds at most one network chunk of a
+large photo.
+
+Configured with `UPLOAD_SPOOL_THRESHOLD` (bytes, default 1 MiB) and
+`UPLOAD_MAX_BYTES` (bytes per file, default 25 MiB).
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    from multipart.exceptions import MultipartParseError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from app.image_pool import get_image_pool
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+def spool_threshold() -> int:
+    return int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(1024 * 1024)))
+
+
+def max_upload_bytes() -> int:
+    return int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+
+
+@dataclass
+class IngestedImage:
+    """An uploaded image, read and queued for preprocessing."""
+    filename: str
+    size: int
+    sha256: str
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    preprocessed: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def spooled(self) -> bool:
+        return self.path is not None
+
+    async def processed(self) -> bytes:
+        """Wait for the preprocessed image bytes."""
+        return await self.preprocessed
+
+    def discard(self) -> None:
+        """Stop waiting for preprocessing (e.g. when another upload was rejected)."""
+        if self.preprocessed is not None and not self.preprocessed.done():
+            self.preprocessed.cancel()
+            # A task cancelled before it started never runs _preprocess's cleanup
+            self.preprocessed.add_done_callback(lambda _: self.release())
+
+    def release(self) -> None:
+        """Drop the raw upload and remove its spool file."""
+        self.data = None
+        if self.path is not None:
+            _unlink(self.path)
+            self.path = None
+
+
+async def _preprocess(image: IngestedImage) -> bytes:
+    """Preprocess an ingested upload on the pool, then release the raw data."""
+    try:
+        # The pool call blocks (backpressure, inline fallback), so it runs on a worker thread
+        return await run_in_threadpool(get_image_pool().preprocess, image.path or image.data)
+    finally:
+        image.release()
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class _UploadWriter:
+    """Receives one file part: hashes it and keeps it in memory or spools it to disk."""
+
+    def __init__(self, filename: str, threshold: int, limit: int):
+        self.filename = filename
+        self.threshold = threshold
+        self.limit = limit
+        self.digest = hashlib.sha256()
+        self.buffer = bytearray()
+        self.spool = None
+        self.size = 0
+
+    async def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.limit:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Fișierul {self.filename} depășește dimensiunea maximă de {self.limit // (1024 * 1024)} MB"
+            )
+        self.digest.update(chunk)
+        if self.spool is None and self.size > self.threshold:
+            self.spool = tempfile.NamedTemporaryFile(prefix="mobi-upload-", suffix=".img", delete=False)
+            await run_in_threadpool(self.spool.write, bytes(self.buffer))
+            self.buffer = bytearray()
+        if self.spool is not None:
+            await run_in_threadpool(self.spool.write, chunk)
+        else:
+            self.buffer.extend(chunk)
+
+    def abort(self) -> None:
+        if self.spool is not None:
+            self.spool.close()
+            _unlink(self.spool.name)
+            self.spool = None
+
+    def finish(self) -> IngestedImage:
+        """Close the part and start preprocessing it."""
+        if self.spool is not None:
+            self.spool.close()
+        if self.size == 0:
+            self.abort()
+            raise HTTPException(
+                status_code=400,
+                detail=f"Fișierul {self.filename} este gol"
+            )
+
+        image = IngestedImage(
+            filename=self.filename,
+            size=self.size,
+            sha256=self.digest.hexdigest(),
+            data=None if self.spool is not None else bytes(self.buffer),
+            path=self.spool.name if self.spool is not None else None,
+        )
+        self.spool, self.buffer = None, bytearray()
+        image.preprocessed = asyncio.ensure_future(_preprocess(image))
+        logger.debug(f"Ingested {image.filename}: {image.size} bytes, spooled={image.spooled}")
+        return image
+
+
+async def ingest_multipart(
+    request: Request,
+    field_name: str = "files",
+    max_files: int = 10,
+    threshold: Optional[int] = None,
+) -> List[IngestedImage]:
+    """
+    Parse uploaded images from a multipart request body as it is received.
+
+    Parts of other form fields are ignored.
+
+    Args:
+        request: Request with a `multipart/form-data` body
+        field_name: Form field holding the images
+        max_files: Most images accepted
+        threshold: Size above which an upload is spooled to disk
+            (default: `UPLOAD_SPOOL_THRESHOLD`)
+
+    Returns:
+        IngestedImages in upload order; each one's `processed()` resolves to
+        the preprocessed bytes, and its raw upload (and spool file) is released
+        once preprocessing ends
+
+    Raises:
+        HTTPException: 400 for a malformed body, no images, too many images,
+            a non-image or an empty file; 413 for a file over `UPLOAD_MAX_BYTES`
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Cererea trebuie să fie multipart/form-data")
+
+    threshold = spool_threshold() if threshold is None else threshold
+    limit = max_upload_bytes()
+
+    # The parser's callbacks are synchronous: they record events, which are
+    # handled (with awaits) after each chunk is fed to it
+    events: List[tuple] = []
+    header_field, header_value = bytearray(), bytearray()
+    headers: Dict[bytes, bytes] = {}
+
+    def on_header_end() -> None:
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        events.append(("headers", dict(headers)))
+        headers.clear()
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_header_field": lambda data, start, end: header_field.extend(data[start:end]),
+        "on_header_value": lambda data, start, end: header_value.extend(data[start:end]),
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": lambda data, start, end: events.append(("data", data[start:end])),
+        "on_part_end": lambda: events.append(("end", None)),
+    })
+
+    images: List[IngestedImage] = []
+    writer: Optional[_UploadWriter] = None
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except MultipartParseError:
+                raise HTTPException(status_code=400, detail="Corpul cererii multipart este invalid")
+            for event, value in events:
+                if event == "headers":
+                    writer = _part_writer(value, field_name, len(images), max_files, threshold, limit)
+                elif writer is None:
+                    continue
+                elif event == "data":
+                    await writer.write(value)
+                else:
+                    images.append(writer.finish())
+                    writer = None
+            events.clear()
+        parser.finalize()
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        for image in images:
+            image.discard()
+        raise
+
+    if not images:
+        raise HTTPException(status_code=400, detail="Nu au fost furnizate fișiere")
+    return images
+
+
+def _part_writer(
+    headers: Dict[bytes, bytes],
+    field_name: str,
+    count: int,
+    max_files: int,
+    threshold: int,
+    limit: int,
+) -> Optional[_UploadWriter]:
+    """A writer for a file part of `field_name`; None for other parts."""
+    _, options = parse_options_header(headers.get(b"content-disposition", b""))
+    if options.get(b"name", b"").decode("utf-8", "replace") != field_name or b"filename" not in options:
+        return None
+    filename = options[b"filename"].decode("utf-8", "replace")
+    if not headers.get(b"content-type", b"").decode("latin-1").startswith("image/"):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Fișierul {filename} nu este o imagine"
+        )
+    if count >= max_files:
+        raise HTTPException(status_code=400, detail=f"Maximum {max_files} imagini permise per lot")
+    return _UploadWriter(filename, threshold, limit)
@@ -6,13 +6,33 @@ property images and extracting structured real estate data.
 """
 
 import base64
+import copy
+import hashlib
 import io
 import logging
+import os
+import re
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 import json
 from PIL import Image
 
+from app.image_hash import dhash, group_near_duplicates
+from app.image_pool import get_image_pool
+from app.localization import get_locale, render_description
+from app.metrics import (
+    VISION_ERRORS,
+    VISION_IMAGE_BYTES,
+    VISION_LATENCY,
+    record_cache_lookup,
+    record_parse_path,
+    record_vision_usage,
+    summarize_usage,
+)
+from app.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,6 +41,11 @@ class VisionModelError(Exception):
     pass
 
 
+class VisionModelRateLimitError(VisionModelError):
+    """Raised when the vision provider rejects a call with a rate limit (HTTP 429)."""
+    pass
+
+
 class VisionModelInterface(ABC):
     """Abstract interface for vision models."""
     
@@ -42,6 +67,9 @@ class VisionModelInterface(ABC):
 class MockVisionModel(VisionModelInterface):
     """Mock vision model that returns predefined results for testing."""
     
+    model_type = "mock"
+    model = "mock"
+    
     def __init__(self):
         self.mock_responses = {
             "kitchen": {
@@ -170,24 +198,28 @@ class MockVisionModel(VisionModelInterface):
             default_key = random.choice(["living_room", "bedroom", "kitchen"])
             response = self.mock_responses[default_key].copy()
             response["condition"] = "good"
+            # Not an analysis of this image: keep it out of the analysis store
+            response["parse_path"] = "fallback"
             return response
 
 
 class OpenAIVisionModel(VisionModelInterface):
-    """OpenAI GPT-4.1 vision model implementation."""
+    """OpenAI vision model implementation (`OPENAI_VISION_MODEL`, default gpt-4.1)."""
+    
+    model_type = "openai"
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
         try:
             import openai
             self.client = openai.OpenAI(api_key=api_key)
-            self.model = "gpt-4.1"
+            self.model = model or os.getenv("OPENAI_VISION_MODEL", "gpt-4.1")
         except ImportError:
             raise VisionModelError("openai package not installed. Install with: pip install openai")
         except Exception as e:
             raise VisionModelError(f"Failed to initialize OpenAI client: {e}")
     
     def analyze_image(self, image_data: bytes, prompt: str) -> Dict[str, Any]:
-        """Analyze image using OpenAI GPT-4.1."""
+        """Analyze image using OpenAI."""
         try:
             # Convert image to base64
             image_base64 = base64.b64encode(image_data).decode('utf-8')
@@ -196,6 +228,7 @@ class OpenAIVisionModel(VisionModelInterface):
             image = Image.open(io.BytesIO(image_data))
             image_format = image.format.lower() if image.format else "jpeg"
             
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
@@ -216,36 +249,21 @@ class OpenAIVisionModel(VisionModelInterface):
                 temperature=0.3
             )
             
+            latency = time.perf_counter() - started
+            
             content = response.choices[0].message.content
+            usage = _record_response_usage(
+                self.model_type, self.model, getattr(response, "usage", None),
+                "prompt_tokens", "completion_tokens", latency
+            )
             
             # Try to parse as JSON, fallback to text
-            try:
-                # Look for JSON in the response
-                if content.strip().startswith('{'):
-                    result = json.loads(content)
-                else:
-                    # Try to extract JSON from markdown code blocks
-                    import re
-                    json_match = re.search(r'```json\s*({.*?})\s*```', content, re.DOTALL)
-                    if json_match:
-                        result = json.loads(json_match.group(1))
-                    else:
-                        # Fallback: create structured response from text
-                        result = self._parse_text_response(content)
-                        
-                result["confidence_scores"] = {
-                    "property_type": 0.8,
-                    "style": 0.7,
-                    "amenities": 0.75
-                }
-                
-                return result
-                
-            except json.JSONDecodeError as e:
-                logger.warning(f"Could not parse JSON response, using text fallback: {e}")
-                return self._parse_text_response(content)
+            result = _parse_model_content(content, self._parse_text_response, self.model_type)
+            result["usage"] = usage
+            return result
                 
         except Exception as e:
+            VISION_ERRORS.labels(self.model_type).inc()
             logger.error(f"OpenAI vision model error: {e}")
             raise VisionModelError(f"Failed to analyze image: {e}")
     
@@ -267,13 +285,15 @@ class OpenAIVisionModel(VisionModelInterface):
 
 
 class AnthropicVisionModel(VisionModelInterface):
-    """Anthropic Claude vision model implementation."""
+    """Anthropic Claude vision model implementation (`ANTHROPIC_VISION_MODEL`)."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    model_type = "anthropic"
+    
+    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
         try:
             import anthropic
             self.client = anthropic.Anthropic(api_key=api_key)
-            self.model = "claude-3-sonnet-20240229"
+            self.model = model or os.getenv("ANTHROPIC_VISION_MODEL", "claude-3-sonnet-20240229")
         except ImportError:
             raise VisionModelError("anthropic package not installed. Install with: pip install anthropic")
         except Exception as e:
@@ -289,6 +309,7 @@ class AnthropicVisionModel(VisionModelInterface):
             image = Image.open(io.BytesIO(image_data))
             image_format = image.format.lower() if image.format else "jpeg"
             
+            started = time.perf_counter()
             response = self.client.messages.create(
                 model=self.model,
                 max_tokens=500,
@@ -314,34 +335,21 @@ class AnthropicVisionModel(VisionModelInterface):
                 ]
             )
             
+            latency = time.perf_counter() - started
+            
             content = response.content[0].text
+            usage = _record_response_usage(
+                self.model_type, self.model, getattr(response, "usage", None),
+                "input_tokens", "output_tokens", latency
+            )
             
             # Try to parse as JSON, fallback to text parsing
-            try:
-                if content.strip().startswith('{'):
-                    result = json.loads(content)
-                else:
-                    # Try to extract JSON from markdown code blocks
-                    import re
-                    json_match = re.search(r'```json\s*({.*?})\s*```', content, re.DOTALL)
-                    if json_match:
-                        result = json.loads(json_match.group(1))
-                    else:
-                        result = self._parse_text_response(content)
-                        
-                result["confidence_scores"] = {
-                    "property_type": 0.8,
-                    "style": 0.7,
-                    "amenities": 0.75
-                }
-                
-                return result
-                
-            except json.JSONDecodeError as e:
-                logger.warning(f"Could not parse JSON response, using text fallback: {e}")
-                return self._parse_text_response(content)
+            result = _parse_model_content(content, self._parse_text_response, self.model_type)
+            result["usage"] = usage
+            return result
                 
         except Exception as e:
+            VISION_ERRORS.labels(self.model_type).inc()
             logger.error(f"Anthropic vision model error: {e}")
             raise VisionModelError(f"Failed to analyze image: {e}")
     
@@ -362,12 +370,71 @@ class AnthropicVisionModel(VisionModelInterface):
         }
 
 
+def _parse_model_content(
+    content: str,
+    text_parser: Callable[[str], Dict[str, Any]],
+    model_type: str
+) -> Dict[str, Any]:
+    """
+    Parse a vision model text response into a result dictionary.
+    
+    Tries plain JSON, then a ```json fenced block, then falls back to feature
+    extraction from free text. The path taken is recorded as a metric and in
+    the result's "parse_path".
+    """
+    with span("parse"):
+        try:
+            # Look for JSON in the response
+            if content.strip().startswith('{'):
+                result = json.loads(content)
+                path = "json"
+            else:
+                # Try to extract JSON from markdown code blocks
+                json_match = re.search(r'```json\s*({.*?})\s*```', content, re.DOTALL)
+                if json_match:
+                    result = json.loads(json_match.group(1))
+                    path = "markdown_json"
+                else:
+                    # Fallback: create structured response from text
+                    result = text_parser(content)
+                    path = "text"
+        
+            result["confidence_scores"] = {
+                "property_type": 0.8,
+                "style": 0.7,
+                "amenities": 0.75
+            }
+        
+        except json.JSONDecodeError as e:
+            logger.warning(f"Could not parse JSON response, using text fallback: {e}")
+            result = text_parser(content)
+            path = "decode_error"
+    
+    record_parse_path(model_type, path)
+    result["parse_path"] = path
+    return result
+
+
+def _record_response_usage(
+    model_type: str,
+    model: str,
+    usage: Any,
+    input_attr: str,
+    output_attr: str,
+    latency: float
+) -> Dict[str, Any]:
+    """Read token counts from a provider `usage` object and record them."""
+    input_tokens = getattr(usage, input_attr, 0) or 0
+    output_tokens = getattr(usage, output_attr, 0) or 0
+    return record_vision_usage(model_type, model, input_tokens, output_tokens, latency)
+
+
 def create_vision_model(model_type: str = "mock", **kwargs) -> VisionModelInterface:
     """
     Factory function to create vision model instances.
     
     Args:
-        model_type: Type of model ('mock', 'openai', 'anthropic')
+        model_type: Type of model ('mock', 'simulated', 'openai', 'anthropic')
         **kwargs: Additional arguments passed to model constructor
         
     Returns:
@@ -378,6 +445,9 @@ def create_vision_model(model_type: str = "mock", **kwargs) -> VisionModelInterf
     """
     if model_type == "mock":
         return MockVisionModel()
+    elif model_type == "simulated":
+        from app.simulated_vision import SimulatedVisionModel
+        return SimulatedVisionModel(**kwargs)
     elif model_type == "openai":
         return OpenAIVisionModel(**kwargs)
     elif model_type == "anthropic":
@@ -454,6 +524,14 @@ Be specific and accurate based only on what you can see in the image. Focus on d
 """
 
 
+def prompt_version(prompt: str) -> str:
+    """Short content hash identifying a prompt text, for tagging stored analyses."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+DEFAULT_PROMPT_VERSION = prompt_version(DEFAULT_PROPERTY_PROMPT)
+
+
 # Global instance for convenience
 _vision_model = None
 
@@ -465,27 +543,65 @@ def get_vision_model(model_type: str = "mock", **kwargs) -> VisionModelInterface
     return _vision_model
 
 
+# Models by (model_type, kwargs), so concurrent callers share one client pool
+_shared_models: Dict[tuple, VisionModelInterface] = {}
+_shared_models_lock = threading.Lock()
+
+def shared_vision_model(model_type: str = "mock", **kwargs) -> VisionModelInterface:
+    """
+    Get or create a vision model shared by all callers with the same settings.
+    
+    Provider clients keep HTTP connection pools and are thread-safe, so batch
+    work reuses one instance instead of opening a client per image.
+    """
+    key = (model_type, tuple(sorted(kwargs.items())))
+    with _shared_models_lock:
+        model = _shared_models.get(key)
+        if model is None:
+            model = _shared_models[key] = create_vision_model(model_type, **kwargs)
+        return model
+
+
+def reset_vision_model_cache() -> None:
+    """Forget the global and shared vision models (e.g. after fork, so clients aren't shared)."""
+    global _vision_model
+    _vision_model = None
+    with _shared_models_lock:
+        _shared_models.clear()
+
+
 def analyze_multiple_images(
     images: list[bytes],
     model_type: str = "mock",
     prompt: str = DEFAULT_PROPERTY_PROMPT,
     preprocess: bool = True,
+    analyze_image: Optional[Callable[[int, bytes], Dict[str, Any]]] = None,
     **model_kwargs
 ) -> dict[str, Any]:
     """
     Analyze multiple property images and synthesize unified results.
     
+    Near-duplicate photos (see `app.image_hash`) are analyzed once: the other
+    images of a group get a copy of the first image's analysis, marked with
+    "duplicate_of", and are left out of the synthesis room counts.
+    
     Args:
         images: List of image data (bytes)
         model_type: Vision model to use ('mock', 'openai', 'anthropic')
         prompt: Custom prompt for the vision model
         preprocess: Whether to preprocess images
-        **model_kwargs: Additional arguments passed to model constructor
+        analyze_image: Analyzes image i from its (preprocessed) bytes, e.g.
+            through `app.analysis_store`; by default `analyze_property_image`
+            with `prompt` and the model below
+        **model_kwargs: Additional arguments passed to model constructor; the
+            model is shared (`shared_vision_model`) by all images and calls
+            with the same settings
         
     Returns:
-        Dictionary containing individual analyses and synthesized overview
+        Dictionary containing individual analyses, synthesized overview and
+        summed token/cost usage
         {
-            "individual_analyses": [...],  # Each image's analysis
+            "individual_analyses": [...],  # Each image's analysis, with "perceptual_hash"
             "synthesis": {
                 "total_rooms": 6,
                 "room_breakdown": {...},
@@ -494,30 +610,54 @@ def analyze_multiple_images(
                 "property_overview": {...},
                 "layout_type": "open_concept",
                 "exterior_features": [...]
-            }
+            },
+            "usage": {"input_tokens": ..., "output_tokens": ..., "cost_usd": ...}
         }
         
     Raises:
         VisionModelError: If analysis fails
     """
+    # Preprocess all images up front so the process pool works on them in parallel
+    if preprocess:
+        with span("preprocess", images=len(images)):
+            images = get_image_pool().preprocess_many(images)
+
+    # Group near-identical photos so each group is analyzed and counted once
+    with span("dedupe", images=len(images)):
+        hashes = [dhash(image_data) for image_data in images]
+        groups = group_near_duplicates(hashes)
+
     # Analyze each image individually
     individual_analyses = []
     
     for i, image_data in enumerate(images):
-        try:
-            analysis = analyze_property_image(
-                image_data=image_data,
-                model_type=model_type,
-                prompt=prompt,
-                preprocess=preprocess,
-                **model_kwargs
-            )
+        representative = groups[i]
+        record_cache_lookup("perceptual_hash", representative != i)
+        if representative != i:
+            # Reuse the representative's analysis; usage stays with the original call
+            analysis = copy.deepcopy(individual_analyses[representative])
+            analysis.pop("usage", None)
             analysis["image_index"] = i
+            analysis["duplicate_of"] = representative
+            analysis["perceptual_hash"] = f"{hashes[i]:016x}"
             individual_analyses.append(analysis)
+            continue
+        try:
+            if analyze_image is not None:
+                analysis = analyze_image(i, image_data)
+            else:
+                analysis = analyze_property_image(
+                    image_data=image_data,
+                    model_type=model_type,
+                    prompt=prompt,
+                    preprocess=False,
+                    vision_model=shared_vision_model(model_type, **model_kwargs),
+                )
+            analysis["image_index"] = i
         except Exception as e:
             logger.error(f"Failed to analyze image {i}: {e}")
             # Add a minimal analysis for failed images
-            individual_analyses.append({
+            analysis = {
                 "image_index": i,
                 "description": f"Analysis failed for image {i}",
                 "property_type": "unknown",
@@ -527,185 +667,145 @@ def analyze_multiple_images(
                 "materials": [],
                 "condition": "unknown",
                 "error": str(e)
-            })
+            }
+        if hashes[i] is not None:
+            analysis["perceptual_hash"] = f"{hashes[i]:016x}"
+        individual_analyses.append(analysis)
     
     # Synthesize the results
     synthesis = synthesize_property_overview(individual_analyses)
     
     return {
         "individual_analyses": individual_analyses,
-        "synthesis": synthesis
+        "synthesis": synthesis,
+        "usage": summarize_usage(individual_analyses)
     }
 
 
+# Exterior features inferred from lowercased image descriptions (substring matches)
+_EXTERIOR_KEYWORDS = (
+    ('outdoor living space', re.compile('porch|patio|deck|balcony')),
+    ('landscaping', re.compile('garden|landscaped|yard')),
+    ('parking', re.compile('garage|driveway')),
+)
+# Broader matches, tried on every exterior image when nothing else was found
+_EXTERIOR_FALLBACK_KEYWORDS = (
+    ('outdoor living space', re.compile('porch|patio|deck|balcony')),
+    ('landscaping', re.compile('garden|landscaped|yard|landscaping')),
+    ('parking', re.compile('garage|driveway|parking')),
+)
+_EXTERIOR_AMENITIES = frozenset([
+    'garage', 'garden', 'pool', 'balcony', 'patio', 'deck', 'front_porch', 'landscaping', 'landscape',
+])
+
+
 def synthesize_property_overview(analyses: list[dict]) -> dict:
     """
     Correlate multiple image analyses into unified property description.
     
+    Aggregates in a single pass over the analyses: interior/exterior split,
+    room counts, amenities, the first property type and style, conditions
+    and description keywords (precompiled matchers).
+    
     Args:
         analyses: List of individual image analyses
         
     Returns:
         Dictionary containing synthesized property overview
     """
-    if not analyses:
-        return {
-            "total_rooms": 0,
-            "room_breakdown": {},
-            "amenities_by_room": {},
-            "unified_description": "No images analyzed.",
-            "property_overview": {},
-            "layout_type": "unknown",
-            "exterior_features": []
-        }
-    
-    # Separate interior and exterior analyses
     interior_analyses = []
     exterior_analyses = []
+    # Dicts as ordered sets: first-seen order keeps the output independent of hash seeds
+    interior_amenities = {}
+    interior_materials = {}
+    exterior_amenities = {}
+    exterior_features = []
+    conditions = set()
+    room_breakdown = {}
+    total_rooms = 0
+    open_concept_detected = False
+    # First non-empty property type and style, preferring interior images
+    interior_property_type = exterior_property_type = None
+    interior_style = exterior_style = None
     
     for analysis in analyses:
+        # Near-duplicate photos (see analyze_multiple_images) count once, via their group's first image
+        if analysis.get("duplicate_of") is not None:
+            continue
+        
+        conditions.add(analysis.get("condition", "unknown"))
         rooms = analysis.get("rooms", {})
+        room_count = sum(rooms.values()) if rooms else 0
+        
         # If no rooms detected, treat as exterior image
-        if not rooms or sum(rooms.values()) == 0:
+        if room_count == 0:
             exterior_analyses.append(analysis)
-        else:
-            interior_analyses.append(analysis)
-    
-    # Detect open-concept spaces in interior images
-    open_concept_detected = False
-    interior_amenities = set()
-    interior_materials = set()
-    
-    # Check each interior image for open-concept layout
-    for analysis in interior_analyses:
-        rooms = analysis.get("rooms", {})
-        room_types = list(rooms.keys())
-        room_count = sum(rooms.values())
+            amenities = analysis.get("amenities", [])
+            description = analysis.get("description", "")
+            exterior_amenities.update(dict.fromkeys(amenities))
+            
+            # Extract exterior features from description if no specific amenities
+            if not amenities and description:
+                text = description.lower()
+                exterior_features.extend(feature for feature, pattern in _EXTERIOR_KEYWORDS if pattern.search(text))
+            
+            if not exterior_property_type:
+                exterior_property_type = analysis.get("property_type")
+            if not exterior_style:
+                exterior_style = analysis.get("style")
+            continue
+        
+        interior_analyses.append(analysis)
         
         # If single image has multiple room types, it's likely open-concept
-        if len(room_types) >= 3 and room_count >= 3:
+        if len(rooms) >= 3 and room_count >= 3:
             open_concept_detected = True
         
-        # Collect interior amenities and materials
-        amenities = analysis.get("amenities", [])
-        materials = analysis.get("materials", [])
-        interior_amenities.update(amenities)
-        interior_materials.update(materials)
+        interior_amenities.update(dict.fromkeys(analysis.get("amenities", [])))
+        interior_materials.update(dict.fromkeys(analysis.get("materials", [])))
+        
+        for room_type, count in rooms.items():
+            room_breakdown[room_type] = room_breakdown.get(room_type, 0) + count
+        total_rooms += room_count
+        
+        if not interior_property_type:
+            interior_property_type = analysis.get("property_type")
+        if not interior_style:
+            interior_style = analysis.get("style")
     
-    # Fix for open-concept counting: if detected and only 1 interior image, treat as 1 room
-    property_types = []
-    styles = []
+    if not interior_analyses and not exterior_analyses:
+        return {
+            "total_rooms": 0,
+            "room_breakdown": {},
+            "amenities_by_room": {},
+            "unified_description": "No images analyzed.",
+            "property_overview": {},
+            "layout_type": "unknown",
+            "exterior_features": []
+        }
     
+    # Single image with multiple functional areas = open concept studio, counted as 1 room
     if open_concept_detected and len(interior_analyses) == 1:
-        # Single image with multiple functional areas = open concept studio
         total_rooms = 1
         room_breakdown = {"open_concept_space": 1}
-        
-        # Still track what functional areas it has for description
-        original_rooms = interior_analyses[0].get("rooms", {})
-        functional_areas = list(original_rooms.keys())
-        
-        # Collect property types and styles from the single interior analysis
-        if interior_analyses[0].get("property_type"):
-            property_types.append(interior_analyses[0]["property_type"])
-        if interior_analyses[0].get("style"):
-            styles.append(interior_analyses[0]["style"])
-    else:
-        # Normal room counting for traditional layout or multiple images
-        total_rooms = 0
-        room_breakdown = {}
-        
-        # Aggregate room counts across interior images only
-        for i, analysis in enumerate(interior_analyses):
-            room_key = f"room_{i+1}"
-            
-            # Count rooms from this analysis
-            if analysis.get("rooms"):
-                for room_type, count in analysis["rooms"].items():
-                    room_breakdown[room_type] = room_breakdown.get(room_type, 0) + count
-                    total_rooms += count
-            
-            # Collect property types and styles
-            if analysis.get("property_type"):
-                property_types.append(analysis["property_type"])
-            if analysis.get("style"):
-                styles.append(analysis["style"])
-    
-    amenities_by_room = {}
-    property_types = []
-    styles = []
-    
-    # Handle exterior features separately
-    exterior_features = []
-    exterior_amenities = set()
-    
-    for analysis in exterior_analyses:
-        amenities = analysis.get("amenities", [])
-        description = analysis.get("description", "")
-        
-        # Add exterior-specific amenities
-        exterior_amenities.update(amenities)
-        
-        # Extract exterior features from description if no specific amenities
-        if not amenities and description:
-            if any(word in description.lower() for word in ['porch', 'patio', 'deck', 'balcony']):
-                exterior_features.append('outdoor living space')
-            if any(word in description.lower() for word in ['garden', 'landscaped', 'yard']):
-                exterior_features.append('landscaping')
-            if any(word in description.lower() for word in ['garage', 'driveway']):
-                exterior_features.append('parking')
     
     # Add specific exterior amenities as features
     for amenity in exterior_amenities:
-        if amenity in ['garage', 'garden', 'pool', 'balcony', 'patio', 'deck', 'front_porch', 'landscaping', 'landscape']:
+        if amenity in _EXTERIOR_AMENITIES:
             exterior_features.append(amenity.replace('_', ' '))
     
-    # Also add generic features if specific ones aren't found but description suggests them
+    # Also add generic features if specific ones aren't found but descriptions suggest them
     if not exterior_features and exterior_analyses:
         for analysis in exterior_analyses:
-            description = analysis.get("description", "").lower()
-            if any(word in description for word in ['porch', 'patio', 'deck', 'balcony']):
-                if 'outdoor living space' not in exterior_features:
-                    exterior_features.append('outdoor living space')
-            if any(word in description for word in ['garden', 'landscaped', 'yard', 'landscaping']):
-                if 'landscaping' not in exterior_features:
-                    exterior_features.append('landscaping')
-            if any(word in description for word in ['garage', 'driveway', 'parking']):
-                if 'parking' not in exterior_features:
-                    exterior_features.append('parking')
-    
-    # Determine layout type
-    layout_type = "open_concept" if open_concept_detected else "traditional"
+            text = analysis.get("description", "").lower()
+            for feature, pattern in _EXTERIOR_FALLBACK_KEYWORDS:
+                if feature not in exterior_features and pattern.search(text):
+                    exterior_features.append(feature)
     
-    # Determine dominant property type and style from all analyses
+    layout_type = "open_concept" if open_concept_detected else "traditional"
     all_analyses = interior_analyses + exterior_analyses
-    
-    # Better property type detection - prioritize from interior if available
-    if property_types:
-        dominant_property_type = max(set(property_types), key=property_types.count)
-    elif all_analyses:
-        # Fallback to any available property type
-        for analysis in all_analyses:
-            if analysis.get("property_type"):
-                dominant_property_type = analysis["property_type"]
-                break
-        else:
-            dominant_property_type = "unknown"
-    else:
-        dominant_property_type = "unknown"
-    
-    if styles:
-        dominant_style = max(set(styles), key=styles.count)
-    elif all_analyses:
-        # Fallback to any available style
-        for analysis in all_analyses:
-            if analysis.get("style"):
-                dominant_style = analysis["style"]
-                break
-        else:
-            dominant_style = "unknown"
-    else:
-        dominant_style = "unknown"
+    dominant_property_type = interior_property_type or exterior_property_type or "unknown"
+    dominant_style = interior_style or exterior_style or "unknown"
     
     # Generate unified description
     unified_description = generate_unified_description(
@@ -730,18 +830,19 @@ def synthesize_property_overview(analyses: list[dict]) -> dict:
         "room_breakdown": room_breakdown,
         "common_amenities": list(interior_amenities),
         "common_materials": list(interior_materials),
-        "condition": determine_overall_condition(all_analyses)
+        # One condition across all images, else "mixed" (as determine_overall_condition)
+        "condition": next(iter(conditions)) if len(conditions) == 1 else "mixed"
     }
     
     return {
         "total_rooms": total_rooms,
         "room_breakdown": room_breakdown,
-        "amenities_by_room": amenities_by_room,
+        "amenities_by_room": {},
         "unified_description": unified_description,
         "property_overview": property_overview,
         "layout_type": layout_type,
         "interior_features": list(interior_amenities),
-        "exterior_features": list(set(exterior_features))
+        "exterior_features": list(dict.fromkeys(exterior_features))
     }
 
 
@@ -756,89 +857,18 @@ def generate_unified_description(
     layout_type: str = "traditional",
     exterior_features: list = None,
     open_concept_detected: bool = False,
-    interior_analyses: list = None
+    interior_analyses: list = None,
+    locale: Optional[str] = None
 ) -> str:
     """
-    Generate Romanian property description.
-    """
-    if total_rooms == 0 and not exterior_features:
-        return "Nu au fost detectate camere în imaginile furnizate."
-    
-    # Translate property type
-    property_type_ro = _translate_property_type(property_type)
-    
-    # Build room description (types only, no counts)
-    room_types = []
-    for room_type in sorted(room_breakdown.keys()):
-        room_name_ro = _translate_room_type(room_type)
-        room_types.append(room_name_ro)
-    
-    room_description = ", ".join(room_types)
-    
-    # Special handling for open-concept to show functional areas
-    if layout_type == "open_concept" and open_concept_detected and len(interior_analyses) == 1:
-        # Show the functional areas instead of just "Open Concept Space"
-        original_rooms = interior_analyses[0].get("rooms", {})
-        functional_areas = []
-        for room_type, count in original_rooms.items():
-            room_name_ro = _translate_room_type(room_type)
-            functional_areas.append(room_name_ro)
-        if functional_areas:
-            room_description = ", ".join(functional_areas)
-    
-    # Build amenities description
-    amenity_descriptions_ro = []
-    
-    # Check for common patterns
-    if "hardwood_floors" in materials and sum(1 for a in analyses if "hardwood_floors" in a.get("amenities", [])) > len(analyses) / 2:
-        amenity_descriptions_ro.append("parchet în toate camerele")
-    
-    if "granite_counters" in amenities:
-        amenity_descriptions_ro.append("blat de granit")
-    
-    if "stainless_steel" in amenities:
-        amenity_descriptions_ro.append("aparate din oțel inoxidabil")
-    
-    if "fireplace" in amenities:
-        amenity_descriptions_ro.append("șemineu")
-    
-    if "dishwasher" in amenities:
-        amenity_descriptions_ro.append("mașină de spălat vase")
-    
-    # Add other notable amenities
-    other_amenities = [a for a in amenities if a not in ["hardwood_floors", "granite_counters", "stainless_steel", "fireplace", "dishwasher"]]
-    if other_amenities:
-        # Pick a few more to mention
-        for amenity in other_amenities[:2]:
-            translated = _translate_amenity(amenity)
-            amenity_descriptions_ro.append(translated)
-    
-    # Build final description based on layout type
-    if layout_type == "open_concept":
-        description = f"Acest {property_type_ro} prezintă un design open-concept"
-        if room_description:
-            description += f" cu zone de {room_description}"
-    else:
-        if room_description:
-            description = f"Acest {property_type_ro} include {room_description}"
-        else:
-            description = f"Acest {property_type_ro}"
-    
-    if amenity_descriptions_ro:
-        description += f". Caracteristici includ {', '.join(amenity_descriptions_ro)}"
-    
-    # Add exterior features if present
-    if exterior_features:
-        exterior_ro = [_translate_feature(f) for f in exterior_features]
-        description += f". Caracteristici exterioare includ {', '.join(exterior_ro)}"
+    Generate the property description (Romanian unless `locale` says otherwise).
     
-    if style and style != "unknown":
-        style_ro = _translate_style(style)
-        description += f". Stil general: {style_ro}"
-    
-    description += "."
-    
-    return description
+    Rendered from the precompiled catalogs in `app.localization`.
+    """
+    return render_description(
+        total_rooms, room_breakdown, amenities, materials, property_type, style, analyses,
+        layout_type, exterior_features, open_concept_detected, interior_analyses, locale
+    )
 
 
 def determine_overall_condition(analyses: list[dict]) -> str:
@@ -870,6 +900,7 @@ def determine_overall_condition(analyses: list[dict]) -> str:
 def analyze_property_image(image_data: bytes, model_type: str = "mock", 
                           prompt: str = DEFAULT_PROPERTY_PROMPT, 
                           preprocess: bool = True,
+                          vision_model: Optional[VisionModelInterface] = None,
                           **model_kwargs) -> Dict[str, Any]:
     """
     Convenience function to analyze a property image.
@@ -879,6 +910,8 @@ def analyze_property_image(image_data: bytes, model_type: str = "mock",
         model_type: Type of model to use ('mock', 'openai', 'anthropic')
         prompt: Custom prompt for the vision model
         preprocess: Whether to preprocess the image
+        vision_model: Model instance to use (e.g. from `shared_vision_model`);
+            by default a new one is created from `model_type`/`model_kwargs`
         **model_kwargs: Additional arguments passed to model constructor (e.g., api_key)
         
     Returns:
@@ -889,79 +922,41 @@ def analyze_property_image(image_data: bytes, model_type: str = "mock",
     """
     # Preprocess image if requested
     if preprocess:
-        image_data = preprocess_image(image_data)
+        with span("preprocess"):
+            image_data = get_image_pool().preprocess(image_data)
+    VISION_IMAGE_BYTES.labels(model_type).observe(len(image_data))
     
     # Create vision model directly with kwargs instead of using global instance
-    vision_model = create_vision_model(model_type, **model_kwargs)
-    return vision_model.analyze_image(image_data, prompt)
+    if vision_model is None:
+        vision_model = create_vision_model(model_type, **model_kwargs)
+    started = time.perf_counter()
+    try:
+        with span("model", model_type=model_type, image_bytes=len(image_data)):
+            return vision_model.analyze_image(image_data, prompt)
+    finally:
+        VISION_LATENCY.labels(model_type, getattr(vision_model, "model", model_type)).observe(
+            time.perf_counter() - started
+        )
+
 
+# Lookups into the default locale's catalog (see app.localization)
 
 def _translate_property_type(property_type: str) -> str:
     """Translate property type to Romanian."""
-    translations = {
-        'apartment': 'apartament',
-        'house': 'casă',
-        'condo': 'condominium',
-        'townhouse': 'casă în șir',
-        'land': 'teren',
-        'commercial': 'proprietate comercială'
-    }
-    return translations.get(property_type, property_type)
+    return get_locale().property_type(property_type)
 
 def _translate_room_type(room_type: str) -> str:
     """Translate room type to Romanian."""
-    translations = {
-        'bedroom': 'Dormitor',
-        'kitchen': 'Bucătărie',
-        'living_room': 'Sufragerie',
-        'bathroom': 'Baie',
-        'hallway': 'Hol',
-        'dining_room': 'Cameră de Mâncare',
-        'office': 'Birou',
-        'balcony': 'Balcon',
-        'open_concept_space': 'Spațiu Open-Concept'
-    }
-    return translations.get(room_type, room_type.replace('_', ' ').title())
+    return get_locale().room_type(room_type)
 
 def _translate_feature(feature: str) -> str:
     """Translate exterior feature to Romanian."""
-    translations = {
-        'balcony': 'balcon',
-        'garage': 'garaj',
-        'garden': 'grădină',
-        'pool': 'piscină',
-        'patio': 'patio',
-        'deck': 'terasă',
-        'outdoor living space': 'spațiu de locuit în aer liber',
-        'landscaping': 'peisagistică',
-        'parking': 'parcare'
-    }
-    return translations.get(feature.lower(), feature)
+    return get_locale().feature(feature)
 
 def _translate_style(style: str) -> str:
     """Translate style to Romanian."""
-    translations = {
-        'modern': 'modern',
-        'traditional': 'tradițional',
-        'contemporary': 'contemporan',
-        'rustic': 'rustic',
-        'industrial': 'industrial',
-        'minimalist': 'minimalist'
-    }
-    return translations.get(style.lower(), style)
+    return get_locale().style(style)
 
 def _translate_amenity(amenity: str) -> str:
     """Translate amenity to Romanian."""
-    translations = {
-        'hardwood_floors': 'parchet',
-        'granite_counters': 'blat de granit',
-        'stainless_steel': 'oțel inoxidabil',
-        'fireplace': 'șemineu',
-        'dishwasher': 'mașină de spălat vase',
-        'large_window': 'fereastră mare',
-        'tile_floors': 'gresie',
-        'bathtub': 'cadă',
-        'updated_fixtures': 'obiecte sanitare actualizate',
-        'chandelier': 'candelabru'
-    }
-    return translations.get(amenity, amenity.replace('_', ' '))
\ No newline at end of file
+    return get_locale().amenity(amenity)
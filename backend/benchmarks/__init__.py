@@ -0,0 +1 @@
+"""Performance benchmarks for the Mobi backend hot paths."""
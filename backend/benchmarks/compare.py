@@ -0,0 +1,62 @@
+"""
+Compare two benchmark result files.
+
+Usage (from backend/):
+    python -m benchmarks.compare benchmarks/results/<base>.json benchmarks/results/<head>.json
+
+Prints the median time change per benchmark and exits with status 1 when any
+benchmark is slower than `--threshold` (default 10%).
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base: dict, head: dict, threshold: float) -> tuple[list[tuple], list[str]]:
+    """Return (rows, regressions) for benchmarks present in both runs."""
+    rows = []
+    regressions = []
+    for name, head_stats in sorted(head["results"].items()):
+        base_stats = base["results"].get(name)
+        if not base_stats:
+            rows.append((name, None, head_stats["median_s"], None))
+            continue
+        change = head_stats["median_s"] / base_stats["median_s"] - 1
+        rows.append((name, base_stats["median_s"], head_stats["median_s"], change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown ratio (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    base, head = load(args.base), load(args.head)
+    rows, regressions = compare(base, head, args.threshold)
+
+    print(f"base: {base['metadata'].get('commit')}  head: {head['metadata'].get('commit')}\n")
+    print(f"{'benchmark':<60} {'base ms':>10} {'head ms':>10} {'change':>8}")
+    for name, base_s, head_s, change in rows:
+        base_col = f"{base_s * 1000:10.3f}" if base_s is not None else f"{'-':>10}"
+        change_col = f"{change * 100:+7.1f}%" if change is not None else f"{'new':>8}"
+        marker = "  <-- regression" if name in regressions else ""
+        print(f"{name:<60} {base_col} {head_s * 1000:10.3f} {change_col}{marker}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Minimal benchmark harness.
+
+Benchmarks are registered with the `@benchmark` decorator. A benchmark function
+receives its parameters, performs any setup, and returns a zero-argument
+callable; only that callable is timed. Each benchmark is auto-calibrated so a
+sample takes at least `min_time` seconds, then sampled `repeat` times.
+"""
+
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark case."""
+    name: str
+    factory: Callable[..., Callable[[], Any]]
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def full_name(self) -> str:
+        if not self.params:
+            return self.name
+        suffix = ",".join(f"{key}={value}" for key, value in self.params.items())
+        return f"{self.name}[{suffix}]"
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, params: Optional[List[Dict[str, Any]]] = None):
+    """Register a benchmark factory, once per parameter set."""
+    def decorator(factory):
+        for case in params or [{}]:
+            BENCHMARKS.append(Benchmark(name=name, factory=factory, params=case))
+        return factory
+    return decorator
+
+
+def time_callable(func: Callable[[], Any], repeat: int = 5, min_time: float = 0.05) -> Dict[str, Any]:
+    """Time `func`, returning per-call statistics in seconds."""
+    # Warm up and calibrate the number of calls per sample
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+
+    mean = statistics.fmean(samples)
+    return {
+        "calls_per_sample": number,
+        "samples": len(samples),
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": mean,
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_s": 1 / mean if mean > 0 else None,
+    }
+
+
+def run_benchmarks(
+    benchmarks: List[Benchmark],
+    repeat: int = 5,
+    min_time: float = 0.05,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """Run benchmarks and return a JSON-serialisable results document."""
+    results = {}
+    for bench in benchmarks:
+        func = bench.factory(**bench.params)
+        stats = time_callable(func, repeat=repeat, min_time=min_time)
+        stats["params"] = bench.params
+        results[bench.full_name] = stats
+        log(f"{bench.full_name:<60} median {stats['median_s'] * 1000:10.3f} ms")
+    return {
+        "metadata": environment_metadata(),
+        "config": {"repeat": repeat, "min_time": min_time},
+        "results": results,
+    }
+
+
+def environment_metadata() -> Dict[str, Any]:
+    """Describe the commit and machine the results were produced on."""
+    return {
+        "commit": _git(["rev-parse", "HEAD"]),
+        "branch": _git(["rev-parse", "--abbrev-ref", "HEAD"]),
+        "dirty": bool(_git(["status", "--porcelain", "--untracked-files=no"])),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def _git(args: List[str]) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
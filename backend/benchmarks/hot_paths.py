@@ -0,0 +1,267 @@
+"""
+Benchmarks for the backend hot paths.
+
+Covers image preprocessing, feature extraction, multi-image synthesis, field
+orchestration and suggestion, listing response serialization, and end-to-end
+API throughput with the mock vision model.
+"""
+
+import base64
+import io
+import itertools
+import os
+import tempfile
+from functools import lru_cache
+
+from PIL import Image
+
+from benchmarks.harness import benchmark
+
+
+def make_photo(width: int, height: int) -> bytes:
+    """Create a noisy JPEG that compresses like a real photo."""
+    image = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+SAMPLE_DESCRIPTION = (
+    "Beautiful modern 3 bedroom, 2 bathroom house with hardwood floors, granite countertops "
+    "and stainless steel appliances. The open living room has a gas fireplace and large windows. "
+    "The backyard includes a swimming pool, wood deck and landscaped garden. Attached garage, "
+    "central air, walk-in closet in the master bedroom and a finished basement. "
+)
+
+
+def sample_analyses(count: int) -> list[dict]:
+    """Build `count` per-image analyses cycling through the mock responses."""
+    from app.vision_model import MockVisionModel
+
+    responses = list(MockVisionModel().mock_responses.values())
+    analyses = []
+    for i, response in zip(range(count), itertools.cycle(responses)):
+        analysis = dict(response)
+        analysis["condition"] = "good"
+        analysis["image_index"] = i
+        analyses.append(analysis)
+    return analyses
+
+
+@benchmark("preprocess_image", params=[
+    {"size": "640x480"},
+    {"size": "1920x1080"},
+    {"size": "4032x3024"},
+])
+def bench_preprocess_image(size: str):
+    from app.vision_model import preprocess_image
+
+    width, height = (int(dim) for dim in size.split("x"))
+    image_data = make_photo(width, height)
+    return lambda: preprocess_image(image_data)
+
+
+@benchmark("extract_features", params=[{"chars": 1_000}, {"chars": 10_000}, {"chars": 50_000}])
+def bench_extract_features(chars: int):
+    from app.feature_extractor import PropertyFeatureExtractor
+
+    extractor = PropertyFeatureExtractor()
+    repeats = chars // len(SAMPLE_DESCRIPTION) + 1
+    description = (SAMPLE_DESCRIPTION * repeats)[:chars]
+    return lambda: extractor.extract_features(description)
+
+
+@benchmark("synthesize_property_overview", params=[{"analyses": 1}, {"analyses": 10}, {"analyses": 50}, {"analyses": 500}])
+def bench_synthesize(analyses: int):
+    from app.vision_model import synthesize_property_overview
+
+    data = sample_analyses(analyses)
+    return lambda: synthesize_property_overview(data)
+
+
+@benchmark("generate_unified_description", params=[{"locale": "ro"}, {"locale": "en"}])
+def bench_generate_unified_description(locale: str):
+    from app.vision_model import generate_unified_description
+
+    kwargs = dict(
+        total_rooms=5,
+        room_breakdown={"living_room": 1, "bedroom": 2, "kitchen": 1, "bathroom": 1},
+        amenities=["fireplace", "smart_home", "granite_counters", "tile_floors", "bathtub", "dishwasher"],
+        materials=["hardwood_floors"],
+        property_type="apartment",
+        style="modern",
+        analyses=[{"amenities": ["hardwood_floors"]}] * 8,
+        exterior_features=["balcony", "parking"],
+        locale=locale,
+    )
+    return lambda: generate_unified_description(**kwargs)
+
+
+@benchmark("orchestrator.get_next_fields", params=[
+    {"state": "empty"},
+    {"state": "house"},
+    {"state": "apartment_partial"},
+])
+def bench_get_next_fields(state: str):
+    from app.orchestrator import orchestrator
+
+    current_data = {
+        "empty": {},
+        "house": {"property_type": "house"},
+        "apartment_partial": {"property_type": "apartment", "bedrooms": 2, "bathrooms": 1, "price": 250000},
+    }[state]
+    return lambda: orchestrator.get_next_fields(current_data)
+
+
+@benchmark("suggest_fields", params=[{"detected": False}, {"detected": True}])
+def bench_suggest_fields(detected: bool):
+    from app.field_suggestions import FieldSuggestionAlgorithm
+
+    suggester = FieldSuggestionAlgorithm()
+    current_data = {"property_type": "house", "bedrooms": 3}
+    detected_features = {
+        "amenities": ["pool", "garage", "fireplace", "hardwood_floors"],
+        "amenities_confidence": {"pool": 0.9, "garage": 0.6, "fireplace": 0.8, "hardwood_floors": 0.5},
+    } if detected else None
+    return lambda: suggester.suggest_fields(current_data, detected_features)
+
+
+@benchmark("suggestion_engine", params=[{"detected": False}, {"detected": True}, {"batch": 1_000}])
+def bench_suggestion_engine(detected: bool = True, batch: int = 0):
+    from app.suggestion_engine import SuggestionEngine
+
+    engine = SuggestionEngine()
+    current_data = {"property_type": "house", "bedrooms": 3}
+    detected_features = {
+        "amenities": ["pool", "garage", "fireplace", "hardwood_floors"],
+        "amenities_confidence": {"pool": 0.9, "garage": 0.6, "fireplace": 0.8, "hardwood_floors": 0.5},
+    } if detected else None
+    if batch:
+        states = [(current_data, detected_features)] * batch
+        return lambda: engine.suggest_many(states)
+    return lambda: engine.suggest(current_data, detected_features)
+
+
+def listing_page(count: int) -> list:
+    """`count` transient listings shaped like `listing_payload()` (3 images each)."""
+    from datetime import datetime
+
+    from app.models import Listing, ListingImage, ListingSynthesis
+
+    payload = listing_payload()
+    now = datetime.utcnow()
+    listings = []
+    for i in range(count):
+        listing = Listing(id=i + 1, property_type=payload["property_type"], price=payload["price"],
+                          city=payload["city"], status="draft", created_at=now, updated_at=now)
+        listing.images = [
+            ListingImage(id=i * 10 + j, image_data=image["image_data"], order_index=image["order_index"],
+                         ai_description=image["ai_analysis"].get("description"),
+                         detected_rooms=image["ai_analysis"].get("rooms"),
+                         detected_amenities=image["ai_analysis"].get("amenities"), created_at=now)
+            for j, image in enumerate(payload["images"])
+        ]
+        listing.synthesis = ListingSynthesis(id=i + 1, created_at=now, **payload["synthesis"])
+        listings.append(listing)
+    return listings
+
+
+@benchmark("serialize_listings", params=[
+    {"page": 100, "encoder": "jsonable_encoder"},
+    {"page": 100, "encoder": "orjson"},
+])
+def bench_serialize_listings(page: int, encoder: str):
+    """Response rendering for one listings page: FastAPI's default path vs ORJSONResponse."""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, ORJSONResponse
+
+    from app.main import _serialize_listing
+
+    listings = listing_page(page)
+    if encoder == "jsonable_encoder":
+        return lambda: JSONResponse(jsonable_encoder([_serialize_listing(listing) for listing in listings]))
+    return lambda: ORJSONResponse([_serialize_listing(listing) for listing in listings])
+
+
+@lru_cache(maxsize=1)
+def api_client():
+    """TestClient backed by a throwaway SQLite database."""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.main import app, get_db
+    from app.models import Base
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="mobi-bench-"), "bench.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+def listing_payload(images: int = 3) -> dict:
+    image_b64 = base64.b64encode(make_photo(320, 240)).decode("ascii")
+    analyses = sample_analyses(images)
+    return {
+        "property_type": "apartment",
+        "price": 250000,
+        "bedrooms": 2,
+        "bathrooms": 1,
+        "square_feet": 900,
+        "address": "Strada Exemplu 1",
+        "city": "București",
+        "images": [
+            {"image_data": image_b64, "order_index": i, "ai_analysis": analysis}
+            for i, analysis in enumerate(analyses)
+        ],
+        "synthesis": {
+            "total_rooms": 4,
+            "layout_type": "traditional",
+            "unified_description": "Acest apartament include Bucătărie, Dormitor.",
+            "room_breakdown": {"bedroom": 2, "kitchen": 1, "bathroom": 1},
+            "property_overview": {"property_type": "apartment"},
+            "interior_features": ["hardwood_floors"],
+            "exterior_features": [],
+        },
+    }
+
+
+@benchmark("api.analyze_step", params=[{"input_type": "field_update"}, {"input_type": "image"}])
+def bench_api_analyze_step(input_type: str):
+    client = api_client()
+    if input_type == "image":
+        payload = {
+            "current_data": {},
+            "new_input": base64.b64encode(make_photo(1280, 960)).decode("ascii"),
+            "input_type": "image",
+        }
+    else:
+        payload = {"current_data": {"property_type": "house", "bedrooms": 3}, "input_type": "field_update"}
+    return lambda: client.post("/api/analyze-step", json=payload)
+
+
+@benchmark("api.save_listing", params=[{"images": 3}])
+def bench_api_save_listing(images: int):
+    client = api_client()
+    payload = listing_payload(images)
+    return lambda: client.post("/api/listings", json=payload)
+
+
+@benchmark("api.get_listings", params=[{"page": 100}])
+def bench_api_get_listings(page: int):
+    client = api_client()
+    payload = listing_payload()
+    existing = len(client.get("/api/listings", params={"limit": page}).json())
+    for _ in range(page - existing):
+        client.post("/api/listings", json=payload)
+    return lambda: client.get("/api/listings", params={"limit": page})
@@ -0,0 +1,237 @@
+"""
+Open-loop load generator for the backend API.
+
+Drives `/api/analyze-step`, `/api/analyze-batch` and `/api/listings` at a
+target request rate and reports p50/p95/p99 latency and error rates per
+endpoint. Requests are scheduled on a fixed timetable (open loop), so a slow
+server shows up as rising latency instead of a silently lower request rate.
+
+Start the server with the simulated provider, then run the generator:
+
+    VISION_MODEL_TYPE=simulated SIM_VISION_LATENCY_MS=1200 SIM_VISION_RATE_LIMIT_RATE=0.02 \\
+        uv run uvicorn app.main:app --port 8000
+    uv run python -m benchmarks.loadgen --rps 20 --duration 60 \\
+        --mix analyze_step=6,analyze_batch=1,save_listing=1,get_listings=2
+
+`/api/analyze-step` degrades to defaults when the provider fails, so simulated
+provider errors and 429s appear in `mobi_vision_errors_total` on `/metrics`
+rather than as HTTP errors here.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.hot_paths import listing_payload, make_photo
+
+
+@dataclass
+class EndpointStats:
+    """Latencies and outcomes recorded for one scenario."""
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+    def record(self, latency: float, status: Optional[int]) -> None:
+        self.latencies.append(latency)
+        self.statuses[str(status) if status is not None else "connection_error"] += 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, object]:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "requests": count,
+            "error_rate": self.errors / count if count else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+            "statuses": dict(self.statuses),
+        }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def build_scenarios(image_kb: int) -> Dict[str, Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]]:
+    """Create the request factories for each scenario."""
+    side = max(64, int(math.sqrt(image_kb * 1024 / 3)))
+    photo = make_photo(side, side)
+    photo_b64 = base64.b64encode(photo).decode("ascii")
+    save_payload = listing_payload()
+
+    async def analyze_step(client):
+        return await client.post("/api/analyze-step", json={
+            "current_data": {},
+            "new_input": photo_b64,
+            "input_type": "image",
+        })
+
+    async def analyze_field_update(client):
+        return await client.post("/api/analyze-step", json={
+            "current_data": {"property_type": "house", "bedrooms": 3},
+            "input_type": "field_update",
+        })
+
+    async def analyze_batch(client):
+        files = [("files", (f"photo{i}.jpg", photo, "image/jpeg")) for i in range(4)]
+        return await client.post("/api/analyze-batch", files=files)
+
+    async def save_listing(client):
+        return await client.post("/api/listings", json=save_payload)
+
+    async def get_listings(client):
+        return await client.get("/api/listings", params={"limit": 20})
+
+    return {
+        "analyze_step": analyze_step,
+        "analyze_field_update": analyze_field_update,
+        "analyze_batch": analyze_batch,
+        "save_listing": save_listing,
+        "get_listings": get_listings,
+    }
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+async def run_load(
+    base_url: str,
+    rps: float,
+    duration: float,
+    mix: Dict[str, float],
+    max_in_flight: int,
+    timeout: float,
+    image_kb: int,
+    seed: Optional[int] = None,
+) -> Dict[str, object]:
+    """Fire requests at `rps` for `duration` seconds and collect statistics."""
+    scenarios = build_scenarios(image_kb)
+    unknown = set(mix) - set(scenarios)
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(sorted(unknown))}. Available: {', '.join(scenarios)}")
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    rng = random.Random(seed)
+    stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+    in_flight = asyncio.Semaphore(max_in_flight)
+    dropped = 0
+
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+
+        async def fire(name: str) -> None:
+            started = time.perf_counter()
+            status = None
+            try:
+                response = await scenarios[name](client)
+                status = response.status_code
+            except httpx.HTTPError:
+                pass
+            finally:
+                stats[name].record(time.perf_counter() - started, status)
+                in_flight.release()
+
+        tasks = []
+        total = int(rps * duration)
+        start = time.perf_counter()
+        for i in range(total):
+            delay = start + i / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if in_flight.locked():
+                # Client-side saturation: count it rather than silently slowing down
+                dropped += 1
+                continue
+            await in_flight.acquire()
+            name = rng.choices(names, weights)[0]
+            tasks.append(asyncio.create_task(fire(name)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    overall = EndpointStats()
+    for endpoint_stats in stats.values():
+        overall.latencies.extend(endpoint_stats.latencies)
+        overall.statuses.update(endpoint_stats.statuses)
+        overall.errors += endpoint_stats.errors
+
+    return {
+        "config": {
+            "base_url": base_url, "target_rps": rps, "duration_s": duration,
+            "mix": mix, "max_in_flight": max_in_flight, "image_kb": image_kb,
+        },
+        "achieved_rps": overall.summary()["requests"] / elapsed if elapsed else 0.0,
+        "dropped": dropped,
+        "overall": overall.summary(),
+        "endpoints": {name: endpoint_stats.summary() for name, endpoint_stats in sorted(stats.items())},
+    }
+
+
+def print_report(report: Dict[str, object]) -> None:
+    config = report["config"]
+    print(f"target {config['target_rps']} rps for {config['duration_s']}s -> "
+          f"achieved {report['achieved_rps']:.1f} rps, dropped {report['dropped']}\n")
+    print(f"{'scenario':<22} {'reqs':>6} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["overall"])]
+    for name, row in rows:
+        print(f"{name:<22} {row['requests']:>6} {row['error_rate'] * 100:>5.1f}% "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}")
+    print(f"\nstatus codes: {report['overall']['statuses']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="Backend base URL")
+    parser.add_argument("--rps", type=float, default=10.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test duration in seconds")
+    parser.add_argument("--mix", default="analyze_step=6,analyze_batch=1,save_listing=1,get_listings=2",
+                        help="Comma-separated scenario=weight list")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Client-side concurrency cap")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--image-kb", type=int, default=300, help="Approximate uploaded photo size")
+    parser.add_argument("--seed", type=int, help="Seed for the scenario mix")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load(
+        base_url=args.url,
+        rps=args.rps,
+        duration=args.duration,
+        mix=parse_mix(args.mix),
+        max_in_flight=args.max_in_flight,
+        timeout=args.timeout,
+        image_kb=args.image_kb,
+        seed=args.seed,
+    ))
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["overall"]["error_rate"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
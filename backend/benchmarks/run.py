@@ -0,0 +1,60 @@
+"""
+Run the backend benchmark suite and store the results as JSON.
+
+Usage (from backend/):
+    python -m benchmarks.run                       # all benchmarks
+    python -m benchmarks.run -k synthesize         # filter by name
+    python -m benchmarks.run --output benchmarks/results/head.json
+
+Results default to benchmarks/results/<commit>.json so runs on different
+commits can be diffed with `python -m benchmarks.compare`.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+from benchmarks import hot_paths  # noqa: F401  (registers benchmarks)
+from benchmarks.harness import BENCHMARKS, environment_metadata, run_benchmarks
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", help="Only run benchmarks whose name contains this substring")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark (default: 5)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per sample (default: 0.05)")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    # Keep per-call logging out of the timings and the console output
+    logging.disable(logging.INFO)
+
+    selected = [b for b in BENCHMARKS if not args.filter or args.filter in b.full_name]
+    if args.list:
+        for bench in selected:
+            print(bench.full_name)
+        return 0
+    if not selected:
+        print(f"No benchmarks match {args.filter!r}", file=sys.stderr)
+        return 1
+
+    document = run_benchmarks(selected, repeat=args.repeat, min_time=args.min_time)
+
+    output = args.output
+    if not output:
+        commit = (environment_metadata()["commit"] or "unknown")[:12]
+        output = os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
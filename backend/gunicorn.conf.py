@@ -0,0 +1,58 @@
+"""
+Gunicorn configuration for production.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Tunables (environment variables):
+- WEB_CONCURRENCY: worker processes (default: number of CPUs)
+- PORT: listen port (default 8000)
+- GRACEFUL_TIMEOUT: seconds to drain in-flight requests on shutdown (default 60)
+- WORKER_TIMEOUT: seconds before a silent worker is restarted (default 120)
+- KEEPALIVE: HTTP keep-alive seconds (default 5)
+- MAX_REQUESTS: recycle workers after this many requests, 0 disables (default 0)
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Metrics from all workers are aggregated through files in this directory.
+# It must be set before the app (and prometheus_client) is imported.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "mobi-prometheus"))
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "app.server.MobiUvicornWorker"
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = True
+
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "60"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # Start with empty metrics files; stale ones from a previous run would be summed in
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+    from app.server import prepare_master
+    prepare_master()
+
+
+def post_fork(server, worker):
+    from app.server import reset_after_fork
+    reset_after_fork()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
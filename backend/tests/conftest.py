@@ -0,0 +1,27 @@
+"""
+Shared fixtures: an in-memory database with every table and the text index.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import Base
+from app.text_search import ensure_text_index
+
+
+@pytest.fixture
+def session_factory():
+    # StaticPool: every session (and thread) shares the one in-memory database
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    ensure_text_index(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def db_session(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
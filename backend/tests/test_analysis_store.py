@@ -0,0 +1,233 @@
+"""
+Tests for the prompt-version-aware analysis store and the replay tool.
+"""
+
+import base64
+import hashlib
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import cli
+from app.analysis_replay import Variant, replay
+from app.analysis_store import AnalysisStore, image_hash
+from app.listing_import import import_listings
+from app.main import app, get_db
+from app.models import AnalysisResult, Listing
+from app.vision_model import DEFAULT_PROMPT_VERSION, DEFAULT_PROPERTY_PROMPT, MockVisionModel, prompt_version
+
+
+def image_b64(color: str) -> str:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color=color).save(buffer, format="JPEG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def stored_count(db) -> int:
+    return db.scalar(select(func.count()).select_from(AnalysisResult))
+
+
+def analysis_with_usage(image_data: bytes) -> dict:
+    return {"property_type": "house", "rooms": {"bedroom": 1},
+            "usage": {"model": "gpt-4.1", "input_tokens": 900, "output_tokens": 200,
+                      "latency_ms": 1234.5, "cost_usd": 0.0034}}
+
+
+def test_prompt_version_identifies_the_prompt_text():
+    assert prompt_version(DEFAULT_PROPERTY_PROMPT) == DEFAULT_PROMPT_VERSION
+    assert prompt_version(DEFAULT_PROPERTY_PROMPT + " ") != DEFAULT_PROMPT_VERSION
+    assert len(DEFAULT_PROMPT_VERSION) == 12
+
+
+def test_record_mode_stores_tagged_analysis_with_usage(session_factory):
+    db = session_factory()
+    store = AnalysisStore(mode="record")
+
+    result = store.analyze(db, b"image", "openai", "gpt-4.1", "v1", analysis_with_usage)
+
+    assert result["property_type"] == "house"
+    row = db.scalars(select(AnalysisResult)).one()
+    assert (row.image_hash, row.model_type, row.model, row.prompt_version) == \
+        (image_hash(b"image"), "openai", "gpt-4.1", "v1")
+    assert row.result == {"property_type": "house", "rooms": {"bedroom": 1}}
+    assert (row.input_tokens, row.output_tokens, row.latency_ms, row.cost_usd) == (900, 200, 1234.5, 0.0034)
+
+
+def test_same_key_is_stored_once(session_factory):
+    db = session_factory()
+    store = AnalysisStore(mode="record")
+
+    store.analyze(db, b"image", "openai", "gpt-4.1", "v1", analysis_with_usage)
+    store.analyze(db, b"image", "openai", "gpt-4.1", "v1", analysis_with_usage)
+    store.analyze(db, b"image", "openai", "gpt-4.1", "v2", analysis_with_usage)
+
+    assert stored_count(db) == 2
+
+
+def test_reuse_mode_answers_from_the_store(session_factory):
+    db = session_factory()
+    store = AnalysisStore(mode="reuse")
+    calls = []
+
+    def analyze(image_data):
+        calls.append(image_data)
+        return analysis_with_usage(image_data)
+
+    first = store.analyze(db, b"image", "openai", "gpt-4.1", "v1", analyze)
+    second = store.analyze(db, b"image", "openai", "gpt-4.1", "v1", analyze)
+    other_prompt = store.analyze(db, b"image", "openai", "gpt-4.1", "v2", analyze)
+
+    assert len(calls) == 2
+    assert "usage" in first and "usage" in other_prompt
+    assert second == {"property_type": "house", "rooms": {"bedroom": 1}}
+
+
+def test_store_leaves_the_callers_transaction_alone(session_factory):
+    db = session_factory()
+    store = AnalysisStore(mode="reuse")
+    pending = Listing(property_type="house")
+    db.add(pending)
+
+    store.analyze(db, b"image", "openai", "gpt-4.1", "v1", analysis_with_usage)
+    store.analyze(db, b"image", "openai", "gpt-4.1", "v1", analysis_with_usage)
+
+    assert pending in db.new
+    db.rollback()
+    assert stored_count(db) == 1
+    assert db.scalar(select(func.count()).select_from(Listing)) == 0
+
+
+def test_off_mode_and_store_errors_do_not_store(session_factory):
+    db = session_factory()
+    AnalysisStore(mode="off").analyze(db, b"image", "mock", "mock", "v1", analysis_with_usage)
+    assert stored_count(db) == 0
+
+    # No analysis_results table: the analysis is still returned
+    bare = sessionmaker(bind=create_engine("sqlite://"))()
+    result = AnalysisStore(mode="reuse").analyze(bare, b"image", "mock", "mock", "v1", analysis_with_usage)
+    assert result["property_type"] == "house"
+
+    with pytest.raises(ValueError):
+        AnalysisStore(mode="sometimes")
+
+
+def test_only_json_parsed_analyses_are_stored(session_factory):
+    db = session_factory()
+    store = AnalysisStore(mode="reuse")
+
+    def parsed(path):
+        return lambda image_data: {**analysis_with_usage(image_data), "parse_path": path}
+
+    store.analyze(db, b"text", "openai", "gpt-4.1", "v1", parsed("text"))
+    store.analyze(db, b"broken", "openai", "gpt-4.1", "v1", parsed("decode_error"))
+    store.analyze(db, b"not an image", "mock", "mock", "v1",
+                  lambda data: MockVisionModel().analyze_image(data, "prompt"))
+    assert stored_count(db) == 0
+
+    store.analyze(db, b"fenced", "openai", "gpt-4.1", "v1", parsed("markdown_json"))
+    assert stored_count(db) == 1
+
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+
+
+def test_analyze_step_records_the_analysis(client, session_factory):
+    response = client.post("/api/analyze-step", json={
+        "current_data": {}, "input_type": "image", "new_input": image_b64("red"),
+    })
+
+    assert response.status_code == 200
+    row = session_factory().scalars(select(AnalysisResult)).one()
+    assert row.image_hash == image_hash(base64.b64decode(image_b64("red")))
+    assert (row.model_type, row.model, row.prompt_version) == ("mock", "mock", DEFAULT_PROMPT_VERSION)
+
+
+def striped_png(stripe: int) -> bytes:
+    # Different structure per stripe, so the photos are not near-duplicates
+    image = Image.new("RGB", (64, 48), color="black")
+    image.paste((255, 255, 255), (stripe * 16, 0, stripe * 16 + 16, 48))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_analyze_batch_records_analyses_by_upload_hash(client, session_factory, monkeypatch):
+    monkeypatch.setenv("IMAGE_POOL_WORKERS", "0")
+    monkeypatch.setattr("app.image_pool._image_pool", None)
+    uploads = [striped_png(0), striped_png(2)]
+
+    response = client.post("/api/analyze-batch", files=[
+        ("files", (f"{i}.png", data, "image/png")) for i, data in enumerate(uploads)
+    ])
+
+    assert response.status_code == 200
+    stored = session_factory().scalars(select(AnalysisResult.image_hash)).all()
+    assert sorted(stored) == sorted(hashlib.sha256(data).hexdigest() for data in uploads)
+
+
+def test_analyze_step_batch_records_analyses(session_factory, monkeypatch):
+    monkeypatch.setattr("app.main.SessionLocal", session_factory)
+    item = {"current_data": {}, "input_type": "image"}
+
+    response = TestClient(app).post("/api/analyze-step/batch", json=[
+        {**item, "new_input": base64.b64encode(striped_png(0)).decode()},
+        {**item, "new_input": base64.b64encode(striped_png(1)).decode()},
+    ])
+
+    assert response.status_code == 200
+    assert stored_count(session_factory()) == 2
+
+
+def listing(colors) -> str:
+    return json.dumps({
+        "property_type": "house",
+        "images": [{"image_data": image_b64(color), "order_index": i} for i, color in enumerate(colors)],
+    })
+
+
+def test_replay_compares_variants_and_reuses_stored_analyses(session_factory):
+    import_listings(session_factory(), [listing(["red", "blue"]), listing(["green", "red"])])
+    baseline = Variant(model_type="mock")
+    candidate = Variant(model_type="mock", prompt="Describe the room briefly.")
+
+    first = replay(session_factory, baseline, candidate, sample_size=10, workers=4)
+
+    assert first["images"] == 3
+    assert first["baseline"]["prompt_version"] == DEFAULT_PROMPT_VERSION
+    assert first["candidate"]["prompt_version"] == prompt_version("Describe the room briefly.")
+    assert (first["baseline"]["calls"], first["candidate"]["calls"]) == (3, 3)
+    assert first["baseline"]["failed"] == first["candidate"]["failed"] == 0
+    assert set(first["agreement"]) == {"property_type", "rooms"}
+    assert all(0 <= share <= 1 for share in first["agreement"].values())
+    assert set(first["difference"]) >= {"cost_usd_per_image", "latency_ms_p50", "latency_ms_p95"}
+    assert stored_count(session_factory()) == 6
+
+    second = replay(session_factory, baseline, candidate, sample_size=10, workers=4)
+
+    assert (second["baseline"]["calls"], second["candidate"]["calls"]) == (0, 0)
+    assert second["candidate"]["latency_ms"] == first["candidate"]["latency_ms"]
+
+
+def test_cli_replay_requires_a_candidate(capsys):
+    assert cli.main(["replay-analyses"]) == 2
+    assert "Nothing to compare" in capsys.readouterr().err
@@ -0,0 +1,111 @@
+"""
+Tests for the batch analyze-step endpoint.
+"""
+
+import base64
+import io
+import threading
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app.main as main
+from app import analyze_batch
+from app.main import app
+from app.vision_model import MockVisionModel, reset_vision_model_cache, shared_vision_model
+
+client = TestClient(app)
+
+
+def image_b64(color: str) -> str:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color=color).save(buffer, format="JPEG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+FORM_STATES = [
+    {"current_data": {}, "input_type": "field_update"},
+    {"current_data": {"property_type": "house", "bedrooms": 3}, "input_type": "field_update"},
+    {"current_data": {"property_type": "apartment"}, "input_type": "text",
+     "new_input": "Apartament luminos cu 2 camere si balcon"},
+]
+
+
+def test_batch_matches_single_requests():
+    response = client.post("/api/analyze-step/batch", json=FORM_STATES)
+
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["index"] for item in items] == [0, 1, 2]
+    for item, state in zip(items, FORM_STATES):
+        assert item["error"] is None
+        assert item["response"] == client.post("/api/analyze-step", json=state).json()
+
+
+def test_identical_images_are_analyzed_once(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def fake_analyze(image_data, **kwargs):
+        with lock:
+            calls.append(image_data)
+        return {"property_type": "house", "rooms": {"bedroom": 3}, "amenities": ["pool"], "description": "Casa"}
+
+    monkeypatch.setattr(main, "analyze_property_image", fake_analyze)
+    red, blue = image_b64("red"), image_b64("blue")
+    states = [{"current_data": {}, "input_type": "image", "new_input": image} for image in (red, blue, red, red)]
+
+    items = client.post("/api/analyze-step/batch", json=states).json()
+
+    assert len(calls) == 2
+    assert all(item["response"]["extracted_data"]["bedrooms"] == 3 for item in items)
+    assert all(item["response"]["extracted_data"]["has_pool"] is True for item in items)
+
+
+def test_failing_item_does_not_fail_the_batch(monkeypatch):
+    original = main._analyze_step
+
+    def flaky(request, *args, **kwargs):
+        if request.current_data.get("fail"):
+            raise ValueError("boom")
+        return original(request, *args, **kwargs)
+
+    monkeypatch.setattr(main, "_analyze_step", flaky)
+    states = [FORM_STATES[1], {"current_data": {"fail": True}, "input_type": "field_update"}, FORM_STATES[0]]
+
+    items = client.post("/api/analyze-step/batch", json=states).json()
+
+    assert items[1] == {"index": 1, "response": None, "error": "boom"}
+    assert items[0]["response"] is not None and items[2]["response"] is not None
+
+
+def test_batch_size_is_limited(monkeypatch):
+    monkeypatch.setattr(main, "BATCH_MAX_ITEMS", 2)
+
+    response = client.post("/api/analyze-step/batch", json=FORM_STATES)
+
+    assert response.status_code == 400
+
+
+def test_image_cache_shares_errors():
+    calls = []
+
+    def failing(image_data):
+        calls.append(image_data)
+        raise RuntimeError("provider down")
+
+    cache = analyze_batch.ImageAnalysisCache(failing)
+    results = analyze_batch.run_batch([b"a", b"a", b"b"], cache)
+
+    assert [error for _, error in results] == ["provider down"] * 3
+    assert sorted(calls) == [b"a", b"b"]
+
+
+def test_shared_vision_model_is_reused_per_settings():
+    reset_vision_model_cache()
+    model = shared_vision_model("mock")
+
+    assert isinstance(model, MockVisionModel)
+    assert shared_vision_model("mock") is model
+    reset_vision_model_cache()
+    assert shared_vision_model("mock") is not model
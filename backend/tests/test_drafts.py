@@ -0,0 +1,200 @@
+"""
+Tests for the server-side draft store and its endpoints.
+"""
+
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+
+import app.main as main
+from app.drafts import DraftNotFoundError, DraftStore, diff_patch, merge_patch
+from app.main import app, get_db
+from app.models import Listing, ListingDraft
+
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    if previous is None:
+        del app.dependency_overrides[get_db]
+    else:
+        app.dependency_overrides[get_db] = previous
+
+
+def test_merge_patch_and_diff_round_trip():
+    before = {"property_type": "house", "bedrooms": 2, "notes": "x", "extra": {"a": 1, "b": 2}}
+    after = merge_patch(before, {"bedrooms": 3, "notes": None, "extra": {"b": None}, "price": 10})
+
+    assert after == {"property_type": "house", "bedrooms": 3, "extra": {"a": 1}, "price": 10}
+    assert before["bedrooms"] == 2
+    assert merge_patch(before, diff_patch(before, after)) == after
+
+
+def test_store_writes_through_and_expires(session_factory):
+    db = session_factory()
+    store = DraftStore(cache_size=1, ttl_seconds=60)
+    first = store.create(db, {"property_type": "house"})
+    second = store.create(db)  # evicts first from the cache
+
+    patched = store.patch(db, first.id, form_data={"bedrooms": 3})
+    assert patched.version == 2
+    assert DraftStore().get(db, first.id).form_data == {"property_type": "house", "bedrooms": 3}
+
+    db.execute(update(ListingDraft).where(ListingDraft.id == second.id)
+               .values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+    assert store.purge_expired(db) == 1
+    with pytest.raises(DraftNotFoundError):
+        store.get(db, second.id)
+
+
+def test_expired_drafts_are_purged_periodically(session_factory, monkeypatch):
+    monkeypatch.setattr(main, "SessionLocal", session_factory)
+    db = session_factory()
+    draft = DraftStore(ttl_seconds=60).create(db)
+    db.execute(update(ListingDraft).where(ListingDraft.id == draft.id)
+               .values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.commit()
+
+    def remaining() -> int:
+        return db.scalar(select(func.count()).select_from(ListingDraft))
+
+    async def purge_until_empty():
+        task = asyncio.create_task(main.purge_drafts_periodically(0.01))
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if not remaining():
+                break
+        task.cancel()
+
+    asyncio.run(purge_until_empty())
+    assert remaining() == 0
+
+
+def test_stale_cache_is_reloaded_instead_of_overwritten(session_factory):
+    db = session_factory()
+    worker_a, worker_b = DraftStore(), DraftStore()
+    draft = worker_a.create(db, {"property_type": "condo"})
+    worker_b.get(db, draft.id)
+
+    worker_a.patch(db, draft.id, form_data={"bedrooms": 1})
+    updated = worker_b.patch(db, draft.id, form_data={"price": 500})
+
+    assert updated.version == 3
+    assert updated.form_data == {"property_type": "condo", "bedrooms": 1, "price": 500}
+
+
+def test_cached_draft_is_checked_against_other_workers_writes(session_factory):
+    db = session_factory()
+    worker_a, worker_b = DraftStore(), DraftStore()
+    draft = worker_a.create(db, {"price": 1})
+    worker_b.get(db, draft.id)
+
+    worker_b.patch(db, draft.id, form_data={"price": 2})
+    seen_by_a = worker_a.get(db, draft.id)
+    assert (seen_by_a.form_data, seen_by_a.version) == ({"price": 2}, 2)
+
+    worker_a.delete(db, draft.id)
+    with pytest.raises(DraftNotFoundError):
+        worker_b.get(db, draft.id)
+
+
+def test_stale_cached_expiry_does_not_delete_an_extended_draft(session_factory):
+    db = session_factory()
+    worker_a, worker_b = DraftStore(ttl_seconds=60), DraftStore(ttl_seconds=60)
+    draft = worker_a.create(db, {"price": 1})
+    # A's cached copy has expired, but B has since written (and extended) the draft
+    worker_a._remember(replace(draft, expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    worker_b.patch(db, draft.id, form_data={"price": 2})
+
+    assert worker_a.get(db, draft.id).form_data == {"price": 2}
+    assert db.get(ListingDraft, draft.id) is not None
+
+
+def test_analyze_step_works_from_the_draft(client, monkeypatch):
+    def fake_analyze(image_data, **kwargs):
+        return {"property_type": "house", "rooms": {"bedroom": 3}, "amenities": ["pool"],
+                "amenities_confidence": {"pool": 0.9}, "description": "Casa"}
+
+    monkeypatch.setattr(main, "analyze_property_image", fake_analyze)
+    draft_id = client.post("/api/drafts", json={"current_data": {"city": "Cluj"}}).json()["draft_id"]
+
+    image_step = client.post("/api/analyze-step", json={"draft_id": draft_id, "input_type": "image"}).json()
+    field_step = client.post("/api/analyze-step", json={
+        "draft_id": draft_id, "input_type": "field_update", "current_data": {"property_type": "house", "city": None},
+    }).json()
+    draft = client.get(f"/api/drafts/{draft_id}").json()
+
+    assert image_step["draft_id"] == draft_id
+    assert image_step["extracted_data"]["city"] == "Cluj"
+    assert field_step["extracted_data"] == {"property_type": "house", "bedrooms": 3, "has_pool": True,
+                                             "has_fireplace": False, "has_balcony": False, "has_garage": False,
+                                             "has_hardwood_floors": False, "has_granite_counters": False}
+    assert draft["current_data"] == field_step["extracted_data"]
+    assert draft["version"] == 3
+    assert [result["rooms"] for result in draft["vision_results"]] == [{"bedroom": 3}]
+    assert draft["detected_features"]["amenities_confidence"] == {"pool": 0.9}
+
+
+def test_analyze_step_batch_items_work_from_their_drafts(client, session_factory, monkeypatch):
+    monkeypatch.setattr(main, "SessionLocal", session_factory)
+    draft_id = client.post("/api/drafts", json={"current_data": {"city": "Cluj"}}).json()["draft_id"]
+
+    results = client.post("/api/analyze-step/batch", json=[
+        {"draft_id": draft_id, "input_type": "field_update", "current_data": {"bedrooms": 2}},
+        {"draft_id": "missing", "input_type": "field_update"},
+        {"input_type": "field_update", "current_data": {"bedrooms": 1}},
+    ]).json()
+    draft = client.get(f"/api/drafts/{draft_id}").json()
+
+    assert results[0]["response"]["draft_id"] == draft_id
+    assert results[0]["response"]["extracted_data"] == {"city": "Cluj", "bedrooms": 2}
+    assert draft["current_data"] == {"city": "Cluj", "bedrooms": 2}
+    assert draft["version"] == 2
+    assert "expirat" in results[1]["error"]
+    assert results[2]["response"]["extracted_data"] == {"bedrooms": 1}
+
+
+def test_patch_and_delete(client):
+    draft_id = client.post("/api/drafts").json()["draft_id"]
+
+    patched = client.patch(f"/api/drafts/{draft_id}", json={
+        "current_data": {"price": 100}, "detected_features": {"amenities": ["garage"]},
+    })
+    assert patched.status_code == 200
+    assert patched.json()["current_data"] == {"price": 100}
+    assert patched.json()["detected_features"] == {"amenities": ["garage"]}
+
+    assert client.delete(f"/api/drafts/{draft_id}").status_code == 204
+    assert client.get(f"/api/drafts/{draft_id}").status_code == 404
+    assert client.patch(f"/api/drafts/{draft_id}", json={"current_data": {"price": 1}}).status_code == 404
+    assert client.post("/api/analyze-step", json={"draft_id": draft_id, "input_type": "text"}).status_code == 404
+
+
+def test_save_draft_as_listing(client, session_factory):
+    draft_id = client.post("/api/drafts", json={"current_data": {
+        "property_type": "apartment", "price": 90000, "city": "Iași", "has_balcony": True,
+    }}).json()["draft_id"]
+
+    incomplete = client.post(f"/api/drafts/{draft_id}/save", json={"images": []})
+    saved = client.post(f"/api/drafts/{draft_id}/save", json={"images": [{"image_data": "abc"}]})
+
+    assert incomplete.status_code == 400
+    assert saved.status_code == 200
+    db = session_factory()
+    listing = db.get(Listing, saved.json()["listing_id"])
+    assert (listing.property_type, listing.price, listing.city) == ("apartment", 90000, "Iași")
+    assert db.scalar(select(func.count()).select_from(ListingDraft)) == 0
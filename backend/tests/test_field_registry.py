@@ -0,0 +1,60 @@
+"""
+Tests for the precompiled field registry.
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from app.field_registry import COMMON_FIELDS, PROPERTY_TYPE_FIELDS, registry
+from app.field_suggestions import FieldSuggestionAlgorithm
+from app.orchestrator import orchestrator
+
+
+@pytest.mark.parametrize("property_type", [None, "house", "apartment", "condo", "townhouse"])
+def test_manifest_fields_sorted_by_priority(property_type):
+    definitions = registry.manifest_fields(property_type)
+    specific = PROPERTY_TYPE_FIELDS.get(property_type, ())
+
+    assert [d.priority for d in definitions] == sorted(d.priority for d in definitions)
+    assert len(definitions) == len(COMMON_FIELDS) + len(specific)
+    # Property-specific fields keep their declaration order after the common ones
+    assert [d.id for d in definitions[len(COMMON_FIELDS):]] == [f["id"] for f in specific]
+
+
+def test_registry_tables_are_read_only():
+    with pytest.raises(TypeError):
+        COMMON_FIELDS[0]["priority"] = 99
+    with pytest.raises(TypeError):
+        PROPERTY_TYPE_FIELDS["house"][0]["label"] = "x"
+    with pytest.raises(ValidationError):
+        registry.field("bedrooms").ui_field.label = "x"
+
+
+def test_get_next_fields_does_not_leak_state():
+    orchestrator.get_next_fields({"property_type": "house", "bedrooms": 2})
+
+    assert all("priority" not in field for field in PROPERTY_TYPE_FIELDS["house"])
+    assert orchestrator.get_next_fields({"property_type": "house"})[0] is registry.field("bedrooms").ui_field
+
+
+def test_suggestion_config_is_a_fresh_copy():
+    first = registry.suggestion_config("pool_type")
+    first["options"].append({"value": "x", "label": "x"})
+
+    assert len(registry.suggestion_config("pool_type")["options"]) == 3
+    assert registry.suggestion_config("garage", "house")["options"][0].label == "No Garage"
+    assert registry.suggestion_config("garage")["options"][0] == {"value": "none", "label": "No Garage"}
+    assert registry.suggestion_config("property_type")["label"] == "Property Type"
+    assert registry.suggestion_config("balcony_type") is None
+
+
+def test_suggestions_are_deterministic():
+    suggester = FieldSuggestionAlgorithm()
+    detected = {"amenities": ["pool", "garage"], "amenities_confidence": {"pool": 0.5, "garage": 0.5}}
+
+    results = {
+        tuple(field["id"] for field in suggester.suggest_fields({"property_type": "condo"}, detected))
+        for _ in range(5)
+    }
+
+    assert len(results) == 1
@@ -0,0 +1,207 @@
+"""
+Tests for response compression, ETags and conditional requests.
+"""
+
+import base64
+import gzip
+import io
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import compression
+from app.compression import CompressionMiddleware, choose_encoding
+from app.http_cache import compute_etag, etag_matches
+from app.main import app, get_db
+from app.models import Base, Listing, ListingImage
+
+LARGE_JSON = b'{"items": [' + b",".join(b'{"city": "Cluj-Napoca"}' for _ in range(200)) + b"]}"
+
+
+def make_app():
+    test_app = FastAPI()
+    test_app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @test_app.get("/large")
+    def large():
+        return Response(LARGE_JSON, media_type="application/json", headers={"ETag": '"abc"'})
+
+    @test_app.get("/small")
+    def small():
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    @test_app.get("/image")
+    def image():
+        return Response(b"\xff\xd8\xff" + bytes(2000), media_type="image/jpeg")
+
+    @test_app.get("/stream")
+    def stream():
+        return StreamingResponse((b'{"line": %d}\n' % i for i in range(100)), media_type="application/x-ndjson")
+
+    return test_app
+
+
+@pytest.fixture
+def client():
+    return TestClient(make_app())
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate", "gzip"),
+    ("deflate", None),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("", None),
+])
+def test_choose_encoding(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", None)
+
+    assert choose_encoding(header) == expected
+
+
+def test_large_json_is_gzipped(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(LARGE_JSON)
+    assert response.content == LARGE_JSON  # httpx decodes transparently
+    assert response.headers["etag"] == '"abc-gzip"'
+
+
+def test_small_and_binary_responses_pass_through(client):
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    identity = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in small.headers
+    assert "Accept-Encoding" in small.headers["vary"]
+    assert "content-encoding" not in image.headers
+    assert "vary" not in image.headers
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == '"abc"'
+
+
+def test_streaming_response_is_compressed_incrementally(client):
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw).count(b"\n") == 100
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+def test_brotli_preferred_when_available(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.content == LARGE_JSON
+
+
+@pytest.mark.parametrize("header, matches", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"abc-gzip"', True),
+    ('"xyz", "abc-br"', True),
+    ("*", True),
+    ('"abd"', False),
+    (None, False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+
+def jpeg_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 16), color="red").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def api_client():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    photo = base64.b64encode(jpeg_bytes()).decode("ascii")
+    listing = Listing(property_type="apartment", city="Cluj-Napoca")
+    listing.images = [
+        ListingImage(image_data=photo, ai_description="Living " * 100),
+        ListingImage(image_data=f"data:image/png;base64,{photo}"),
+        ListingImage(image_data="https://cdn.example.com/photo.jpg"),
+    ]
+    db.add(listing)
+    db.commit()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app), listing
+    if previous is None:
+        del app.dependency_overrides[get_db]
+    else:
+        app.dependency_overrides[get_db] = previous
+    db.close()
+
+
+def test_listing_etag_and_304(api_client):
+    client, listing = api_client
+
+    first = client.get(f"/api/listings/{listing.id}", headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["etag"]
+    again = client.get(f"/api/listings/{listing.id}", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+    plain = client.get(f"/api/listings/{listing.id}", headers={"Accept-Encoding": "identity"})
+    listings = client.get("/api/listings", headers={"Accept-Encoding": "identity"})
+    listings_again = client.get("/api/listings", headers={"If-None-Match": listings.headers["etag"]})
+
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert etag.endswith('-gzip"')
+    assert again.status_code == 304
+    assert again.content == b""
+    assert plain.headers["etag"] == compute_etag(plain.content)
+    assert listings_again.status_code == 304
+
+
+def test_304_carries_the_etag_of_the_representation_it_stands_for(api_client):
+    client, listing = api_client
+    url = f"/api/listings/{listing.id}"
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+
+    gzipped_again = client.get(url, headers={"If-None-Match": plain.headers["etag"], "Accept-Encoding": "gzip"})
+    plain_again = client.get(url, headers={"If-None-Match": gzipped.headers["etag"], "Accept-Encoding": "identity"})
+    image = listing.images[0]
+    image_etag = client.get(f"{url}/images/{image.id}").headers["etag"]
+    image_again = client.get(f"{url}/images/{image.id}",
+                             headers={"If-None-Match": image_etag, "Accept-Encoding": "gzip"})
+
+    assert gzipped_again.status_code == plain_again.status_code == image_again.status_code == 304
+    assert gzipped_again.headers["etag"] == gzipped.headers["etag"]
+    assert "Accept-Encoding" in gzipped_again.headers["vary"]
+    assert plain_again.headers["etag"] == plain.headers["etag"]
+    assert image_again.headers["etag"] == image_etag
+
+
+def test_listing_image_blob(api_client):
+    client, listing = api_client
+    jpeg_id, png_id, url_id = (image.id for image in listing.images)
+
+    response = client.get(f"/api/listings/{listing.id}/images/{jpeg_id}", headers={"Accept-Encoding": "gzip"})
+    revalidated = client.get(f"/api/listings/{listing.id}/images/{jpeg_id}",
+                             headers={"If-None-Match": response.headers["etag"]})
+    data_url = client.get(f"/api/listings/{listing.id}/images/{png_id}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert "content-encoding" not in response.headers
+    assert response.content == jpeg_bytes()
+    assert revalidated.status_code == 304
+    assert data_url.headers["content-type"] == "image/png"
+    assert client.get(f"/api/listings/{listing.id}/images/{url_id}").status_code == 404
+    assert client.get(f"/api/listings/{listing.id + 1}/images/{jpeg_id}").status_code == 404
@@ -0,0 +1,86 @@
+"""
+Tests for perceptual-hash near-duplicate detection.
+"""
+
+import io
+import random
+from unittest.mock import patch
+
+from PIL import Image, ImageDraw, ImageEnhance
+
+from app.image_hash import dhash, group_near_duplicates, hamming_distance, is_informative
+from app.vision_model import MockVisionModel, analyze_multiple_images
+
+
+def create_scene(seed, size=(800, 600)):
+    """Draw a room-like picture of random blocks."""
+    rng = random.Random(seed)
+    img = Image.new('RGB', size, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        w, h = rng.randrange(50, 300), rng.randrange(50, 300)
+        draw.rectangle([x, y, x + w, y + h], fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    return img
+
+
+def encode(img, quality=90):
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def near_duplicate(img):
+    """Same scene, resized, slightly brighter and recompressed."""
+    smaller = img.resize((img.width * 3 // 4, img.height * 3 // 4))
+    return encode(ImageEnhance.Brightness(smaller).enhance(1.05), quality=60)
+
+
+def test_near_duplicates_have_close_hashes():
+    scene = create_scene(1)
+    original = dhash(encode(scene))
+    duplicate = dhash(near_duplicate(scene))
+    other = dhash(encode(create_scene(2)))
+
+    assert hamming_distance(original, duplicate) <= 6
+    assert hamming_distance(original, other) > 6
+
+
+def test_undecodable_and_flat_images_are_not_grouped():
+    solid_red = encode(Image.new('RGB', (200, 200), 'red'))
+    solid_blue = encode(Image.new('RGB', (200, 200), 'blue'))
+    hashes = [dhash(solid_red), dhash(solid_blue), dhash(b"not an image")]
+
+    assert hashes[2] is None
+    assert not is_informative(hashes[0])
+    assert group_near_duplicates(hashes, max_distance=6) == [0, 1, 2]
+
+
+def test_group_near_duplicates_uses_first_image_as_representative():
+    hashes = [0x0F0F0F0F0F0F0F0F, 0xF0F0F0F0F0F0F0F0, 0x0F0F0F0F0F0F0F0E, 0xF0F0F0F0F0F0F0F1]
+
+    assert group_near_duplicates(hashes, max_distance=2) == [0, 1, 0, 1]
+    assert group_near_duplicates(hashes, max_distance=0) == [0, 1, 2, 3]
+
+
+def test_duplicates_share_one_model_call_and_count_rooms_once():
+    kitchen, bedroom = create_scene(1), create_scene(2)
+    images = [encode(kitchen), encode(bedroom), near_duplicate(kitchen)]
+    responses = iter([
+        {"description": "Kitchen", "property_type": "apartment", "rooms": {"kitchen": 1},
+         "amenities": ["dishwasher"], "style": "modern", "materials": [], "condition": "good"},
+        {"description": "Bedroom", "property_type": "apartment", "rooms": {"bedroom": 1},
+         "amenities": [], "style": "modern", "materials": [], "condition": "good"},
+    ])
+
+    with patch.object(MockVisionModel, "analyze_image", side_effect=lambda *_: next(responses)) as analyze:
+        result = analyze_multiple_images(images, model_type="mock")
+
+    assert analyze.call_count == 2
+    analyses = result["individual_analyses"]
+    assert analyses[2]["duplicate_of"] == 0
+    assert analyses[2]["image_index"] == 2
+    assert analyses[2]["rooms"] == {"kitchen": 1}
+    assert "duplicate_of" not in analyses[1]
+    assert result["synthesis"]["room_breakdown"] == {"kitchen": 1, "bedroom": 1}
+    assert result["synthesis"]["total_rooms"] == 2
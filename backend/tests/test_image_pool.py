@@ -0,0 +1,103 @@
+"""
+Tests for the image preprocessing process pool.
+"""
+
+import io
+import os
+from concurrent.futures import Future
+
+from PIL import Image
+
+from app import image_pool
+from app.image_pool import ImagePreprocessPool, get_image_pool
+from app.vision_model import analyze_multiple_images, preprocess_image
+
+
+def create_test_image(size=(1600, 1200), color='blue'):
+    img = Image.new('RGB', size, color)
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+def _crash_worker(image_data: bytes) -> bytes:
+    os._exit(1)
+
+
+def _completed(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def test_pool_matches_in_process_preprocessing():
+    images = [create_test_image(color=color) for color in ('red', 'green', 'blue', 'white')]
+    pool = ImagePreprocessPool(max_workers=2)
+    try:
+        processed = pool.preprocess_many(images)
+    finally:
+        pool.shutdown()
+
+    assert processed == [preprocess_image(image) for image in images]
+    assert max(Image.open(io.BytesIO(processed[0])).size) == 1024
+
+
+def test_disabled_pool_runs_inline():
+    pool = ImagePreprocessPool(max_workers=0)
+    image = create_test_image()
+
+    assert pool.preprocess(image) == preprocess_image(image)
+    assert pool._executor is None
+
+
+def test_full_queue_falls_back_to_inline():
+    pool = ImagePreprocessPool(max_workers=1, max_pending=1, queue_timeout=0.01, func=lambda data: data)
+    # Hold the only slot so the next submit sees a full queue
+    assert pool._slots.acquire(timeout=1)
+    try:
+        future = pool.submit(b"image")
+        assert future.done()
+        assert future.result() == b"image"
+        assert pool._executor is None
+    finally:
+        pool._slots.release()
+
+
+def test_broken_pool_falls_back_and_recovers():
+    pool = ImagePreprocessPool(max_workers=1, func=_crash_worker)
+    pool._run_inline = lambda data, mode: _completed(data)
+    try:
+        assert pool.preprocess(b"raw") == b"raw"
+        # The broken executor was discarded and is recreated on demand
+        assert pool._executor is None
+    finally:
+        pool.shutdown()
+
+
+def test_global_pool_configured_from_env(monkeypatch):
+    monkeypatch.setenv("IMAGE_POOL_WORKERS", "3")
+    monkeypatch.setenv("IMAGE_POOL_MAX_PENDING", "5")
+    monkeypatch.setattr(image_pool, "_image_pool", None)
+
+    pool = get_image_pool()
+
+    assert pool.max_workers == 3
+    assert pool.max_pending == 5
+    assert get_image_pool() is pool
+    image_pool.shutdown_image_pool()
+
+
+def test_analyze_multiple_images_uses_pool(monkeypatch):
+    batches = []
+
+    class RecordingPool:
+        def preprocess_many(self, images):
+            batches.append(len(images))
+            return [preprocess_image(image) for image in images]
+
+    monkeypatch.setattr("app.vision_model.get_image_pool", lambda: RecordingPool())
+
+    result = analyze_multiple_images([create_test_image() for _ in range(3)], model_type="mock")
+
+    assert batches == [3]
+    assert len(result["individual_analyses"]) == 3
@@ -0,0 +1,126 @@
+"""
+Tests for streaming listing export.
+"""
+
+import io
+import json
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.listing_export import ExportError, iter_records, write_ndjson, write_parquet
+from app.listing_import import import_listings
+from app.main import app, get_session_factory
+from app.models import Base, Listing, ListingImage, ListingSynthesis
+
+
+def make_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def seed(db, count=5):
+    for i in range(count):
+        listing = Listing(property_type="apartment", price=1000 + i, city="Iași")
+        listing.images = [
+            ListingImage(image_data=f"data-{i}-{j}", order_index=j, ai_description=f"Camera {j}",
+                         detected_rooms={"bedroom": 1}, detected_amenities=["balcony"])
+            for j in (1, 0)
+        ]
+        if i % 2 == 0:
+            listing.synthesis = ListingSynthesis(total_rooms=2, layout_type="traditional",
+                                                 unified_description="Apartament.", room_breakdown={"bedroom": 2},
+                                                 property_overview={}, interior_features=[], exterior_features=[])
+        db.add(listing)
+    db.commit()
+
+
+@pytest.fixture
+def db_session():
+    session = make_session_factory()()
+    seed(session)
+    yield session
+    session.close()
+
+
+def test_records_include_analyses_without_image_payloads(db_session):
+    records = list(iter_records(db_session, batch_size=2))
+
+    assert [record["price"] for record in records] == [1000, 1001, 1002, 1003, 1004]
+    first = records[0]
+    assert first["city"] == "Iași"
+    assert [image["order_index"] for image in first["images"]] == [0, 1]
+    assert first["images"][0]["ai_analysis"]["rooms"] == {"bedroom": 1}
+    assert "image_data" not in first["images"][0]
+    assert first["synthesis"]["layout_type"] == "traditional"
+    assert records[1]["synthesis"] is None
+
+
+def test_export_releases_each_batch(db_session):
+    db_session.expunge_all()
+    sizes = []
+    for _ in iter_records(db_session, batch_size=2):
+        sizes.append(len(db_session.identity_map))
+
+    # Each batch is expunged before its records are handed out
+    assert max(sizes) == 0
+
+
+def test_ndjson_export_round_trips_through_import(db_session):
+    out = io.BytesIO()
+    assert write_ndjson(db_session, out, include_images=True) == 5
+
+    target = make_session_factory()()
+    report = import_listings(target, out.getvalue().splitlines())
+
+    assert report["imported"] == 5
+    copied = list(iter_records(target, include_images=True))
+    original = list(iter_records(db_session, include_images=True))
+    for record in copied + original:
+        for column in ("id", "created_at", "updated_at", "status"):
+            record.pop(column)
+    assert copied == original
+    target.close()
+
+
+def test_export_endpoint_streams_ndjson(db_session):
+    previous = app.dependency_overrides.get(get_session_factory)
+    app.dependency_overrides[get_session_factory] = lambda: sessionmaker(bind=db_session.get_bind())
+    try:
+        with TestClient(app).stream("GET", "/api/listings/export", params={"include_images": True}) as response:
+            lines = list(response.iter_lines())
+            content_type = response.headers["content-type"]
+    finally:
+        if previous is None:
+            del app.dependency_overrides[get_session_factory]
+        else:
+            app.dependency_overrides[get_session_factory] = previous
+
+    assert response.status_code == 200
+    assert content_type.startswith("application/x-ndjson")
+    records = [json.loads(line) for line in lines if line]
+    assert len(records) == 5
+    assert records[0]["images"][0]["image_data"] == "data-0-0"
+
+
+def test_parquet_export(db_session, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "listings.parquet"
+
+    assert write_parquet(db_session, str(path), batch_size=2) == 5
+
+    table = pq.read_table(path)
+    assert table.num_rows == 5
+    assert json.loads(table.column("images")[0].as_py())[0]["ai_analysis"]["description"] == "Camera 0"
+
+
+def test_parquet_export_without_pyarrow_names_the_extra(db_session, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    with pytest.raises(ExportError, match=r"mobi-backend\[parquet\]"):
+        write_parquet(db_session, str(tmp_path / "listings.parquet"))
@@ -0,0 +1,218 @@
+"""
+Tests for bulk NDJSON listing import.
+"""
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, text
+
+from app import listing_import
+from app.listing_import import import_listings, parse_record
+from app.listing_index import amenity_filter, index_listing, min_rooms_filter
+from app.main import app, get_db
+from app.models import (
+    Listing,
+    ListingAmenity,
+    ListingImage,
+    ListingImageAmenity,
+    ListingRoomCounts,
+    ListingSearchDocument,
+    ListingSynthesis,
+)
+from app.text_search import index_listing_text, search_text
+
+
+def record(i: int, with_synthesis: bool = True) -> dict:
+    data = {
+        "property_type": "apartment",
+        "price": 100000 + i,
+        "bedrooms": 2,
+        "city": "Cluj-Napoca",
+        "images": [
+            {
+                "image_data": f"img-{i}-0",
+                "order_index": 0,
+                "ai_analysis": {"description": "Dormitor cu balcon.", "rooms": {"bedroom": 1},
+                                "amenities": ["Balcony"]},
+            },
+            {
+                "image_data": f"img-{i}-1",
+                "order_index": 1,
+                "ai_analysis": {"description": "Bucătărie modernă.", "rooms": {"kitchen": 1},
+                                "amenities": ["Swimming Pool"]},
+            },
+        ],
+    }
+    if with_synthesis:
+        data["synthesis"] = {
+            "total_rooms": 3,
+            "layout_type": "open_concept",
+            "unified_description": "Apartament luminos cu parchet.",
+            "room_breakdown": {"bedroom": 2, "kitchen": 1},
+            "property_overview": {},
+            "interior_features": ["parquet"],
+        }
+    return data
+
+
+def ndjson(records) -> list:
+    return [json.dumps(r) + "\n" for r in records]
+
+
+def count(db, model) -> int:
+    return db.scalar(select(func.count()).select_from(model))
+
+
+def test_import_inserts_listings_images_and_synthesis(db_session):
+    records = [record(i, with_synthesis=i % 2 == 0) for i in range(7)]
+
+    report = import_listings(db_session, ndjson(records), chunk_size=3)
+
+    assert report == {"imported": 7, "failed": 0, "errors": []}
+    assert count(db_session, Listing) == 7
+    assert count(db_session, ListingImage) == 14
+    assert count(db_session, ListingSynthesis) == 4
+
+    listing = db_session.scalars(select(Listing).where(Listing.price == 100005)).one()
+    assert [image.image_data for image in sorted(listing.images, key=lambda i: i.order_index)] == \
+        ["img-5-0", "img-5-1"]
+    assert listing.images[0].detected_amenities in (["Balcony"], ["Swimming Pool"])
+    assert listing.status == "draft"
+
+
+def test_import_writes_the_same_index_rows_as_save(db_session):
+    import_listings(db_session, ndjson([record(0)]))
+    imported = db_session.scalars(select(Listing)).one()
+
+    # Index the same listing the single-save way and compare
+    reference = Listing(property_type="apartment")
+    reference.images = [
+        ListingImage(image_data=img.image_data, ai_description=img.ai_description,
+                     detected_rooms=img.detected_rooms, detected_amenities=img.detected_amenities)
+        for img in imported.images
+    ]
+    reference.synthesis = ListingSynthesis(**{
+        column: getattr(imported.synthesis, column)
+        for column in ("unified_description", "room_breakdown", "interior_features", "exterior_features")
+    })
+    db_session.add(reference)
+    db_session.flush()
+    index_listing(db_session, reference)
+    index_listing_text(db_session, reference)
+    db_session.commit()
+
+    def amenity_ids(listing):
+        return sorted(link.amenity_id for link in listing.amenity_links)
+
+    assert amenity_ids(imported) == amenity_ids(reference)
+    assert sorted(sorted(link.amenity_id for link in image.amenity_links) for image in imported.images) == \
+        sorted(sorted(link.amenity_id for link in image.amenity_links) for image in reference.images)
+    assert imported.search_document.document == reference.search_document.document
+    for column in ("bedrooms", "kitchens", "total_rooms"):
+        assert getattr(imported.room_counts, column) == getattr(reference.room_counts, column)
+
+
+def test_imported_listings_are_searchable(db_session):
+    import_listings(db_session, ndjson(record(i) for i in range(3)))
+
+    pool = db_session.scalars(
+        select(Listing.id).where(amenity_filter(db_session, ["pool"]), min_rooms_filter(bedrooms=2))
+    ).all()
+    total, _ = search_text(db_session, "parchet balcon")
+
+    assert len(pool) == 3
+    assert total == 3
+
+
+def test_invalid_records_are_reported_and_skipped(db_session):
+    lines = ndjson([record(0)]) + [
+        "{not json\n",
+        "\n",
+        json.dumps({"property_type": "house", "images": []}) + "\n",
+        json.dumps([1, 2]) + "\n",
+    ] + ndjson([record(1)])
+
+    report = import_listings(db_session, lines, chunk_size=2)
+
+    assert report["imported"] == 2
+    assert report["failed"] == 3
+    assert [error["line"] for error in report["errors"]] == [2, 4, 5]
+    assert "images" in report["errors"][1]["error"]
+    assert count(db_session, Listing) == 2
+
+
+def test_database_error_only_rejects_the_offending_record(db_session):
+    db_session.execute(text(
+        "CREATE TRIGGER reject_city BEFORE INSERT ON listings WHEN NEW.city = 'Nowhere' "
+        "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+    ))
+    records = [record(i) for i in range(4)]
+    records[2]["city"] = "Nowhere"
+
+    report = import_listings(db_session, ndjson(records), chunk_size=4)
+
+    assert report["imported"] == 3
+    assert [error["line"] for error in report["errors"]] == [3]
+    assert count(db_session, Listing) == 3
+    assert count(db_session, ListingImage) == 6
+    assert count(db_session, ListingRoomCounts) == 3
+
+
+def post_import(db_session, body, **params):
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = lambda: db_session
+    try:
+        return TestClient(app).post(
+            "/api/listings/import", params=params, content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+    finally:
+        if previous is None:
+            del app.dependency_overrides[get_db]
+        else:
+            app.dependency_overrides[get_db] = previous
+
+
+def test_import_endpoint_streams_ndjson(db_session):
+    body = ("".join(ndjson(record(i) for i in range(5))) + "{bad\n" + json.dumps(record(5))).encode()
+    # Odd-sized pieces so lines span chunk boundaries; no trailing newline
+    response = post_import(db_session, (body[i:i + 37] for i in range(0, len(body), 37)), chunk_size=2)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["failed"]) == (6, 1)
+    assert report["errors"][0]["line"] == 6
+    assert count(db_session, ListingSearchDocument) == 6
+    assert count(db_session, ListingAmenity) == 6 * 3
+    assert count(db_session, ListingImageAmenity) == 6 * 2
+
+
+def test_import_endpoint_parses_lines_off_the_event_loop(db_session, monkeypatch):
+    loops = []
+
+    def parse(raw):
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return parse_record(raw)
+
+    monkeypatch.setattr(listing_import, "parse_record", parse)
+    response = post_import(db_session, "".join(ndjson(record(i) for i in range(3))).encode(), chunk_size=2)
+
+    assert response.json()["imported"] == 3
+    assert loops == [None, None, None]
+
+
+def test_import_endpoint_rejects_overlong_lines(db_session, monkeypatch):
+    line = json.dumps(record(0)).encode()
+    monkeypatch.setenv("UPLOAD_MAX_BYTES", str(len(line)))
+    assert post_import(db_session, line + b"\n" + line).json()["imported"] == 2
+
+    pieces = [line[:10], line[10:] + b"x\n"]
+    response = post_import(db_session, (piece for piece in pieces))
+
+    assert response.status_code == 413
+    assert count(db_session, Listing) == 2
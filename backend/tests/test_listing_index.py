@@ -0,0 +1,107 @@
+"""
+Tests for the normalized amenity / room-count index.
+"""
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.listing_index import amenity_filter, index_listing, min_rooms_filter, normalize_amenity
+from app.models import Amenity, Base, Listing, ListingImage, ListingSynthesis
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def add_listing(db, amenities, rooms, synthesis_rooms=None):
+    listing = Listing(property_type="house")
+    listing.images = [
+        ListingImage(image_data="x", detected_amenities=names, detected_rooms=room)
+        for names, room in zip(amenities, rooms)
+    ]
+    if synthesis_rooms is not None:
+        listing.synthesis = ListingSynthesis(room_breakdown=synthesis_rooms, exterior_features=["Front Porch"])
+    db.add(listing)
+    db.flush()
+    index_listing(db, listing)
+    db.commit()
+    return listing
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Swimming Pool", "pool"),
+    ("hardwood-floors", "hardwood_floors"),
+    ("  Garage ", "garage"),
+    ("", None),
+    (None, None),
+])
+def test_normalize_amenity(name, expected):
+    assert normalize_amenity(name) == expected
+
+
+def test_index_listing_builds_vocabulary_and_room_counts(db_session):
+    listing = add_listing(
+        db_session,
+        amenities=[["pool", "garden"], ["Swimming Pool", "dishwasher"]],
+        rooms=[{"bedroom": 2}, {"bedroom": 1, "kitchen": 1, "office": 1}],
+    )
+
+    names = {a.name for a in db_session.query(Amenity)}
+    assert names == {"pool", "garden", "dishwasher"}
+    assert len(listing.amenity_links) == 3
+    assert [len(image.amenity_links) for image in listing.images] == [2, 2]
+    counts = listing.room_counts
+    assert (counts.bedrooms, counts.kitchens, counts.other_rooms, counts.total_rooms) == (3, 1, 1, 5)
+
+
+def test_synthesis_breakdown_takes_precedence(db_session):
+    listing = add_listing(
+        db_session,
+        amenities=[[], []],
+        rooms=[{"bedroom": 1}, {"bedroom": 1}],
+        synthesis_rooms={"bedroom": 1, "bathroom": 2},
+    )
+
+    assert listing.room_counts.bedrooms == 1
+    assert listing.room_counts.bathrooms == 2
+    assert "front_porch" in {a.name for a in db_session.query(Amenity)}
+
+
+def test_reindex_replaces_rows(db_session):
+    listing = add_listing(db_session, amenities=[["pool"]], rooms=[{"bedroom": 1}])
+    listing.images[0].detected_amenities = ["garage"]
+    listing.images[0].detected_rooms = {"bedroom": 4}
+    index_listing(db_session, listing)
+    db_session.commit()
+
+    assert db_session.scalars(select(Listing.id).where(amenity_filter(db_session, ["pool"]))).all() == []
+    assert listing.room_counts.bedrooms == 4
+
+
+def test_pool_and_three_bedrooms_query(db_session):
+    match = add_listing(db_session, amenities=[["pool"], ["garage"]], rooms=[{"bedroom": 2}, {"bedroom": 1}])
+    add_listing(db_session, amenities=[["pool"]], rooms=[{"bedroom": 2}])
+    add_listing(db_session, amenities=[["garage"]], rooms=[{"bedroom": 5}])
+
+    query = select(Listing.id).where(amenity_filter(db_session, ["Swimming pool"]), min_rooms_filter(bedrooms=3))
+
+    assert db_session.scalars(query).all() == [match.id]
+    assert db_session.scalars(select(Listing.id).where(amenity_filter(db_session, ["sauna"]))).all() == []
+
+
+def test_pool_and_three_bedrooms_query_uses_indexes(db_session):
+    add_listing(db_session, amenities=[["pool"]], rooms=[{"bedroom": 3}])
+    query = select(Listing.id).where(amenity_filter(db_session, ["pool"]), min_rooms_filter(bedrooms=3))
+    compiled = query.compile(db_session.get_bind(), compile_kwargs={"literal_binds": True})
+
+    plan = " ".join(row[-1] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+
+    assert "SCAN" not in plan
+    assert "ix_listing_amenities_amenity_listing" in plan
+    assert "ix_listing_room_counts_bedrooms" in plan
@@ -0,0 +1,104 @@
+"""
+Tests for reindexing stored listings.
+"""
+
+import json
+
+import pytest
+from sqlalchemy import delete, func, select, text
+
+from app import cli
+from app.listing_import import import_listings
+from app.listing_index import amenity_filter, min_rooms_filter
+from app.listing_reindex import reindex_listings
+from app.models import (
+    Listing,
+    ListingAmenity,
+    ListingImageAmenity,
+    ListingRoomCounts,
+    ListingSearchDocument,
+)
+from app.synthesis_backfill import read_checkpoint
+from app.text_search import search_text
+
+
+def record(i: int) -> str:
+    return json.dumps({
+        "property_type": "house",
+        "price": 100000 + i,
+        "images": [{
+            "image_data": f"img-{i}",
+            "order_index": 0,
+            "ai_analysis": {"description": "Dormitor luminos lângă piscină", "rooms": {"bedroom": 3},
+                            "amenities": ["Swimming Pool"]},
+        }],
+    })
+
+
+def drop_index_rows(db) -> None:
+    """Leave the listings as they were before the indexes existed."""
+    for model in (ListingAmenity, ListingImageAmenity, ListingRoomCounts, ListingSearchDocument):
+        db.execute(delete(model))
+    db.execute(text("DELETE FROM listing_fts"))
+    db.commit()
+
+
+def matching(db, *conditions) -> int:
+    return db.scalar(select(func.count()).select_from(Listing).where(*conditions))
+
+
+def test_reindex_restores_filters_and_text_search(db_session):
+    import_listings(db_session, [record(i) for i in range(3)])
+    drop_index_rows(db_session)
+    assert matching(db_session, amenity_filter(db_session, ["pool"])) == 0
+    assert search_text(db_session, "piscina")[0] == 0
+
+    report = reindex_listings(db_session, batch_size=2)
+
+    assert report["reindexed"] == 3
+    assert matching(db_session, amenity_filter(db_session, ["pool"]), min_rooms_filter(bedrooms=3)) == 3
+    assert search_text(db_session, "piscina")[0] == 3
+
+
+def test_missing_only_skips_indexed_listings(db_session):
+    import_listings(db_session, [record(0)])
+    drop_index_rows(db_session)
+    import_listings(db_session, [record(1)])
+
+    report = reindex_listings(db_session, missing_only=True)
+
+    assert report["reindexed"] == 1
+    assert search_text(db_session, "piscina")[0] == 2
+    assert reindex_listings(db_session, missing_only=True)["reindexed"] == 0
+
+
+def test_reindex_resumes_from_checkpoint(db_session, tmp_path):
+    import_listings(db_session, [record(i) for i in range(5)])
+    drop_index_rows(db_session)
+    checkpoint = str(tmp_path / "reindex.json")
+
+    first = reindex_listings(db_session, batch_size=2, checkpoint_path=checkpoint, limit=2)
+    assert first["reindexed"] == 2
+    assert read_checkpoint(checkpoint) == first["last_listing_id"]
+
+    second = reindex_listings(db_session, batch_size=2, checkpoint_path=checkpoint)
+    assert second["reindexed"] == 3
+    assert matching(db_session, amenity_filter(db_session, ["pool"])) == 5
+
+
+def test_batch_size_must_be_positive(db_session):
+    with pytest.raises(ValueError):
+        reindex_listings(db_session, batch_size=0)
+
+
+def test_cli_reindex(db_session, monkeypatch, capsys):
+    import_listings(db_session, [record(0)])
+    drop_index_rows(db_session)
+    monkeypatch.setattr(cli, "SessionLocal", lambda: db_session)
+    monkeypatch.setattr(cli, "init_db", lambda: None)
+
+    assert cli.main(["reindex", "--missing"]) == 0
+
+    out, err = capsys.readouterr()
+    assert json.loads(out)["reindexed"] == 1
+    assert "1 listings reindexed" in err
@@ -0,0 +1,155 @@
+"""
+Tests for the declarative listing search endpoint.
+"""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.listing_index import index_listing
+from app.main import app, get_db
+from app.models import Base, Listing, ListingImage
+from app.search import ListingSearchRequest, build_search_query, order_clauses
+
+LISTINGS = [
+    # property_type, city, price, bedrooms, status, amenities
+    ("apartment", "Cluj-Napoca", 95000, 2, "published", ["balcony"]),
+    ("apartment", "Cluj-Napoca", 140000, 3, "published", ["pool"]),
+    ("house", "Cluj-Napoca", 250000, 4, "published", ["pool", "garden"]),
+    ("apartment", "București", 120000, 2, "draft", []),
+    ("house", "București", 310000, 5, "published", ["garage"]),
+]
+
+
+def seed(db):
+    for property_type, city, price, bedrooms, status, amenities in LISTINGS:
+        listing = Listing(property_type=property_type, city=city, price=price, bedrooms=bedrooms, status=status)
+        # Image analysis finds one bedroom fewer than the seller entered
+        listing.images = [ListingImage(image_data="x", detected_amenities=amenities,
+                                       detected_rooms={"bedroom": bedrooms - 1})]
+        db.add(listing)
+        db.flush()
+        index_listing(db, listing)
+    db.commit()
+
+
+@pytest.fixture
+def db_session(db_session):
+    seed(db_session)
+    return db_session
+
+
+@pytest.fixture
+def client(db_session):
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = lambda: db_session
+    yield TestClient(app)
+    if previous is None:
+        del app.dependency_overrides[get_db]
+    else:
+        app.dependency_overrides[get_db] = previous
+
+
+def search(client, **body):
+    response = client.post("/api/listings/search", json=body)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_filters_and_sort(client):
+    result = search(
+        client,
+        filters={"city": {"eq": "Cluj-Napoca"}, "price": {"gte": 100000}},
+        sort=[{"field": "price", "direction": "asc"}],
+    )
+
+    assert result["total"] == 2
+    assert [item["price"] for item in result["items"]] == [140000, 250000]
+
+
+def test_in_filter_and_bedroom_range(client):
+    result = search(client, filters={"property_type": {"in": ["house"]}, "bedrooms": {"gte": 5}})
+
+    assert [item["city"] for item in result["items"]] == ["București"]
+
+
+def test_status_filter_and_pagination(client):
+    first = search(client, filters={"status": {"eq": "published"}}, sort=[{"field": "price"}], limit=2)
+    second = search(client, filters={"status": {"eq": "published"}}, sort=[{"field": "price"}], limit=2, offset=2)
+
+    assert first["total"] == second["total"] == 4
+    assert [item["price"] for item in first["items"] + second["items"]] == [310000, 250000, 140000, 95000]
+
+
+def test_amenity_filter(client):
+    result = search(client, amenities=["Swimming Pool"], filters={"bedrooms": {"gte": 3}})
+
+    assert sorted(item["price"] for item in result["items"]) == [140000, 250000]
+
+
+def test_detected_rooms_filter(client):
+    result = search(client, amenities=["pool"], detected_rooms={"bedrooms": 3})
+
+    assert [item["price"] for item in result["items"]] == [250000]
+    assert search(client, detected_rooms={"total_rooms": 4, "bedrooms": 0})["total"] == 1
+
+
+@pytest.mark.parametrize("body", [
+    {"filters": {"description": {"eq": "x"}}},
+    {"detected_rooms": {"garages": 1}},
+    {"detected_rooms": {"bedrooms": -1}},
+    {"detected_rooms": {"bedrooms": "three"}},
+    {"filters": {"price": {"like": 5}}},
+    {"filters": {"price": {"gte": "cheap"}}},
+    {"filters": {"city": {"in": []}}},
+    {"sort": [{"field": "address"}]},
+    {"limit": 1000},
+])
+def test_invalid_specs_are_rejected(client, body):
+    response = client.post("/api/listings/search", json=body)
+
+    assert response.status_code == 422
+
+
+def explain_sqlite(db, request):
+    query = build_search_query(db, request).order_by(*order_clauses(request.sort))
+    compiled = query.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    return " ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+
+
+@pytest.mark.parametrize("body, index", [
+    ({"filters": {"city": {"eq": "Cluj-Napoca"}, "property_type": {"eq": "apartment"},
+                  "price": {"lte": 150000}}}, "ix_listings_city_type_price"),
+    ({"filters": {"property_type": {"eq": "house"}, "price": {"gte": 200000}}}, "ix_listings_type_price"),
+    ({"filters": {"status": {"eq": "published"}}}, "ix_listings_status_created"),
+])
+def test_sqlite_query_plan_uses_composite_indexes(db_session, body, index):
+    plan = explain_sqlite(db_session, ListingSearchRequest(**body))
+
+    assert f"USING INDEX {index}" in plan
+    assert "SCAN listings" not in plan
+
+
+@pytest.mark.skipif(not os.getenv("MOBI_TEST_POSTGRES_URL"), reason="MOBI_TEST_POSTGRES_URL not set")
+def test_postgres_query_plan_uses_composite_indexes():
+    engine = create_engine(os.environ["MOBI_TEST_POSTGRES_URL"])
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        seed(db)
+        # The table is tiny, so make the planner show whether the index is usable at all
+        db.execute(text("SET enable_seqscan = off"))
+        request = ListingSearchRequest(filters={
+            "city": {"eq": "Cluj-Napoca"}, "property_type": {"eq": "apartment"}, "price": {"lte": 150000},
+        })
+        compiled = build_search_query(db, request).compile(engine, compile_kwargs={"literal_binds": True})
+        plan = "\n".join(row[0] for row in db.execute(text(f"EXPLAIN {compiled}")))
+
+        assert "ix_listings_city_type_price" in plan
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,111 @@
+"""
+Tests for the WebSocket listing session protocol.
+"""
+
+import io
+import json
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app.main as main
+from app.main import app
+
+client = TestClient(app)
+
+
+def jpeg_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color="green").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def fake_analyze(image_data, **kwargs):
+    return {"property_type": "house", "rooms": {"bedroom": 4}, "amenities": ["garage"], "description": "Casa"}
+
+
+def test_updates_are_deltas_against_server_state():
+    with client.websocket_connect("/ws/listing-session") as ws:
+        ws.send_json({"type": "update", "fields": {"property_type": "house"}, "id": 1})
+        first = ws.receive_json()
+        ws.send_json({"type": "update", "fields": {"bedrooms": 3}, "id": 2})
+        second = ws.receive_json()
+        ws.send_json({"type": "sync"})
+        synced = ws.receive_json()
+
+    expected = client.post("/api/analyze-step", json={
+        "current_data": {"property_type": "house", "bedrooms": 3}, "input_type": "field_update",
+    }).json()
+    assert first["id"] == 1 and first["type"] == "manifest" and first["changes"] == {}
+    assert second["id"] == 2
+    assert second["ui_schema"] == expected["ui_schema"]
+    assert second["completion_percentage"] == expected["completion_percentage"]
+    assert synced["state"] == {"property_type": "house", "bedrooms": 3}
+    assert synced["ui_schema"] == expected["ui_schema"]
+
+
+def test_unchanged_ui_schema_is_not_resent():
+    with client.websocket_connect("/ws/listing-session") as ws:
+        ws.send_json({"type": "update", "fields": {"property_type": "house"}})
+        first = ws.receive_json()
+        ws.send_json({"type": "update", "fields": {"notes": "x"}})
+        second = ws.receive_json()
+        ws.send_json({"type": "update", "fields": {"notes": None}})
+        third = ws.receive_json()
+
+    assert "ui_schema" in first
+    assert "ui_schema" not in second and "ui_schema" not in third
+    assert third["step_number"] == 1
+
+
+def test_binary_image_frames_stream_vision_then_manifest(monkeypatch):
+    monkeypatch.setattr(main, "analyze_property_image", fake_analyze)
+    image = jpeg_bytes()
+
+    with client.websocket_connect("/ws/listing-session") as ws:
+        ws.send_json({"type": "image_start"})
+        ws.send_bytes(image[:100])
+        ws.send_bytes(image[100:])
+        ws.send_json({"type": "image_end", "id": "img"})
+        events = [ws.receive_json() for _ in range(3)]
+
+    assert [(e["type"], e.get("status")) for e in events] == [
+        ("vision", "analyzing"), ("vision", "done"), ("manifest", None),
+    ]
+    assert events[0]["bytes"] == len(image)
+    assert events[1]["analysis"]["rooms"] == {"bedroom": 4}
+    assert events[2]["changes"]["bedrooms"] == 4
+    assert events[2]["changes"]["has_garage"] is True
+    assert events[2]["ui_schema"][0]["default"] == "house"
+    assert all(e["id"] == "img" for e in events)
+
+
+def test_invalid_messages_report_errors_and_keep_the_session():
+    with client.websocket_connect("/ws/listing-session") as ws:
+        ws.send_text("not json")
+        bad_json = ws.receive_json()
+        ws.send_bytes(b"chunk")
+        no_start = ws.receive_json()
+        ws.send_json({"type": "teleport", "id": 7})
+        unknown = ws.receive_json()
+        ws.send_json({"type": "image_end"})
+        empty = ws.receive_json()
+        ws.send_json({"type": "update", "fields": {"property_type": "condo"}})
+        ok = ws.receive_json()
+
+    assert [e["type"] for e in (bad_json, no_start, unknown, empty)] == ["error"] * 4
+    assert unknown["id"] == 7
+    assert ok["type"] == "manifest"
+
+
+def test_oversized_image_is_rejected(monkeypatch):
+    monkeypatch.setenv("UPLOAD_MAX_BYTES", "10")
+
+    with client.websocket_connect("/ws/listing-session") as ws:
+        ws.send_json({"type": "image_start"})
+        ws.send_bytes(b"x" * 11)
+        error = ws.receive_json()
+        ws.send_json({"type": "image_end"})
+        empty = ws.receive_json()
+
+    assert error["type"] == "error" and empty["type"] == "error"
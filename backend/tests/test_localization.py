@@ -0,0 +1,54 @@
+"""
+Tests for the translation catalogs and compiled templates.
+"""
+
+import pytest
+
+from app.localization import CompiledTemplate, available_locales, get_locale, render_ai_message, render_description
+from app.orchestrator import orchestrator
+from app.vision_model import generate_unified_description
+
+DESCRIPTION_ARGS = dict(
+    total_rooms=3,
+    room_breakdown={"living_room": 1, "bedroom": 2},
+    amenities=["fireplace", "smart_home", "granite_counters", "tile_floors", "bathtub"],
+    materials=["hardwood_floors"],
+    property_type="house",
+    style="Modern",
+    analyses=[{"amenities": ["hardwood_floors"]}, {"amenities": ["hardwood_floors"]}, {"amenities": []}],
+    exterior_features=["Garden", "fountain"],
+)
+
+
+def test_romanian_description():
+    assert generate_unified_description(**DESCRIPTION_ARGS) == (
+        "Acest casă include Dormitor, Sufragerie"
+        ". Caracteristici includ parchet în toate camerele, blat de granit, șemineu, smart home, gresie"
+        ". Caracteristici exterioare includ grădină, fountain. Stil general: modern."
+    )
+
+
+def test_locale_switch():
+    description = render_description(**DESCRIPTION_ARGS, locale="en")
+
+    assert description == (
+        "This house includes Bedroom, Living Room. Features include hardwood floors throughout, "
+        "granite countertops, a fireplace, smart home, tile floors. Exterior features include Garden, fountain. "
+        "Overall style: Modern."
+    )
+    assert render_ai_message("apartment", 1, locale="en").startswith("Great! Property type: apartment.")
+    assert orchestrator.generate_ai_message({"property_type": "condo"}, [], locale="en") == \
+        render_ai_message("condo", 1, locale="en")
+
+
+def test_unknown_locale_falls_back_to_default():
+    assert render_ai_message(None, 0, locale="xx") == render_ai_message(None, 0)
+    assert set(available_locales()) >= {"ro", "en"}
+
+
+def test_catalogs_are_read_only_and_templates_checked():
+    with pytest.raises(TypeError):
+        get_locale("ro").amenities["pool"] = "x"
+    with pytest.raises(ValueError):
+        CompiledTemplate("Acest {} include {rooms}")
+    assert CompiledTemplate("Acest {property_type} include {rooms}").fields == {"property_type", "rooms"}
@@ -0,0 +1,125 @@
+"""
+Tests for token/cost accounting and the Prometheus /metrics endpoint.
+"""
+
+import io
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from prometheus_client import REGISTRY
+
+from app.main import app
+from app.metrics import estimate_cost, summarize_usage
+from app.vision_model import OpenAIVisionModel, AnthropicVisionModel, DEFAULT_PROPERTY_PROMPT
+
+
+def create_test_image(size=(100, 100)):
+    img = Image.new('RGB', size, 'red')
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def make_openai_model(content, prompt_tokens=1200, completion_tokens=300):
+    """Build an OpenAIVisionModel with a fake client (no openai package needed)."""
+    model = OpenAIVisionModel.__new__(OpenAIVisionModel)
+    model.model = "gpt-4.1"
+    model.client = MagicMock()
+    model.client.chat.completions.create.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+    return model
+
+
+def make_anthropic_model(content, input_tokens=900, output_tokens=200):
+    model = AnthropicVisionModel.__new__(AnthropicVisionModel)
+    model.model = "claude-3-sonnet-20240229"
+    model.client = MagicMock()
+    model.client.messages.create.return_value = SimpleNamespace(
+        content=[SimpleNamespace(text=content)],
+        usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens),
+    )
+    return model
+
+
+class TestUsageAccounting:
+
+    def test_openai_usage_recorded_and_attached(self):
+        before_in = sample("mobi_vision_tokens_total", model_type="openai", model="gpt-4.1", direction="input")
+        before_out = sample("mobi_vision_tokens_total", model_type="openai", model="gpt-4.1", direction="output")
+        model = make_openai_model(json.dumps({"description": "A kitchen", "rooms": {"kitchen": 1}}))
+
+        result = model.analyze_image(create_test_image(), DEFAULT_PROPERTY_PROMPT)
+
+        assert result["usage"]["input_tokens"] == 1200
+        assert result["usage"]["output_tokens"] == 300
+        assert result["usage"]["cost_usd"] == pytest.approx(estimate_cost("gpt-4.1", 1200, 300))
+        assert sample("mobi_vision_tokens_total", model_type="openai", model="gpt-4.1", direction="input") == before_in + 1200
+        assert sample("mobi_vision_tokens_total", model_type="openai", model="gpt-4.1", direction="output") == before_out + 300
+
+    def test_anthropic_usage_recorded(self):
+        model = make_anthropic_model(json.dumps({"description": "A bedroom"}))
+        result = model.analyze_image(create_test_image(), DEFAULT_PROPERTY_PROMPT)
+        assert result["usage"]["input_tokens"] == 900
+        assert result["usage"]["model"] == "claude-3-sonnet-20240229"
+
+    @pytest.mark.parametrize("content,path", [
+        ('{"description": "x"}', "json"),
+        ('Here you go:\n```json\n{"description": "x"}\n```', "markdown_json"),
+        ("A bright living room with hardwood floors.", "text"),
+        ('{"description": broken', "decode_error"),
+    ])
+    def test_parse_path_counted(self, content, path):
+        before = sample("mobi_vision_parse_path_total", model_type="openai", path=path)
+        make_openai_model(content).analyze_image(create_test_image(), DEFAULT_PROPERTY_PROMPT)
+        assert sample("mobi_vision_parse_path_total", model_type="openai", path=path) == before + 1
+
+    def test_estimate_cost_unknown_model_is_free(self):
+        assert estimate_cost("unknown-model", 1000, 1000) == 0.0
+
+    def test_summarize_usage_skips_analyses_without_usage(self):
+        summary = summarize_usage([
+            {"usage": {"input_tokens": 100, "output_tokens": 10, "latency_ms": 5.0, "cost_usd": 0.001}},
+            {"description": "mock result"},
+            {"usage": {"input_tokens": 50, "output_tokens": 5, "latency_ms": 2.5, "cost_usd": 0.0005}},
+        ])
+        assert summary["input_tokens"] == 150
+        assert summary["output_tokens"] == 15
+        assert summary["model_calls"] == 2
+        assert summary["cost_usd"] == pytest.approx(0.0015)
+
+
+class TestMetricsEndpoint:
+
+    def test_metrics_endpoint_exposes_prometheus_text(self):
+        client = TestClient(app)
+        client.get("/health")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'mobi_http_request_duration_seconds_count{endpoint="/health",method="GET",status="200"}' in response.text
+
+    def test_analyze_step_records_image_bytes_and_latency(self):
+        client = TestClient(app)
+        before = sample("mobi_vision_image_bytes_count", model_type="mock")
+
+        response = client.post("/api/analyze-step", json={
+            "current_data": {},
+            "new_input": None,
+            "input_type": "image",
+        })
+
+        assert response.status_code == 200
+        assert sample("mobi_vision_image_bytes_count", model_type="mock") == before + 1
+        assert sample("mobi_vision_model_latency_seconds_count", model_type="mock", model="mock") >= 1
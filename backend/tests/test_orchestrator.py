@@ -157,4 +157,38 @@ class TestFieldOrchestrator:
             assert "id" in field
             assert "component_type" in field
             assert "label" in field
-            assert "priority" in field
\ No newline at end of file
+            assert "priority" in field
+
+class TestManifestCache:
+    """Memoized manifest generation."""
+
+    def test_manifest_is_cached_on_filled_keys(self):
+        first = orchestrator.manifest({"property_type": "condo", "bedrooms": 2})
+        second = orchestrator.manifest({"bedrooms": 5, "property_type": "condo"})
+
+        assert second is first
+        assert [field.id for field in first.fields] == \
+            [field.id for field in orchestrator.get_next_fields({"property_type": "condo", "bedrooms": 2})]
+        assert first.completion_percentage == orchestrator.calculate_completion_percentage(
+            {"property_type": "condo", "bedrooms": 2}
+        )
+
+    def test_different_states_get_different_manifests(self):
+        house = orchestrator.manifest({"property_type": "house"})
+        condo = orchestrator.manifest({"property_type": "condo"})
+        filled = orchestrator.manifest({"property_type": "house", "bedrooms": 1})
+
+        assert house is not condo
+        assert house.fields[0].id == "bedrooms"
+        assert filled.fields[0].id == "bathrooms"
+
+    def test_get_next_fields_returns_a_new_list(self):
+        fields = orchestrator.get_next_fields({"property_type": "house"})
+        fields.clear()
+
+        assert len(orchestrator.get_next_fields({"property_type": "house"})) == 3
+
+    def test_unhashable_property_type(self):
+        manifest = orchestrator.manifest({"property_type": ["house"]})
+
+        assert manifest.fields[0].id == "bedrooms"
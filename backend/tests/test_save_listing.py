@@ -4,7 +4,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app, get_db, Base
-from app.models import Listing, ListingImage, ListingSynthesis
+from app.models import Amenity, Listing, ListingImage, ListingSynthesis
 
 # Test database setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -113,6 +113,17 @@ def test_save_listing_success(test_client):
     assert listing.synthesis.unified_description == "Beautiful modern apartment"
     assert len(listing.synthesis.interior_features) == 2
     assert len(listing.synthesis.exterior_features) == 1
+    
+    # Verify normalized amenity and room-count index
+    assert sorted(link.amenity_id for link in listing.amenity_links) == sorted(
+        amenity.id for amenity in db.query(Amenity).filter(
+            Amenity.name.in_(["hardwood_floors", "granite_counters", "balcony"])
+        )
+    )
+    assert len(image.amenity_links) == 1
+    assert listing.room_counts.bedrooms == 2
+    assert listing.room_counts.bathrooms == 1
+    assert listing.room_counts.total_rooms == 5
 
 
 def test_save_listing_minimal(test_client):
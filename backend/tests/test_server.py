@@ -0,0 +1,45 @@
+"""
+Tests for the multi-worker process model hooks.
+"""
+
+import os
+from unittest.mock import patch
+
+from app import vision_model
+from app.server import MobiUvicornWorker, prepare_master, reset_after_fork
+
+
+def test_worker_prefers_uvloop_and_httptools():
+    assert MobiUvicornWorker.CONFIG_KWARGS["loop"] in ("uvloop", "auto")
+    assert MobiUvicornWorker.CONFIG_KWARGS["http"] in ("httptools", "auto")
+
+
+def test_prepare_master_initializes_db_once(monkeypatch):
+    # Registered with monkeypatch so the value prepare_master sets is undone
+    monkeypatch.setenv("MOBI_SKIP_INIT_DB", "0")
+    with patch("app.main.init_db") as init_db, patch("app.main.purge_expired_drafts") as purge:
+        prepare_master()
+    init_db.assert_called_once()
+    purge.assert_called_once()
+    assert os.environ["MOBI_SKIP_INIT_DB"] == "1"
+
+
+def test_worker_startup_skips_init_db_after_master(monkeypatch):
+    from app.main import on_startup
+
+    monkeypatch.setenv("MOBI_SKIP_INIT_DB", "1")
+    with patch("app.main.init_db") as init_db, patch("app.main.purge_expired_drafts") as purge:
+        on_startup()
+    init_db.assert_not_called()
+    purge.assert_not_called()
+
+
+def test_reset_after_fork_drops_inherited_state():
+    vision_model.get_vision_model("mock")
+    assert vision_model._vision_model is not None
+
+    with patch("app.main.engine") as engine:
+        reset_after_fork()
+
+    engine.dispose.assert_called_once_with(close=False)
+    assert vision_model._vision_model is None
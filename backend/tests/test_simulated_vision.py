@@ -0,0 +1,126 @@
+"""
+Tests for the latency-injecting simulated vision provider.
+"""
+
+import io
+import time
+
+import pytest
+from PIL import Image
+
+from app.simulated_vision import SimulatedVisionModel, SimulationConfig
+from app.vision_model import (
+    DEFAULT_PROPERTY_PROMPT,
+    VisionModelError,
+    VisionModelRateLimitError,
+    analyze_multiple_images,
+    analyze_property_image,
+    create_vision_model,
+    reset_vision_model_cache,
+)
+
+
+def create_test_image(size=(200, 200)):
+    img = Image.new('RGB', size, 'green')
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+def test_factory_creates_simulated_model(monkeypatch):
+    monkeypatch.setenv("SIM_VISION_LATENCY_DIST", "fixed")
+    monkeypatch.setenv("SIM_VISION_LATENCY_MS", "5")
+    model = create_vision_model("simulated", api_key=None)
+
+    assert isinstance(model, SimulatedVisionModel)
+    assert model.config.latency_dist == "fixed"
+    assert model.config.latency_ms == 5
+
+
+def test_fixed_latency_is_applied():
+    model = SimulatedVisionModel(SimulationConfig(latency_dist="fixed", latency_ms=30))
+    started = time.perf_counter()
+    result = model.analyze_image(create_test_image(), DEFAULT_PROPERTY_PROMPT)
+
+    assert time.perf_counter() - started >= 0.03
+    assert "description" in result
+    assert result["usage"]["output_tokens"] == 250
+    assert result["usage"]["input_tokens"] > 0
+
+
+def test_token_pacing_adds_streaming_time():
+    config = SimulationConfig(latency_dist="fixed", latency_ms=0, output_tokens=64, tokens_per_second=1000)
+    model = SimulatedVisionModel(config)
+    started = time.perf_counter()
+    model.analyze_image(create_test_image(), DEFAULT_PROPERTY_PROMPT)
+
+    assert time.perf_counter() - started >= 0.064
+
+
+def test_rate_limit_errors():
+    config = SimulationConfig(latency_dist="fixed", latency_ms=0, rate_limit_rate=1.0)
+    model = SimulatedVisionModel(config)
+
+    with pytest.raises(VisionModelRateLimitError):
+        model.analyze_image(create_test_image(), DEFAULT_PROPERTY_PROMPT)
+
+
+def test_error_rate_is_roughly_respected():
+    config = SimulationConfig(latency_dist="fixed", latency_ms=0, error_rate=0.3, seed=42)
+    model = SimulatedVisionModel(config)
+    failures = 0
+    for _ in range(200):
+        try:
+            model.analyze_image(create_test_image(), DEFAULT_PROPERTY_PROMPT)
+        except VisionModelRateLimitError:
+            pytest.fail("No rate limits configured")
+        except VisionModelError:
+            failures += 1
+
+    assert 40 <= failures <= 80
+
+
+@pytest.mark.parametrize("dist,spread", [("uniform", 200), ("normal", 200), ("lognormal", 1.5)])
+def test_latency_distributions_are_non_negative(dist, spread):
+    model = SimulatedVisionModel(SimulationConfig(latency_dist=dist, latency_ms=100, latency_spread=spread, seed=1))
+    samples = [model.sample_latency() for _ in range(500)]
+    assert min(samples) >= 0
+
+
+def test_invalid_config_rejected():
+    with pytest.raises(VisionModelError):
+        SimulationConfig(latency_dist="pareto")
+    with pytest.raises(VisionModelError):
+        SimulationConfig(error_rate=0.8, rate_limit_rate=0.5)
+
+
+def test_analyze_property_image_with_simulated_model(monkeypatch):
+    monkeypatch.setenv("SIM_VISION_LATENCY_DIST", "fixed")
+    monkeypatch.setenv("SIM_VISION_LATENCY_MS", "1")
+    result = analyze_property_image(create_test_image(), model_type="simulated")
+    assert result["usage"]["model"] == "simulated"
+
+
+def test_batch_images_draw_from_one_seeded_model(monkeypatch):
+    monkeypatch.setenv("SIM_VISION_LATENCY_DIST", "fixed")
+    monkeypatch.setenv("SIM_VISION_LATENCY_MS", "0")
+    monkeypatch.setenv("SIM_VISION_ERROR_RATE", "0.5")
+    monkeypatch.setenv("SIM_VISION_SEED", "7")
+    reset_vision_model_cache()
+    # Distinct pictures, so none is skipped as a near-duplicate
+    images = []
+    for i in range(8):
+        img = Image.new('RGB', (64, 64), 'black')
+        img.paste((255, 255, 255), (i * 8, 0, i * 8 + 8, 64))
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG')
+        images.append(buffer.getvalue())
+
+    try:
+        result = analyze_multiple_images(images, model_type="simulated")
+    finally:
+        reset_vision_model_cache()
+
+    failed = ["error" in analysis for analysis in result["individual_analyses"]]
+    # A new model per image would repeat the seed's first draw for every image
+    assert any(failed) and not all(failed)
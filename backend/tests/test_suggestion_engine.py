@@ -0,0 +1,75 @@
+"""
+Tests for the bitset field suggestion engine.
+"""
+
+import random
+
+import pytest
+
+from app.field_registry import FEATURE_FIELD_MAPPING, PROPERTY_TYPE_FIELDS, registry
+from app.field_suggestions import FieldSuggestionAlgorithm
+from app.suggestion_engine import SuggestionEngine, get_suggestion_engine
+
+
+def _random_states(count, seed=7):
+    rng = random.Random(seed)
+    property_types = [None, "land", *PROPERTY_TYPE_FIELDS]
+    features = list(FEATURE_FIELD_MAPPING)
+    states = []
+    for _ in range(count):
+        property_type = rng.choice(property_types)
+        fields = registry.suggestion_candidates(property_type)
+        current_data = {field_id: "x" for field_id in rng.sample(fields, rng.randint(0, len(fields)))}
+        if property_type is not None:
+            current_data["property_type"] = property_type
+        for flag in ("has_pool", "has_parking"):
+            if rng.random() < 0.3:
+                current_data[flag] = rng.choice([True, False])
+        amenities = rng.sample(features, rng.randint(0, 4))
+        detected = {
+            "amenities": amenities,
+            # Some amenities without a confidence, and some ties
+            "amenities_confidence": {f: rng.choice([0.2, 0.3, 0.5, 0.7, 0.71, 0.9]) for f in amenities[1:]},
+        }
+        states.append((current_data, rng.choice([detected, None])))
+    return states
+
+
+def test_matches_reference_implementation():
+    reference = FieldSuggestionAlgorithm()
+    engine = SuggestionEngine()
+
+    for current_data, detected in _random_states(2000):
+        for threshold in (0.3, 0.75):
+            assert engine.suggest(current_data, detected, threshold) == \
+                reference.suggest_fields(current_data, detected, threshold)
+
+
+@pytest.mark.parametrize("current_data", [
+    {},
+    {"property_type": "house"},
+    {"property_type": "apartment", "bedrooms": 2, "bathrooms": 1, "price": 1, "square_feet": 50},
+    {"property_type": "condo", "has_pool": True, "has_parking": True},
+])
+def test_rank_fields_orders_every_missing_field(current_data):
+    ranked = SuggestionEngine().rank_fields(current_data)
+    keys = [(priority, -confidence) for priority, confidence, _ in ranked]
+
+    assert keys == sorted(keys)
+    assert not {field_id for _, _, field_id in ranked} & set(current_data)
+
+
+def test_suggest_many_matches_single_calls():
+    engine = get_suggestion_engine()
+    states = _random_states(200, seed=11)
+
+    assert engine.suggest_many(states) == [
+        [field["id"] for field in engine.suggest(current_data, detected)]
+        for current_data, detected in states
+    ]
+
+
+def test_unhashable_property_type_falls_back_to_common_fields():
+    engine = SuggestionEngine()
+
+    assert engine.suggest({"property_type": ["house"]}) == engine.suggest({"property_type": "land"})
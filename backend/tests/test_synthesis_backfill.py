@@ -0,0 +1,216 @@
+"""
+Tests for the re-synthesis backfill.
+"""
+
+import base64
+import io
+import json
+
+import pytest
+from PIL import Image
+from sqlalchemy import select
+
+from app import cli, synthesis_backfill
+from app.listing_import import import_listings
+from app.models import Listing, ListingRoomCounts, ListingSearchDocument, ListingSynthesis
+from app.synthesis_backfill import (
+    SynthesisBackfill,
+    backfill_synthesis,
+    read_checkpoint,
+    read_failed_listing_ids,
+    resynthesize,
+)
+
+
+def png(color, band=(0, 0, 16, 48)) -> str:
+    image = Image.new("RGB", (64, 48), color=color)
+    # Structure for the perceptual hash: a bright band (on the left by default)
+    image.paste((255, 255, 255), band)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def record(i: int) -> dict:
+    return {
+        "property_type": "apartment",
+        "price": 100000 + i,
+        "images": [
+            {
+                "image_data": f"img-{i}-0",
+                "order_index": 0,
+                "ai_analysis": {"description": "Bright bedroom", "rooms": {"bedroom": 1},
+                                "amenities": ["hardwood_floors"], "property_type": "apartment",
+                                "style": "modern", "condition": "good"},
+            },
+            {
+                "image_data": f"img-{i}-1",
+                "order_index": 1,
+                "ai_analysis": {"description": "Garden with a patio", "rooms": {}, "amenities": [],
+                                "condition": "good"},
+            },
+        ],
+        # Stale: written by an older synthesis
+        "synthesis": {
+            "total_rooms": 5,
+            "layout_type": "traditional",
+            "unified_description": "Old description.",
+            "room_breakdown": {"bedroom": 5},
+            "property_overview": {"common_materials": ["hardwood_floors"]},
+            "interior_features": [],
+        },
+    }
+
+
+def synthesis_of(db, price: int) -> ListingSynthesis:
+    listing = db.scalars(select(Listing).where(Listing.price == price)).one()
+    db.refresh(listing.synthesis)
+    return listing.synthesis
+
+
+def test_backfill_rewrites_stale_synthesis_and_index_rows(db_session):
+    import_listings(db_session, [json.dumps(record(i)) for i in range(3)])
+
+    report = backfill_synthesis(db_session, batch_size=2, workers=0, dedupe=False)
+
+    assert report["processed"] == 3
+    assert report["changed"] == 3
+    assert report["failed"] == 0
+    synthesis = synthesis_of(db_session, 100001)
+    assert synthesis.total_rooms == 1
+    assert synthesis.room_breakdown == {"bedroom": 1}
+    assert synthesis.interior_features == ["hardwood_floors"]
+    assert sorted(synthesis.exterior_features) == ["landscaping", "outdoor living space"]
+    assert synthesis.property_overview["common_materials"] == ["hardwood_floors"]
+
+    room_counts = db_session.get(ListingRoomCounts, synthesis.listing_id)
+    db_session.refresh(room_counts)
+    assert room_counts.bedrooms == 1
+    document = db_session.get(ListingSearchDocument, synthesis.listing_id).document
+    assert "old" not in document.split()
+
+
+def test_backfill_is_idempotent(db_session):
+    import_listings(db_session, [json.dumps(record(i)) for i in range(3)])
+    backfill_synthesis(db_session, workers=0, dedupe=False)
+
+    report = backfill_synthesis(db_session, workers=0, dedupe=False)
+
+    assert report["processed"] == 3
+    assert report["changed"] == 0
+
+
+def test_dry_run_writes_nothing(db_session):
+    import_listings(db_session, [json.dumps(record(0))])
+
+    report = backfill_synthesis(db_session, workers=0, dry_run=True)
+
+    assert report["changed"] == 1
+    assert synthesis_of(db_session, 100000).total_rooms == 5
+
+
+def test_backfill_resumes_from_checkpoint(db_session, tmp_path):
+    import_listings(db_session, [json.dumps(record(i)) for i in range(5)])
+    checkpoint = str(tmp_path / "backfill.json")
+
+    first = backfill_synthesis(db_session, batch_size=2, workers=0, dedupe=False, checkpoint_path=checkpoint, limit=2)
+    assert first["processed"] == 2
+    assert read_checkpoint(checkpoint) == first["last_listing_id"]
+    assert synthesis_of(db_session, 100004).total_rooms == 5
+
+    second = backfill_synthesis(db_session, batch_size=2, workers=0, dedupe=False, checkpoint_path=checkpoint)
+    assert second["processed"] == 3
+    assert second["changed"] == 3
+    assert synthesis_of(db_session, 100004).total_rooms == 1
+
+
+def test_failed_listings_are_recorded_and_retried_on_resume(db_session, tmp_path, monkeypatch):
+    import_listings(db_session, [json.dumps(record(i)) for i in range(4)])
+    broken = db_session.scalars(select(Listing.id).where(Listing.price == 100001)).one()
+    checkpoint = str(tmp_path / "backfill.json")
+
+    def failing(images, materials):
+        if images[0]["listing_id"] == broken:
+            raise RuntimeError("synthesis bug")
+        return resynthesize(images, materials)
+
+    monkeypatch.setattr(synthesis_backfill, "resynthesize", failing)
+    first = backfill_synthesis(db_session, batch_size=2, workers=0, dedupe=False, checkpoint_path=checkpoint)
+    assert (first["failed"], first["failed_listing_ids"]) == (1, [broken])
+    assert read_failed_listing_ids(checkpoint) == [broken]
+    assert synthesis_of(db_session, 100001).total_rooms == 5
+
+    monkeypatch.setattr(synthesis_backfill, "resynthesize", resynthesize)
+    second = backfill_synthesis(db_session, batch_size=2, workers=0, dedupe=False, checkpoint_path=checkpoint)
+    assert (second["processed"], second["changed"], second["failed_listing_ids"]) == (1, 1, [])
+    assert read_failed_listing_ids(checkpoint) == []
+    assert read_checkpoint(checkpoint) == first["last_listing_id"]
+    assert synthesis_of(db_session, 100001).total_rooms == 1
+
+
+def test_near_duplicate_photos_are_counted_once():
+    bedroom = {"listing_id": 1, "ai_description": "Bedroom", "detected_rooms": {"bedroom": 1},
+               "detected_amenities": [], "property_type": "house", "style": None, "condition": None}
+    images = [
+        {**bedroom, "image_data": png((40, 60, 200))},
+        {**bedroom, "image_data": "data:image/png;base64," + png((40, 60, 200))},
+        {**bedroom, "image_data": png((200, 40, 40)).replace("i", "!")},  # undecodable
+    ]
+
+    assert resynthesize(images, [])["room_breakdown"] == {"bedroom": 2}
+    assert resynthesize([{k: v for k, v in image.items() if k != "image_data"} for image in images],
+                        [])["room_breakdown"] == {"bedroom": 3}
+
+
+def test_backfill_reads_image_data_one_listing_at_a_time(db_session, monkeypatch):
+    photos = [png((40, 60, 200)), png((40, 60, 200)), png((40, 60, 200), band=(48, 0, 64, 48))]
+    listings = []
+    for i in range(3):
+        listing = record(i)
+        listing["images"] = [
+            {**listing["images"][0], "image_data": photo, "order_index": n} for n, photo in enumerate(photos)
+        ]
+        listings.append(json.dumps(listing))
+    import_listings(db_session, listings)
+
+    loaded = []
+    original = SynthesisBackfill._load_image_data
+
+    def recording_load(self, listing_id):
+        loaded.append(listing_id)
+        return original(self, listing_id)
+
+    monkeypatch.setattr(SynthesisBackfill, "_load_image_data", recording_load)
+
+    report = SynthesisBackfill(db_session, batch_size=3, workers=0).run()
+
+    assert report["processed"] == 3
+    assert len(loaded) == len(set(loaded)) == 3
+    # The first two photos are the same picture: two bedrooms, not three
+    assert synthesis_of(db_session, 100002).room_breakdown == {"bedroom": 2}
+
+
+def test_backfill_with_worker_processes(db_session):
+    import_listings(db_session, [json.dumps(record(i)) for i in range(4)])
+
+    report = SynthesisBackfill(db_session, batch_size=3, workers=2).run()
+
+    assert report["processed"] == 4
+    assert report["changed"] == 4
+    assert synthesis_of(db_session, 100003).total_rooms == 1
+
+
+def test_batch_size_must_be_positive(db_session):
+    with pytest.raises(ValueError):
+        SynthesisBackfill(db_session, batch_size=0)
+
+
+def test_cli_resynthesize(db_session, monkeypatch, capsys):
+    import_listings(db_session, [json.dumps(record(0))])
+    monkeypatch.setattr(cli, "SessionLocal", lambda: db_session)
+
+    assert cli.main(["resynthesize", "--workers", "0", "--dry-run"]) == 0
+
+    out, err = capsys.readouterr()
+    assert json.loads(out)["changed"] == 1
+    assert "1 listings, 1 changed" in err
@@ -0,0 +1,146 @@
+"""
+Tests for full-text search over listing descriptions.
+"""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app, get_db
+from app.models import Base, Listing, ListingImage, ListingSynthesis
+from app.text_search import analyze, ensure_text_index, fold_diacritics, index_listing_text, search_text
+
+DESCRIPTIONS = [
+    ("Apartament luminos cu balcon închis și parchet din stejar.", "Bucătărie modernă."),
+    ("Casă cu grădină și piscină.", "Dormitoarele au parchet nou."),
+    ("Garsonieră cu balconul spre parc.", "Baie cu gresie."),
+]
+
+
+def make_engine(fts=True):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    if fts:
+        ensure_text_index(engine)
+    return engine
+
+
+def seed(db):
+    listings = []
+    for unified, image_description in DESCRIPTIONS:
+        listing = Listing(property_type="apartment")
+        listing.synthesis = ListingSynthesis(unified_description=unified)
+        listing.images = [ListingImage(image_data="x", ai_description=image_description)]
+        db.add(listing)
+        db.flush()
+        index_listing_text(db, listing)
+        listings.append(listing)
+    db.commit()
+    return listings
+
+
+@pytest.fixture(params=[True, False], ids=["fts5", "like-fallback"])
+def db_session(request):
+    session = sessionmaker(bind=make_engine(fts=request.param))()
+    yield session
+    session.close()
+
+
+def test_fold_diacritics():
+    assert fold_diacritics("Bucătărie, ȘCOALĂ, şcoală, țară, ţară, îmbunătățit") == \
+        "bucatarie, scoala, scoala, tara, tara, imbunatatit"
+
+
+@pytest.mark.parametrize("words", [
+    ("balcon", "balconul", "balcoane"),
+    ("parchet", "parchetul", "parchete"),
+    ("dormitor", "dormitorul", "dormitoare", "dormitoarele"),
+    ("bucătărie", "bucătăria", "bucătării", "bucatarie"),
+])
+def test_inflections_share_a_stem(words):
+    stems = {analyze(word)[0] for word in words}
+    assert len(stems) == 1
+
+
+def test_stop_words_are_dropped():
+    assert analyze("casă cu balcon și grădină") == analyze("casă balcon grădină")
+
+
+def test_search_requires_all_terms_and_ranks(db_session):
+    listings = seed(db_session)
+
+    total, ranked = search_text(db_session, "balcon parchet")
+
+    assert total == 1
+    assert [listing_id for listing_id, _ in ranked] == [listings[0].id]
+
+
+def test_search_matches_inflections_and_diacritics(db_session):
+    listings = seed(db_session)
+
+    _, parchet = search_text(db_session, "PARCHETUL")
+    _, balcon = search_text(db_session, "balcoane")
+    _, piscina = search_text(db_session, "piscina")
+
+    assert {listing_id for listing_id, _ in parchet} == {listings[0].id, listings[1].id}
+    assert {listing_id for listing_id, _ in balcon} == {listings[0].id, listings[2].id}
+    assert [listing_id for listing_id, _ in piscina] == [listings[1].id]
+
+
+def test_reindex_replaces_document(db_session):
+    listing = seed(db_session)[2]
+    listing.synthesis.unified_description = "Garsonieră cu terasă."
+    index_listing_text(db_session, listing)
+    db_session.commit()
+
+    assert search_text(db_session, "balcon")[0] == 1
+    assert search_text(db_session, "terasa")[1][0][0] == listing.id
+
+
+def test_empty_query_matches_nothing(db_session):
+    seed(db_session)
+
+    assert search_text(db_session, "și cu") == (0, [])
+
+
+def test_text_search_endpoint():
+    session = sessionmaker(bind=make_engine())()
+    listings = seed(session)
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = lambda: session
+    try:
+        response = TestClient(app).get("/api/listings/search/text", params={"q": "balcon parchet"})
+    finally:
+        if previous is None:
+            del app.dependency_overrides[get_db]
+        else:
+            app.dependency_overrides[get_db] = previous
+        session.close()
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["items"][0]["id"] == listings[0].id
+    assert isinstance(data["items"][0]["score"], float)
+
+
+@pytest.mark.skipif(not os.getenv("MOBI_TEST_POSTGRES_URL"), reason="MOBI_TEST_POSTGRES_URL not set")
+def test_postgres_tsvector_search():
+    engine = create_engine(os.environ["MOBI_TEST_POSTGRES_URL"])
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    ensure_text_index(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        listings = seed(db)
+        total, ranked = search_text(db, "balcon parchet")
+
+        assert total == 1
+        assert ranked[0][0] == listings[0].id
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
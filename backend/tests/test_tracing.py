@@ -0,0 +1,106 @@
+"""
+Tests for per-stage tracing and the Server-Timing header.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.tracing import SpanExporter, Trace, set_exporter, span, start_trace, end_trace
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    set_exporter(SpanExporter("file", str(path)))
+    yield path
+    set_exporter(None)
+
+
+def server_timing_names(header):
+    return [entry.split(";")[0].strip() for entry in header.split(",")]
+
+
+def test_analyze_step_image_reports_stage_timings():
+    client = TestClient(app)
+    response = client.post("/api/analyze-step", json={
+        "current_data": {},
+        "new_input": None,
+        "input_type": "image",
+    })
+
+    assert response.status_code == 200
+    names = server_timing_names(response.headers["Server-Timing"])
+    for stage in ["decode", "preprocess", "model", "map", "message", "orchestrate", "total"]:
+        assert stage in names
+
+
+def test_field_update_reports_orchestration_only():
+    client = TestClient(app)
+    response = client.post("/api/analyze-step", json={
+        "current_data": {"property_type": "house"},
+        "input_type": "field_update",
+    })
+
+    names = server_timing_names(response.headers["Server-Timing"])
+    assert "orchestrate" in names
+    assert "model" not in names
+
+
+def test_trace_exported_as_otlp_json(trace_file):
+    client = TestClient(app)
+    client.post("/api/analyze-step", json={
+        "current_data": {},
+        "new_input": None,
+        "input_type": "image",
+    })
+
+    exported = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    spans = exported[-1]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root = spans[0]
+    assert root["name"] == "POST /api/analyze-step"
+    assert len(root["traceId"]) == 32
+    by_name = {s["name"]: s for s in spans}
+    # Preprocess and model spans are children of the request span
+    assert by_name["model"]["parentSpanId"] == root["spanId"]
+    assert by_name["model"]["traceId"] == root["traceId"]
+
+
+def test_incoming_traceparent_is_continued(trace_file):
+    client = TestClient(app)
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    client.get("/health", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+
+    exported = json.loads(trace_file.read_text().splitlines()[-1])
+    root = exported["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert root["traceId"] == trace_id
+    assert root["parentSpanId"] == "00f067aa0ba902b7"
+
+
+def test_nested_spans_link_to_parent():
+    trace, token = start_trace("test")
+    with span("outer") as outer:
+        with span("inner") as inner:
+            pass
+    end_trace(trace, token)
+
+    assert inner.parent_span_id == outer.span_id
+    assert outer.parent_span_id == trace.root.span_id
+
+
+def test_span_outside_trace_is_noop():
+    with span("orphan") as current:
+        assert current is None
+
+
+def test_span_records_error_status():
+    trace, token = start_trace("test")
+    with pytest.raises(ValueError):
+        with span("failing"):
+            raise ValueError("boom")
+    end_trace(trace, token)
+
+    assert trace.spans[0].status_error is True
+    assert trace.spans[0].attributes["exception.type"] == "ValueError"
@@ -0,0 +1,167 @@
+"""
+Tests for streaming upload ingest in /api/analyze-batch.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from starlette.requests import Request
+
+from app import uploads
+from app.image_pool import ImagePreprocessPool
+from app.main import app
+
+client = TestClient(app)
+
+
+def create_test_image(size=(1600, 1200), color='blue'):
+    img = Image.new('RGB', size, color)
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("VISION_MODEL_TYPE", "mock")
+    monkeypatch.setenv("IMAGE_POOL_WORKERS", "0")
+    monkeypatch.setattr("app.image_pool._image_pool", None)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    return tmp_path
+
+
+def test_batch_streams_and_spools_large_uploads(spool_dir, monkeypatch):
+    monkeypatch.setenv("UPLOAD_SPOOL_THRESHOLD", "1024")
+    small = create_test_image((20, 20), 'red')
+    large = create_test_image((1600, 1200), 'green')
+    assert len(small) < 1024 < len(large)
+
+    spooled = []
+    original = ImagePreprocessPool.preprocess
+
+    def recording_preprocess(self, source):
+        spooled.append(isinstance(source, str) and os.path.exists(source))
+        return original(self, source)
+
+    monkeypatch.setattr(ImagePreprocessPool, "preprocess", recording_preprocess)
+
+    response = client.post("/api/analyze-batch", files=[
+        ("files", ("small.png", small, "image/png")),
+        ("files", ("large.png", large, "image/png")),
+    ])
+
+    assert response.status_code == 200
+    analyses = response.json()["individual_analyses"]
+    assert [a["image_sha256"] for a in analyses] == [
+        hashlib.sha256(small).hexdigest(),
+        hashlib.sha256(large).hexdigest(),
+    ]
+    assert spooled == [False, True]
+    # Spool files are removed once preprocessed
+    assert list(spool_dir.iterdir()) == []
+
+
+def test_batch_rejects_empty_file(spool_dir):
+    response = client.post("/api/analyze-batch", files=[
+        ("files", ("empty.jpg", b"", "image/jpeg")),
+    ])
+
+    assert response.status_code == 400
+
+
+def test_batch_rejects_non_image(spool_dir):
+    response = client.post("/api/analyze-batch", files=[
+        ("files", ("notes.txt", b"hello", "text/plain")),
+    ])
+
+    assert response.status_code == 400
+
+
+def test_batch_rejects_oversized_file(spool_dir, monkeypatch):
+    monkeypatch.setenv("UPLOAD_SPOOL_THRESHOLD", "1024")
+    monkeypatch.setenv("UPLOAD_MAX_BYTES", "4096")
+
+    response = client.post("/api/analyze-batch", files=[
+        ("files", ("small.png", create_test_image((20, 20)), "image/png")),
+        ("files", ("huge.png", os.urandom(10_000), "image/png")),
+    ])
+
+    assert response.status_code == 413
+    assert list(spool_dir.iterdir()) == []
+
+
+def multipart_body(parts, boundary="test-boundary"):
+    body = b""
+    for name, filename, content_type, data in parts:
+        body += (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode() + data + b"\r\n"
+    return body + f"--{boundary}--\r\n".encode()
+
+
+def streamed_request(chunks, events, boundary="test-boundary"):
+    pending = list(chunks)
+
+    async def receive():
+        # Let tasks started by the previous chunk run before sending the next one
+        await asyncio.sleep(0)
+        chunk = pending.pop(0)
+        events.append(f"sent {len(chunks) - len(pending)}")
+        return {"type": "http.request", "body": chunk, "more_body": bool(pending)}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={boundary}".encode())],
+    }
+    return Request(scope, receive)
+
+
+def test_preprocessing_starts_before_the_body_is_received(spool_dir, monkeypatch):
+    events = []
+
+    async def recording_preprocess(image):
+        events.append(f"preprocess {image.filename}")
+        return b"preprocessed"
+
+    monkeypatch.setattr(uploads, "_preprocess", recording_preprocess)
+    body = multipart_body([
+        ("files", "first.png", "image/png", create_test_image((20, 20))),
+        ("files", "second.png", "image/png", create_test_image((30, 30))),
+    ])
+    split = body.index(b"second.png")
+    request = streamed_request([body[:split], body[split:]], events)
+
+    images = asyncio.run(uploads.ingest_multipart(request))
+
+    assert [image.filename for image in images] == ["first.png", "second.png"]
+    assert events == ["sent 1", "preprocess first.png", "sent 2", "preprocess second.png"]
+
+
+def test_batch_ignores_other_fields_and_limits_file_count(spool_dir):
+    image = create_test_image((20, 20))
+    response = client.post(
+        "/api/analyze-batch",
+        data={"note": "kitchen"},
+        files=[("files", ("a.png", image, "image/png"))],
+    )
+    assert response.status_code == 200
+    assert len(response.json()["individual_analyses"]) == 1
+
+    response = client.post("/api/analyze-batch", files=[
+        ("files", (f"{i}.png", image, "image/png")) for i in range(11)
+    ])
+    assert response.status_code == 400
+
+
+def test_batch_requires_multipart_files(spool_dir):
+    assert client.post("/api/analyze-batch", json={"files": []}).status_code == 400
+    assert client.post("/api/analyze-batch", data={"note": "no files"}).status_code == 400
@@ -609,6 +609,37 @@ class TestSynthesizePropertyOverview:
         assert any(word in desc_lower for word in ["apartament", "apartment"])
         assert "modern" in desc_lower
 
+    def test_synthesize_exterior_features_from_descriptions(self):
+        """Test that exterior images without amenities get features from their descriptions."""
+        analyses = [
+            {"rooms": {}, "amenities": [], "description": "Front yard with a covered porch"},
+            {"rooms": {}, "amenities": ["garage"], "description": "Double garage"},
+            {"rooms": {"kitchen": 1}, "amenities": ["dishwasher"], "property_type": "house"},
+        ]
+
+        result = synthesize_property_overview(analyses)
+
+        assert result["total_rooms"] == 1
+        assert sorted(result["exterior_features"]) == ["garage", "landscaping", "outdoor living space"]
+        assert result["interior_features"] == ["dishwasher"]
+        assert result["property_overview"]["property_type"] == "house"
+
+    def test_synthesize_skips_duplicates_and_prefers_interior_type(self):
+        """Test that duplicate photos are ignored and interior images set the property type."""
+        analyses = [
+            {"rooms": {}, "amenities": ["pool"], "property_type": "land", "condition": "good"},
+            {"rooms": {"bedroom": 1}, "property_type": "apartment", "style": "modern", "condition": "good"},
+            {"rooms": {"bedroom": 1}, "property_type": "house", "condition": "poor", "duplicate_of": 1},
+        ]
+
+        result = synthesize_property_overview(analyses)
+
+        assert result["room_breakdown"] == {"bedroom": 1}
+        assert result["exterior_features"] == ["pool"]
+        assert result["property_overview"]["property_type"] == "apartment"
+        assert result["property_overview"]["style"] == "modern"
+        assert result["property_overview"]["condition"] == "good"
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])